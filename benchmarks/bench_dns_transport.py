@@ -0,0 +1,190 @@
+#!/usr/bin/env uv run --script
+"""
+Lookups per second of the multiplexed DNS transport against a local stub resolver.
+
+Usage:
+    ./benchmarks/bench_dns_transport.py [--count 50000] [--in-flight 2048] [--drop 0.0]
+
+Starts a stub resolver on 127.0.0.1 in a separate process, so only the
+client side is measured. The stub answers names starting with "nx" with
+NXDOMAIN, names starting with "tc" with a truncated UDP response (full
+answer over TCP), and everything else with one A record; --drop makes it
+ignore that share of UDP queries to exercise retransmits. Reports wall
+time throughput and client CPU time per lookup for raw queries, for
+domain_checker.dns_signals() (breakers and record-type staging included),
+for the TCP fallback and, if dnspython is installed, for the dnspython
+path with 64 threads.
+"""
+
+import os
+import sys
+import argparse
+import multiprocessing
+import random
+import socket
+import struct
+import threading
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import domain_checker
+from dns_transport import DNSTransport
+
+_HEADER = struct.Struct('!HHHHHH')
+# One A record for the question name (compression pointer to offset 12), TTL 60, 127.0.0.1
+_A_RECORD = b'\xc0\x0c' + struct.pack('!HHIH', 1, 1, 60, 4) + bytes([127, 0, 0, 1])
+
+
+def stub_answer(query: bytes, over_tcp: bool) -> bytes:
+    qid, = struct.unpack_from('!H', query)
+    end = query.index(b'\x00', 12) + 5
+    question = query[12:end]
+    label = question[1:3]
+    if label == b'nx':
+        return _HEADER.pack(qid, 0x8183, 1, 0, 0, 0) + question
+    if label == b'tc' and not over_tcp:
+        return _HEADER.pack(qid, 0x8380, 1, 0, 0, 0) + question
+    return _HEADER.pack(qid, 0x8180, 1, 1, 0, 0) + question + _A_RECORD
+
+
+def _serve_tcp_connection(conn: socket.socket) -> None:
+    buffer = b''
+    with conn:
+        while True:
+            data = conn.recv(65536)
+            if not data:
+                return
+            buffer += data
+            replies = []
+            while len(buffer) >= 2:
+                length, = struct.unpack_from('!H', buffer)
+                if len(buffer) < 2 + length:
+                    break
+                reply = stub_answer(buffer[2:2 + length], over_tcp=True)
+                replies.append(struct.pack('!H', len(reply)) + reply)
+                buffer = buffer[2 + length:]
+            conn.sendall(b''.join(replies))
+
+
+def run_stub(port_queue, drop: float) -> None:
+    """Stub resolver main loop: UDP on this process's main thread, TCP on one thread per connection."""
+    udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    udp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    udp.bind(('127.0.0.1', 0))
+    port = udp.getsockname()[1]
+    tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    tcp.bind(('127.0.0.1', port))
+    tcp.listen(16)
+
+    def accept() -> None:
+        while True:
+            conn, _ = tcp.accept()
+            threading.Thread(target=_serve_tcp_connection, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    port_queue.put(port)
+    rng = random.Random(3)
+    while True:
+        query, address = udp.recvfrom(4096)
+        if drop and rng.random() < drop:
+            continue
+        udp.sendto(stub_answer(query, over_tcp=False), address)
+
+
+def names(count: int, prefix: str = '', seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    kinds = ('nx', 'ok') if not prefix else (prefix,)
+    return [f"{rng.choice(kinds)}{i}x{rng.getrandbits(32):08x}.com" for i in range(count)]
+
+
+def raw_queries(transport: DNSTransport, domains: List[str], in_flight: int) -> None:
+    """A queries with at most in_flight outstanding, refilled in bursts like dns_signals()."""
+    outstanding = 0
+    failed = 0
+    window = threading.Condition()
+
+    def answered(answer, error) -> None:
+        nonlocal outstanding, failed
+        with window:
+            outstanding -= 1
+            failed += error is not None
+            if outstanding <= in_flight // 2:
+                window.notify()
+
+    for domain in domains:
+        with window:
+            window.wait_for(lambda: outstanding < in_flight)
+            outstanding += 1
+        transport.query(domain, 'A', '127.0.0.1', timeout=10.0, callback=answered)
+    with window:
+        window.wait_for(lambda: outstanding == 0)
+    if failed:
+        print(f"  {failed} queries failed")
+
+
+def report(label: str, count: int, run: Callable[[], None]) -> None:
+    wall, cpu = time.perf_counter(), time.process_time()
+    run()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    print(f"{label:<36} {count / wall:10.0f} {cpu / count * 1e6:12.1f} {wall:8.2f}")
+
+
+def main() -> int:
+    """Main entry point."""
+
+    parser = argparse.ArgumentParser(description='Benchmark the multiplexed DNS transport against a local stub.')
+    parser.add_argument('--count', type=int, default=50000, help='Lookups per run')
+    parser.add_argument('--in-flight', type=int, default=2048, help='Queries outstanding at once')
+    parser.add_argument('--drop', type=float, default=0.0, help='Share of UDP queries the stub ignores')
+    args = parser.parse_args()
+
+    port_queue = multiprocessing.Queue()
+    stub = multiprocessing.Process(target=run_stub, args=(port_queue, args.drop), daemon=True)
+    stub.start()
+    port = port_queue.get(timeout=10)
+
+    # Retransmit soon, so --drop shows the retransmit path rather than the default timers
+    transport = domain_checker.configure_dns_transport('multiplexed', port=port, retransmit=0.2)
+    domain_checker.DNS_RESOLVERS[:] = ['127.0.0.1']
+    print(f"{'run':<36} {'lookups/s':>10} {'CPU us/look':>12} {'wall s':>8}")
+    try:
+        report('raw A queries (UDP)', args.count,
+               lambda: raw_queries(transport, names(args.count), args.in_flight))
+        report('dns_signals()', args.count,
+               lambda: domain_checker.dns_signals(names(args.count, seed=12), concurrency=args.in_flight))
+        tcp_count = max(1, args.count // 5)
+        report('truncated, answered over TCP', tcp_count,
+               lambda: raw_queries(transport, names(tcp_count, prefix='tc'), args.in_flight))
+        try:
+            import dns.resolver  # noqa: F401
+        except ImportError:
+            print("dnspython not installed; skipping the dnspython comparison")
+        else:
+            domain_checker.configure_dns_transport('dnspython')
+            dnspython_count = max(1, args.count // 10)
+            # dnspython takes the port per resolver, not per nameserver string
+            resolver_class = dns.resolver.Resolver
+
+            class StubResolver(resolver_class):
+                def __init__(self, *a, **kw):
+                    super().__init__(*a, **kw)
+                    self.port = port
+
+            dns.resolver.Resolver = StubResolver
+            try:
+                report('dnspython, 64 threads', dnspython_count,
+                       lambda: domain_checker.dns_signals(names(dnspython_count, seed=13), concurrency=64))
+            finally:
+                dns.resolver.Resolver = resolver_class
+        print(f"\nTransport counters: {transport.stats()}")
+    finally:
+        transport.close()
+        stub.terminate()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env uv run --script
+"""
+Memory and speed of KnownDomainSet against a plain set of str.
+
+Usage:
+    ./benchmarks/bench_known_set.py [--count 1000000] [--lookups 100000]
+
+Builds each structure from the same synthetic .com names (realistic label
+lengths), measures the memory it holds with tracemalloc, then times
+membership tests for present and absent names and incremental inserts.
+"""
+
+import os
+import sys
+import argparse
+import gc
+import random
+import string
+import time
+import tracemalloc
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from known_set import KnownDomainSet
+
+
+def synthetic_domains(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase
+    names = set()
+    while len(names) < count:
+        names.add(''.join(rng.choices(letters, k=rng.randint(5, 16))) + '.com')
+    return list(names)
+
+
+def measure_memory(build: Callable[[], object]) -> tuple:
+    """(structure, bytes held by it once built)."""
+    gc.collect()
+    tracemalloc.start()
+    structure = build()
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return structure, held
+
+
+def time_lookups(structure, names: List[str]) -> float:
+    started = time.perf_counter()
+    for name in names:
+        name in structure
+    return (time.perf_counter() - started) / len(names) * 1e9
+
+
+def main() -> int:
+    """Main entry point."""
+
+    parser = argparse.ArgumentParser(description='Benchmark KnownDomainSet memory and lookups.')
+    parser.add_argument('--count', type=int, default=1000000, help='Names in the set')
+    parser.add_argument('--lookups', type=int, default=100000, help='Membership tests per kind')
+    args = parser.parse_args()
+
+    names = synthetic_domains(args.count + args.lookups)
+    present, absent = names[:args.count], names[args.count:]
+    def fresh():
+        # New str objects for every structure, so the plain set is charged for its strings
+        return (name[:-4] + '.com' for name in present)
+
+    probe_hits = random.Random(1).sample(present, min(args.lookups, len(present)))
+    average_length = sum(map(len, present)) / len(present)
+    print(f"{args.count} names, {average_length:.1f} characters on average\n")
+
+    candidates = [
+        ('set of str', lambda: set(fresh())),
+        ('KnownDomainSet', lambda: KnownDomainSet(fresh())),
+        ('KnownDomainSet + near keys', lambda: KnownDomainSet(fresh(), track_near_keys=True)),
+    ]
+    print(f"{'structure':<28} {'MB':>8} {'B/name':>8} {'hit ns':>8} {'miss ns':>8} {'build s':>8}")
+    for label, build in candidates:
+        started = time.perf_counter()
+        structure, held = measure_memory(build)
+        built = time.perf_counter() - started
+        if isinstance(structure, KnownDomainSet):
+            structure.compact()
+        hit = time_lookups(structure, probe_hits)
+        miss = time_lookups(structure, absent)
+        print(f"{label:<28} {held / 1e6:8.1f} {held / args.count:8.1f} {hit:8.0f} {miss:8.0f} {built:8.2f}")
+        del structure
+        gc.collect()
+
+    inserts = absent[:min(len(absent), 50000)]
+    known = KnownDomainSet(present)
+    started = time.perf_counter()
+    known.update(inserts)
+    per_insert = (time.perf_counter() - started) / len(inserts) * 1e6
+    print(f"\nIncremental inserts into a {args.count}-name KnownDomainSet: {per_insert:.1f} us each (merges included)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env uv run --script
+"""
+Startup-time benchmark for the command-line entry points.
+
+Usage:
+    ./benchmarks/bench_startup.py [--runs 15] [--budget-ms 100]
+
+Each command is timed over --runs fresh interpreters (median wall time), and
+run once more under `python -X importtime` to attribute the import cost and
+list the slowest top-level imports. Exits with 1 if a budgeted command goes
+over the budget, or if any command imports a heavy dependency (openai,
+boto3, dnspython, whois) that it has no use for. main.py --help is only
+checked for heavy imports: the interactive app starts once per session.
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+import time
+from typing import Dict, List, Tuple
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages none of the measured commands should load
+HEAVY_MODULES = ('openai', 'boto3', 'botocore', 'dns', 'whois')
+
+# (label, arguments, held to --budget-ms)
+COMMANDS = [
+    ('check_domain.py --help', ['check_domain.py', '--help'], True),
+    ('check_domain.py --cache-only', ['check_domain.py', '--cache-only', 'example.com', 'example.org'], True),
+    ('main.py --help', ['main.py', '--help'], False),
+]
+
+
+def _run(args: List[str], importtime: bool = False) -> Tuple[float, str]:
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + args
+    started = time.perf_counter()
+    completed = subprocess.run(command, cwd=REPO_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return time.perf_counter() - started, completed.stderr
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int, int]]:
+    """{module: (self_us, cumulative_us, depth)} from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def measure(args: List[str], runs: int) -> Dict:
+    wall = statistics.median(_run(args)[0] for _ in range(runs))
+    modules = parse_importtime(_run(args, importtime=True)[1])
+    top_level = sorted(((cumulative, name) for name, (_, cumulative, depth) in modules.items() if depth == 0),
+                       reverse=True)
+    return {
+        'wall_ms': wall * 1000,
+        'import_ms': sum(self_us for self_us, _, _ in modules.values()) / 1000,
+        'slowest': [(name, cumulative / 1000) for cumulative, name in top_level[:5]],
+        'heavy': sorted({name.split('.')[0] for name in modules} & set(HEAVY_MODULES)),
+    }
+
+
+def main() -> int:
+    """Main entry point."""
+
+    parser = argparse.ArgumentParser(description='Measure start-up time of the entry points.')
+    parser.add_argument('--runs', type=int, default=15, help='Timed runs per command')
+    parser.add_argument('--budget-ms', type=float, default=100.0,
+                        help='Median wall time allowed for each check_domain.py command')
+    args = parser.parse_args()
+
+    baseline = statistics.median(_run(['-c', 'pass'])[0] for _ in range(args.runs)) * 1000
+    print(f"Bare interpreter: {baseline:.1f} ms")
+
+    failed = False
+    for label, command, budgeted in COMMANDS:
+        result = measure(command, args.runs)
+        over = budgeted and result['wall_ms'] > args.budget_ms
+        failed = failed or over or bool(result['heavy'])
+        print(f"\n{label}: {result['wall_ms']:.1f} ms wall, {result['import_ms']:.1f} ms importing"
+              f"{'  OVER BUDGET' if over else ''}")
+        for name, ms in result['slowest']:
+            print(f"  {ms:7.1f} ms  {name}")
+        if result['heavy']:
+            print(f"  imports heavy dependencies: {', '.join(result['heavy'])}")
+
+    print(f"\nBudget: {args.budget_ms:.0f} ms per command: {'FAILED' if failed else 'ok'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from domain_checker import DNS_NODATA, DNS_NXDOMAIN
+from domain_ranker import predicted_availability
+
+logger = logging.getLogger(__name__)
+
+# Assumed P(available) per DNS signal before any confirmed verdict has been recorded:
+# NXDOMAIN names are mostly free, names that exist without records are mostly parked.
+# Records already prove a domain is taken, so they need no calibration.
+SIGNAL_PRIORS = {
+    DNS_NXDOMAIN: 0.9,
+    DNS_NODATA: 0.1,
+}
+
+# How many confirmed verdicts a prior is worth when smoothing a bucket towards it
+PRIOR_WEIGHT = 10.0
+
+# Upper edges of the predicted_availability() bands a bucket is split by
+PRIOR_BANDS = (0.05, 0.15, 0.35)
+
+
+def prior_band(domain: str) -> str:
+    """Coarse predicted_availability() band of a domain, e.g. 'p<0.15'."""
+    prior = predicted_availability(domain)
+    for edge in PRIOR_BANDS:
+        if prior < edge:
+            return f"p<{edge}"
+    return f"p>={PRIOR_BANDS[-1]}"
+
+
+def bucket_keys(domain: str, signal: str) -> List[str]:
+    """Buckets a (domain, signal) pair counts in, from coarsest to finest."""
+    tld = domain.rsplit('.', 1)[-1]
+    return [signal, f"{signal}|{tld}", f"{signal}|{tld}|{prior_band(domain)}"]
+
+
+class Calibrator:
+    """
+    Turns a DNS signal into a probability that the domain is available.
+
+    Every time Route 53 or WHOIS confirms a domain whose DNS signal is known,
+    the verdict is counted in three buckets: the signal, the signal per TLD,
+    and the signal per TLD and predicted_availability() band. The confidence
+    for a new domain is each bucket's available rate, smoothed towards the
+    next coarser one with PRIOR_WEIGHT pseudo-counts, starting from
+    SIGNAL_PRIORS, so sparse buckets lean on the broader ones until they
+    have verdicts of their own. Counts are kept in .cache/calibration.json
+    together with the Brier score of the confidence given before each
+    verdict was recorded, and the (domain, checked_at) pairs of recorded
+    verdicts already counted, so re-reading them adds nothing. Safe to
+    share between threads.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'calibration.json')
+        self.path = path
+        # {bucket: [available, taken]}
+        self.counts: Dict[str, List[int]] = {}
+        self.brier_sum = 0.0
+        self.brier_count = 0
+        # {(domain, checked_at)} of recorded verdicts already counted
+        self.counted: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"Error loading calibration from {self.path}: {e}", exc_info=True)
+            return
+        self.counts = {key: list(value) for key, value in data.get('buckets', {}).items()}
+        self.brier_sum, self.brier_count = data.get('brier', [0.0, 0])
+        self.counted = {tuple(pair) for pair in data.get('counted', [])}
+
+    def save(self) -> None:
+        with self._lock:
+            data = {'buckets': self.counts, 'brier': [self.brier_sum, self.brier_count],
+                    'counted': sorted(self.counted)}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _confidence(self, domain: str, signal: str) -> float:
+        p = SIGNAL_PRIORS[signal]
+        for key in bucket_keys(domain, signal):
+            available, taken = self.counts.get(key, (0, 0))
+            p = (available + PRIOR_WEIGHT * p) / (available + taken + PRIOR_WEIGHT)
+        return p
+
+    def confidence(self, domain: str, signal: str) -> float:
+        """P(available) for a domain whose DNS signal is NXDOMAIN or NODATA."""
+        with self._lock:
+            return self._confidence(domain, signal)
+
+    def is_counted(self, domain: str, checked_at: str) -> bool:
+        with self._lock:
+            return (domain, checked_at) in self.counted
+
+    def forget_counted_before(self, cutoff: str) -> None:
+        """Drop counted pairs checked before cutoff (ISO), which will not be read again."""
+        with self._lock:
+            self.counted = {pair for pair in self.counted if pair[1] >= cutoff}
+
+    def record(self, domain: str, signal: str, status: str, checked_at: Optional[str] = None) -> bool:
+        """
+        Count a confirmed 'available' or 'taken' verdict; other signals and statuses are ignored.
+
+        Pass checked_at for a recorded verdict, so the same one is never
+        counted twice. Returns True if the verdict was counted.
+        """
+        if signal not in SIGNAL_PRIORS or status not in ('available', 'taken'):
+            return False
+        outcome = 1.0 if status == 'available' else 0.0
+        with self._lock:
+            if checked_at is not None:
+                if (domain, checked_at) in self.counted:
+                    return False
+                self.counted.add((domain, checked_at))
+            self.brier_sum += (self._confidence(domain, signal) - outcome) ** 2
+            self.brier_count += 1
+            for key in bucket_keys(domain, signal):
+                counts = self.counts.setdefault(key, [0, 0])
+                counts[0 if status == 'available' else 1] += 1
+        return True
+
+    @property
+    def brier_score(self) -> Optional[float]:
+        """Mean squared error of the confidences given so far (0 is perfect, 0.25 is a coin flip)."""
+        return self.brier_sum / self.brier_count if self.brier_count else None
+
+    def signal_counts(self) -> Dict[str, Tuple[int, int]]:
+        """{signal: (available, taken)} over every TLD."""
+        with self._lock:
+            return {signal: tuple(self.counts.get(signal, (0, 0))) for signal in SIGNAL_PRIORS}
+
+    def summary_lines(self) -> List[str]:
+        lines = []
+        for signal, (available, taken) in self.signal_counts().items():
+            total = available + taken
+            rate = f"{available / total:.0%} available" if total else 'no verdicts yet'
+            lines.append(f"{signal}: {total} confirmed, {rate}")
+        if self.brier_score is not None:
+            lines.append(f"Brier score: {self.brier_score:.3f} over {self.brier_count} verdicts")
+        return lines
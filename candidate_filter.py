@@ -0,0 +1,198 @@
+import logging
+import re
+from collections.abc import Set as AbstractSet
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_LABEL_RE = re.compile(r'^[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?$')
+_TLD_RE = re.compile(r'^(?:[a-z]{2,63}|xn--[a-z0-9-]{1,59})$')
+_SCHEME_RE = re.compile(r'^[a-z][a-z0-9+.-]*://')
+
+# Drop reasons, in the order they are checked
+EMPTY = 'empty'
+INVALID = 'invalid'
+BAD_IDNA = 'bad_idna'
+WRONG_TLD = 'wrong_tld'
+TOO_LONG = 'too_long'
+DUPLICATE = 'duplicate'
+KNOWN = 'known'
+NEAR_DUPLICATE = 'near_duplicate'
+
+
+class FilterResult:
+    """Candidates that survived the pre-check, and the ones dropped by reason."""
+
+    def __init__(self):
+        self.accepted: List[str] = []
+        self.dropped: Dict[str, List[str]] = {}
+
+    def drop(self, reason: str, candidate: str) -> None:
+        self.dropped.setdefault(reason, []).append(candidate)
+
+    @property
+    def dropped_count(self) -> int:
+        return sum(len(v) for v in self.dropped.values())
+
+    def summary(self) -> str:
+        return ', '.join(f"{len(v)} {reason.replace('_', ' ')}" for reason, v in self.dropped.items())
+
+
+def normalize_candidate(raw: str) -> str:
+    """
+    Canonicalize an LLM or user supplied name into a bare lowercase domain.
+
+    Strips whitespace, URL schemes, paths, 'www.' and a trailing root dot;
+    words separated by spaces are joined ("Sun Path.com" -> "sunpath.com").
+    """
+    domain = str(raw).strip().lower()
+    domain = _SCHEME_RE.sub('', domain)
+    domain = domain.split('/', 1)[0].split('?', 1)[0].split('#', 1)[0]
+    domain = ''.join(domain.split())
+    domain = domain.rstrip('.')
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    return domain
+
+
+# Characters IDNA2003 (Python's 'idna' codec) maps to a different name, e.g. straße.com -> strasse.com
+_DEVIATION_CHARS = frozenset('\u00df\u03c2\u200c\u200d')
+
+
+def to_ascii(domain: str) -> Optional[str]:
+    """
+    Return the IDNA (punycode) form of a domain, or None if it cannot be encoded.
+
+    Uses IDNA2008 with non-transitional UTS #46 mapping from the idna package,
+    so straße.com stays distinct from strasse.com. Without the package, names
+    with deviation characters (ß, ς, ZWJ, ZWNJ) are rejected rather than
+    encoded as a different name by the IDNA2003 codec.
+    """
+    if domain.isascii():
+        return domain
+    try:
+        import idna
+    except ImportError:
+        if not _DEVIATION_CHARS.isdisjoint(domain):
+            return None
+        try:
+            return domain.encode('idna').decode('ascii')
+        except UnicodeError:
+            return None
+    try:
+        return idna.encode(domain, uts46=True, transitional=False).decode('ascii')
+    except idna.IDNAError:
+        return None
+
+
+def _is_valid_a_label(label: str) -> bool:
+    """Whether an xn-- label decodes to a valid name, under the same IDNA rules as to_ascii()."""
+    try:
+        import idna
+    except ImportError:
+        try:
+            label.encode('ascii').decode('idna')
+        except UnicodeError:
+            return False
+        return True
+    try:
+        idna.decode(label)
+    except idna.IDNAError:
+        return False
+    return True
+
+
+def validation_error(domain: str, allowed_tlds: Optional[Iterable[str]] = None) -> Optional[str]:
+    """Return the drop reason for an ASCII domain, or None if it is a valid registrable name."""
+    if len(domain) > 253:
+        return INVALID
+    labels = domain.split('.')
+    if len(labels) < 2:
+        return INVALID
+    tld = labels[-1]
+    if not _TLD_RE.match(tld):
+        return INVALID
+    for label in labels[:-1]:
+        if not _LABEL_RE.match(label):
+            return INVALID
+        if label[2:4] == '--':
+            if not label.startswith('xn--'):
+                return INVALID
+            if not _is_valid_a_label(label):
+                return BAD_IDNA
+    if allowed_tlds is not None and tld not in allowed_tlds:
+        return WRONG_TLD
+    return None
+
+
+def near_duplicate_key(domain: str) -> str:
+    """Key under which "sun-path.com", "sunpath.com" and "sunpaths.com" collide."""
+    label, _, tld = domain.rpartition('.')
+    label = label.replace('-', '')
+    if label.endswith('ies') and len(label) > 4:
+        label = label[:-3] + 'y'
+    elif label.endswith('es') and label[-3:-2] in ('s', 'x', 'z', 'h') and len(label) > 4:
+        label = label[:-2]
+    elif label.endswith('s') and not label.endswith('ss') and len(label) > 3:
+        label = label[:-1]
+    return f"{label}.{tld}"
+
+
+def filter_candidates(candidates: Iterable[str], known: Iterable[str] = (), max_length: Optional[int] = None,
+                      allowed_tlds: Optional[Iterable[str]] = None,
+                      collapse_near_duplicates: bool = True) -> FilterResult:
+    """
+    Cheap pre-network stage shared by main.py and check_domain.py.
+
+    Normalizes every candidate, drops anything that is not a valid (IDNA)
+    domain under allowed_tlds or is longer than max_length, and removes exact
+    duplicates and names already in `known`. With collapse_near_duplicates,
+    names that only differ from a known or earlier candidate by hyphens or a
+    plural ending are dropped too. Order of the surviving candidates is kept.
+    A KnownDomainSet built with track_near_keys supplies its near-duplicate
+    keys, so large known sets are not rescanned on every call.
+    """
+    allowed = None if allowed_tlds is None else frozenset(t.lower().lstrip('.') for t in allowed_tlds)
+    # Any set (including a KnownDomainSet) is used as is; other iterables are normalized into one
+    known_set = known if isinstance(known, AbstractSet) else {normalize_candidate(d) for d in known}
+    known_keys = getattr(known_set, 'near_keys', None)
+    if known_keys is None:
+        known_keys = {near_duplicate_key(d) for d in known_set} if collapse_near_duplicates else set()
+
+    result = FilterResult()
+    seen = set()
+    seen_keys = set()
+    for raw in candidates:
+        domain = normalize_candidate(raw)
+        if not domain:
+            result.drop(EMPTY, raw)
+            continue
+        ascii_domain = to_ascii(domain)
+        if ascii_domain is None:
+            result.drop(BAD_IDNA, raw)
+            continue
+        reason = validation_error(ascii_domain, allowed)
+        if reason:
+            result.drop(reason, raw)
+            continue
+        if max_length is not None and len(ascii_domain) > max_length:
+            result.drop(TOO_LONG, raw)
+            continue
+        if ascii_domain in seen:
+            result.drop(DUPLICATE, raw)
+            continue
+        if ascii_domain in known_set:
+            result.drop(KNOWN, raw)
+            continue
+        if collapse_near_duplicates:
+            key = near_duplicate_key(ascii_domain)
+            if key in known_keys or key in seen_keys:
+                result.drop(NEAR_DUPLICATE, raw)
+                continue
+            seen_keys.add(key)
+        seen.add(ascii_domain)
+        result.accepted.append(ascii_domain)
+
+    if result.dropped:
+        logger.debug(f"Pre-check kept {len(result.accepted)} candidates, dropped {result.summary()}")
+    return result
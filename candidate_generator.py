@@ -0,0 +1,117 @@
+import heapq
+import itertools
+import logging
+import re
+from typing import Iterable, Iterator, List
+
+from candidate_filter import filter_candidates
+from known_set import KnownDomainSet, KnownDomainUnion
+from domain_ranker import score_domain
+from wordlists import COMMON_WORDS, PINYIN_SYLLABLES, PREFIXES, STOPWORDS, SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r'[a-z]+')
+
+# Pinyin syllables short and unambiguous enough to pair with English seeds
+_PINYIN_PARTNERS = tuple(sorted(s for s in PINYIN_SYLLABLES if 2 <= len(s) <= 4 and s[0] not in 'qxcz'))
+_WORD_PARTNERS = tuple(sorted(w for w in COMMON_WORDS if 3 <= len(w) <= 6))
+
+
+def extract_seeds(query: str, limit: int = 8) -> List[str]:
+    """Pull candidate seed words out of a free-text query, in order of appearance."""
+    words = _WORD_RE.findall(query.lower())
+    seeds = [w for w in words if len(w) >= 2 and w not in STOPWORDS]
+    return list(dict.fromkeys(seeds))[:limit]
+
+
+def combinations(seeds: Iterable[str]) -> Iterator[str]:
+    """
+    Lazily yield candidate labels built from the seeds.
+
+    Patterns are emitted cheapest-to-read first: bare seeds, seed pairs,
+    affixed seeds, then seeds paired with common words and pinyin syllables.
+    The later patterns are effectively unbounded, so callers take what they need.
+    """
+    seeds = [s for s in dict.fromkeys(seeds) if s]
+    yield from seeds
+    for a, b in itertools.permutations(seeds, 2):
+        yield a + b
+    for seed in seeds:
+        for prefix in PREFIXES:
+            yield prefix + seed
+        for suffix in SUFFIXES:
+            yield seed + suffix
+    for word in _WORD_PARTNERS:
+        for seed in seeds:
+            if word != seed:
+                yield seed + word
+                yield word + seed
+    for syllable in _PINYIN_PARTNERS:
+        for seed in seeds:
+            yield seed + syllable
+            yield syllable + seed
+
+
+class CandidateStream:
+    """
+    Endless, locally ranked stream of candidate domains for a set of seeds.
+
+    Labels from combinations() are pulled in chunks, pre-filtered against the
+    known set (and everything already emitted), and held in a heap ordered by
+    memorability score so each batch is the best of what has been generated.
+
+    A KnownDomainSet with near keys is used as it is, not copied, so it can
+    be the caller's shared set and keep growing there. Emitted names and
+    those passed to mark_known() go to a small set of the stream's own.
+    """
+
+    def __init__(self, seeds: Iterable[str], known: Iterable[str] = (), max_length: int = 30,
+                 tld: str = 'com', chunk_size: int = 500):
+        self.seeds = list(seeds)
+        self.tld = tld
+        self.max_length = max_length
+        self.chunk_size = chunk_size
+        self._labels = combinations(self.seeds)
+        if not (isinstance(known, KnownDomainSet) and known.near_keys is not None):
+            known = KnownDomainSet(known, track_near_keys=True)
+        self._shared = known
+        self._seen = KnownDomainSet(track_near_keys=True)
+        self._known = KnownDomainUnion(self._shared, self._seen)
+        self._heap = []
+        self._exhausted = False
+        self.generated = 0
+
+    def mark_known(self, domains: Iterable[str]) -> None:
+        """Exclude domains that were checked elsewhere from future batches."""
+        self._seen.update(d for d in domains if d not in self._shared)
+
+    def _fill(self, wanted: int) -> None:
+        while not self._exhausted and len(self._heap) < wanted:
+            chunk = [f"{label}.{self.tld}" for label in itertools.islice(self._labels, self.chunk_size)]
+            if len(chunk) < self.chunk_size:
+                self._exhausted = True
+            self.generated += len(chunk)
+            filtered = filter_candidates(chunk, self._known, max_length=self.max_length, allowed_tlds=[self.tld])
+            for domain in filtered.accepted:
+                self._seen.add(domain)
+                heapq.heappush(self._heap, (-score_domain(domain), len(domain), domain))
+
+    def next_batch(self, size: int = 20) -> List[str]:
+        """Return up to `size` of the best not-yet-emitted candidates."""
+        # Keep a few chunks buffered so the ranking has something to choose from
+        self._fill(max(size * 5, self.chunk_size))
+        batch = []
+        while self._heap and len(batch) < size:
+            _, _, domain = heapq.heappop(self._heap)
+            batch.append(domain)
+        logger.debug(f"Generated {len(batch)} local candidates from {len(self.seeds)} seeds "
+                     f"({self.generated} combinations so far)")
+        return batch
+
+    def __iter__(self):
+        while True:
+            batch = self.next_batch()
+            if not batch:
+                return
+            yield from batch
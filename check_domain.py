@@ -6,37 +6,72 @@ Usage:
     ./check_domain.py example.com
     echo "example.com" | ./check_domain.py
     ./check_domain.py < domains.txt
+    ./check_domain.py --queue jobs.db --spawn-workers 4 < domains.txt
+    ./check_domain.py --queue /shared/jobs.db --worker
+    ./check_domain.py --use-daemon example.com
+    ./check_domain.py --cache-only example.com
+    ./check_domain.py --fast --confirm-top 20 < candidates.txt
+
+The checker stack is imported only by the paths that check locally, so
+--help, --cache-only and --use-daemon start without loading it.
 """
 
+import os
 import sys
+import json
 import argparse
-import time
+import threading
 import logging
-from typing import Optional, Tuple, List
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, List
+
+from candidate_filter import filter_candidates, DUPLICATE, NEAR_DUPLICATE
+from utils import query_cache_verdicts
 
-from domain_checker import check_domain_availability
-from logging_config import setup_logging
+if TYPE_CHECKING:
+    import subprocess
+
+    import calibration
 
 
 logger = logging.getLogger(__name__)
 
 
-def check_domain_with_backoff(domain: str, base_delay: float = 0, max_retries: int = 3) -> Tuple[Optional[bool], str]:
+def check_domain_with_backoff(domain: str, base_delay: float = 0, max_retries: int = 3,
+                              cancel_event: Optional[threading.Event] = None,
+                              budget: Optional[float] = None) -> Tuple[Optional[bool], str]:
     """Check domain availability with exponential backoff on failure.
     
     The base_delay parameter is only used for exponential backoff between retries
     when errors occur. There is no delay between successful domain checks.
     AWS Route 53 API calls have a separate 1-second rate limit.
+
+    budget caps the time spent on this domain in seconds, retries included;
+    once it is spent no further attempt is made.
     
-    Returns (is_available, status) where status can be 'available', 'taken', or 'error'
+    Returns (is_available, status) where status can be 'available', 'taken', or 'error',
+    or 'unchecked' if cancel_event was set before a verdict was reached.
     """
+    from domain_checker import Deadline, check_domain_availability
+
+    deadline = Deadline(budget, parent=cancel_event)
+
+    def wait_before_retry(retry_delay: float) -> Optional[Tuple[Optional[bool], str]]:
+        if deadline.wait(retry_delay):
+            if deadline.parent_set():
+                return None, 'unchecked'
+            logger.warning(f"Giving up on {domain}: {budget:.1f}s budget spent")
+            return None, 'error'
+        return None
+
     for attempt in range(max_retries):
         try:
 
-            is_available, status = check_domain_availability(domain)
+            is_available, status = check_domain_availability(
+                domain, cancel_event=cancel_event, budget=None if budget is None else deadline.remaining()
+            )
             
 
-            if status in ('available', 'taken'):
+            if status in ('available', 'taken', 'unchecked'):
                 return is_available, status
             
 
@@ -46,7 +81,9 @@ def check_domain_with_backoff(domain: str, base_delay: float = 0, max_retries: i
                     error_msg = f"Error checking {domain}, retrying in {retry_delay}s..."
                     print(f"\n{error_msg}")
                     logger.warning(f"Domain check error (attempt {attempt + 1}/{max_retries}): {error_msg}")
-                    time.sleep(retry_delay)
+                    stop = wait_before_retry(retry_delay)
+                    if stop:
+                        return stop
                 else:
                     error_msg = f"Failed to check {domain} after {max_retries} attempts due to errors"
                     print(f"\n{error_msg}")
@@ -59,7 +96,9 @@ def check_domain_with_backoff(domain: str, base_delay: float = 0, max_retries: i
                 error_msg = f"Error checking {domain}, retrying in {retry_delay}s... ({str(e)})"
                 print(f"\n{error_msg}")
                 logger.warning(f"Domain check error (attempt {attempt + 1}/{max_retries}): {error_msg}")
-                time.sleep(retry_delay)
+                stop = wait_before_retry(retry_delay)
+                if stop:
+                    return stop
             else:
                 error_msg = f"Failed to check {domain} after {max_retries} attempts: {str(e)}"
                 print(f"\n{error_msg}")
@@ -69,21 +108,33 @@ def check_domain_with_backoff(domain: str, base_delay: float = 0, max_retries: i
     return None, 'error'
 
 
-def check_domains(domains: List[str], base_delay: float = 0, max_retries: int = 3) -> dict:
+def check_domains(domains: List[str], base_delay: float = 0, max_retries: int = 3,
+                  domain_budget: Optional[float] = None, time_budget: Optional[float] = None) -> dict:
     """Check multiple domains and return results.
     
     The base_delay parameter is passed to check_domain_with_backoff and is only
     used for exponential backoff between retries when errors occur.
     There is no delay between successful domain checks.
     AWS Route 53 API calls have a separate 1-second rate limit.
+
+    domain_budget caps each domain and time_budget the whole run (in seconds).
+    When time_budget is spent the domain in flight is cancelled, no new one is
+    started, and every domain left is reported as 'unchecked'.
     """
+    from domain_checker import Deadline
+
+    deadline = Deadline(time_budget)
     results = {}
     for domain in domains:
         domain = domain.strip().lower()
         if not domain:
             continue
-        print(f"Checking {domain}...", file=sys.stderr)
-        is_available, status = check_domain_with_backoff(domain, base_delay, max_retries)
+        if deadline.is_set():
+            is_available, status = None, 'unchecked'
+        else:
+            print(f"Checking {domain}...", file=sys.stderr)
+            is_available, status = check_domain_with_backoff(domain, base_delay, max_retries,
+                                                             cancel_event=deadline, budget=domain_budget)
         results[domain] = {
             'available': is_available,
             'status': status
@@ -92,13 +143,259 @@ def check_domains(domains: List[str], base_delay: float = 0, max_retries: int =
             print(f"{domain}: available")
         elif status == 'taken':
             print(f"{domain}: taken")
+        elif status == 'unchecked':
+            print(f"{domain}: unchecked")
         else:
             print(f"{domain}: error")
     return results
 
 
-def main() -> int:
-    """Main entry point."""
+def spawn_local_workers(queue_path: str, count: int, args: argparse.Namespace) -> List['subprocess.Popen']:
+    """Start worker processes on this machine that exit once the queue is drained."""
+    import subprocess
+
+    command = [sys.executable, os.path.abspath(__file__), '--queue', queue_path, '--worker', '--exit-when-done',
+               '--lease', str(args.lease), '--delay', str(args.delay), '--retries', str(args.retries)]
+    if args.domain_budget is not None:
+        command += ['--domain-budget', str(args.domain_budget)]
+    if args.aws_profiles:
+        command += ['--aws-profiles', args.aws_profiles]
+    if args.dns_transport:
+        command += ['--dns-transport', args.dns_transport]
+    return [subprocess.Popen(command, stdout=subprocess.DEVNULL) for _ in range(count)]
+
+
+def check_domains_queued(domains: List[str], args: argparse.Namespace) -> dict:
+    """
+    Submit domains as a job to the shared queue and wait for workers to check them.
+
+    With --time-budget the coordinator stops waiting when it is spent; the job
+    stays queued, and domains without a verdict yet are reported as 'unchecked'.
+    With --spawn-workers it also stops once every spawned worker has exited
+    while work is still outstanding (e.g. they crashed at start-up), and
+    reports the domains without a verdict as errors.
+    """
+    from job_queue import JobQueue
+
+    queue = JobQueue(args.queue, lease_seconds=args.lease)
+    job_id = queue.submit(domains, chunk_size=args.chunk_size)
+    print(f"Submitted job {job_id} ({len(domains)} domains) to {args.queue}", file=sys.stderr)
+    workers = spawn_local_workers(args.queue, args.spawn_workers, args) if args.spawn_workers else []
+
+    def report(counts):
+        print(f"Job {job_id}: {counts['done']} chunks done, {counts['leased']} leased, "
+              f"{counts['pending']} pending, {counts['failed']} failed", file=sys.stderr)
+
+    def workers_gone() -> bool:
+        return bool(workers) and all(worker.poll() is not None for worker in workers)
+
+    try:
+        verdicts = queue.wait(job_id, on_progress=report, timeout=args.time_budget, stop=workers_gone)
+        # Checked before the workers still running are terminated below
+        crashed = workers_gone() and not queue.is_finished(job_id)
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.terminate()
+            worker.wait()
+
+    missing = 'unchecked'
+    if crashed:
+        codes = ', '.join(str(worker.returncode) for worker in workers)
+        logger.error(f"All {len(workers)} spawned workers exited (exit codes {codes}) before job {job_id} finished")
+        print(f"Error: all spawned workers exited (exit codes {codes}) with work outstanding", file=sys.stderr)
+        missing = 'error'
+
+    results = {}
+    for domain in domains:
+        is_available, status = verdicts.get(domain, (None, missing))
+        results[domain] = {'available': is_available, 'status': status}
+        print(f"{domain}: {status if status in ('available', 'taken', 'unchecked') else 'error'}")
+    return results
+
+
+def check_domains_daemon(domains: List[str], args: argparse.Namespace) -> dict:
+    """Forward the check to a running checker_daemon.py; raises DaemonUnavailable if there is none."""
+    from checker_daemon import check_via_daemon
+
+    results = {}
+    for result in check_via_daemon(domains, args.socket, budget=args.time_budget, domain_budget=args.domain_budget):
+        results[result['domain']] = {'available': result['available'], 'status': result['status']}
+        print(f"{result['domain']}: {result['status']}")
+    return results
+
+
+def load_cached_verdicts(cache_dir: Optional[str] = None) -> Dict[str, Tuple[str, str]]:
+    """
+    Latest recorded verdict per domain, as {domain: (status, checked_at)}.
+
+    Reads the watchlist and main.py's per-query caches; where both know a
+    domain, the more recent verdict wins. Query cache verdicts no search
+    lists (older caches) are undated, with an empty checked_at.
+    """
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+    verdicts: Dict[str, Tuple[str, str]] = {}
+
+    def remember(domain: str, status: str, checked_at: Optional[str]) -> None:
+        checked_at = checked_at or ''
+        if status in ('available', 'taken') and checked_at >= verdicts.get(domain, ('', ''))[1]:
+            verdicts[domain] = (status, checked_at)
+
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return verdicts
+    for name in names:
+        if not (name.startswith('domains_') and name.endswith('.json')) and name != 'watchlist.json':
+            continue
+        try:
+            with open(os.path.join(cache_dir, name), 'r') as f:
+                data = json.load(f)
+        except (ValueError, OSError) as e:
+            logger.warning(f"Skipping unreadable cache {name}: {e}")
+            continue
+        if name == 'watchlist.json':
+            for domain, entry in data.get('domains', {}).items():
+                remember(domain, entry.get('verdict', entry.get('status')),
+                         entry.get('verdict_at', entry.get('checked_at')))
+            continue
+        for domain, status, checked_at in query_cache_verdicts(data):
+            remember(domain, status, checked_at)
+    return verdicts
+
+
+def check_domains_cached(domains: List[str]) -> dict:
+    """Answer from recorded verdicts only; domains never checked before are 'unchecked'."""
+    verdicts = load_cached_verdicts()
+    results = {}
+    for domain in domains:
+        status, checked_at = verdicts.get(domain, ('unchecked', None))
+        results[domain] = {'available': {'available': True, 'taken': False}.get(status), 'status': status}
+        print(f"{domain}: {status}" + (f" (as of {checked_at[:16]})" if checked_at else ""))
+    return results
+
+
+def calibrate_from_cache(calibrator: 'calibration.Calibrator', max_age_days: float = 30.0,
+                         concurrency: Optional[int] = None, deadline=None) -> int:
+    """
+    Pair recent recorded verdicts with what DNS says about those names now.
+
+    Verdicts older than max_age_days are left out, since the name may have
+    changed hands since, and so are verdicts the calibrator has already
+    counted. deadline (a domain_checker.Deadline) stops the DNS lookups
+    early. Returns the number of verdicts recorded.
+    """
+    from datetime import datetime, timedelta
+    from domain_checker import dns_signals
+
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+    calibrator.forget_counted_before(cutoff)
+    verdicts = {d: (status, checked_at) for d, (status, checked_at) in load_cached_verdicts().items()
+                if checked_at >= cutoff and not calibrator.is_counted(d, checked_at)}
+
+    signals = dns_signals(verdicts, deadline=deadline, concurrency=concurrency)
+    recorded = sum(calibrator.record(domain, signal, *verdicts[domain]) for domain, signal in signals.items())
+    logger.info(f"Calibrated DNS signals against {recorded} new recorded verdicts")
+    return recorded
+
+
+def check_domains_fast(domains: List[str], args: argparse.Namespace) -> dict:
+    """
+    Triage at DNS speed: recorded verdicts, then one concurrent DNS pass.
+
+    Names with records are taken. NXDOMAIN and empty (NODATA) answers get the
+    calibrated probability that the name is available and are reported as
+    'likely_available' or 'likely_taken' against --min-confidence. The
+    --confirm-top most promising likely-available names (confidence times
+    memorability) then go through the full tier pipeline, and each confirmed
+    verdict is fed back into the calibration. --time-budget covers all of
+    these phases together.
+
+    Recorded verdicts are only final while they are younger than the
+    watchlist's VERDICT_TTL for their status; older or undated ones are
+    probed like new names and reported alongside as cached_status.
+    """
+    from datetime import datetime
+    from calibration import Calibrator
+    from domain_checker import DNS_ERROR, DNS_RECORDS, Deadline, check_domains_until, dns_signals
+    from domain_ranker import score_domain
+    from watchlist import VERDICT_TTL
+
+    deadline = Deadline(args.time_budget)
+    calibrator = Calibrator()
+    if args.calibrate:
+        calibrate_from_cache(calibrator, concurrency=args.dns_concurrency, deadline=deadline)
+    verdicts = load_cached_verdicts()
+    now = datetime.now()
+    results = {}
+    stale: Dict[str, Tuple[str, str]] = {}
+    for domain in domains:
+        if domain not in verdicts:
+            continue
+        status, checked_at = verdicts[domain]
+        if checked_at and (now - datetime.fromisoformat(checked_at)).total_seconds() <= VERDICT_TTL[status]:
+            available = status == 'available'
+            results[domain] = {'available': available, 'status': status, 'confidence': 1.0 if available else 0.0,
+                               'source': 'cache', 'checked_at': checked_at}
+        else:
+            stale[domain] = (status, checked_at)
+
+    to_probe = [d for d in domains if d not in results]
+    print(f"Probing DNS for {len(to_probe)} domain(s)...", file=sys.stderr)
+    signals = dns_signals(to_probe, deadline=deadline, concurrency=args.dns_concurrency)
+    for domain in to_probe:
+        signal = signals.get(domain, 'unchecked')
+        if signal == DNS_RECORDS:
+            results[domain] = {'available': False, 'status': 'taken', 'confidence': 0.0, 'source': 'dns'}
+        elif signal in (DNS_ERROR, 'unchecked'):
+            results[domain] = {'available': None, 'status': 'error' if signal == DNS_ERROR else signal,
+                               'confidence': None, 'source': 'dns'}
+        else:
+            confidence = calibrator.confidence(domain, signal)
+            status = 'likely_available' if confidence >= args.min_confidence else 'likely_taken'
+            results[domain] = {'available': None, 'status': status, 'confidence': round(confidence, 3),
+                               'source': 'dns', 'signal': signal}
+        if domain in stale:
+            cached_status, checked_at = stale[domain]
+            results[domain].update(cached_status=cached_status, checked_at=checked_at or None)
+
+    likely = [d for d, r in results.items() if r['status'] == 'likely_available']
+    likely.sort(key=lambda d: results[d]['confidence'] * score_domain(d), reverse=True)
+    if args.confirm_top and likely and not deadline.is_set():
+        shortlist = likely[:args.confirm_top]
+        print(f"Confirming the top {len(shortlist)} likely available domain(s)...", file=sys.stderr)
+
+        def confirm(domain: str, cancel_event=None) -> Tuple[Optional[bool], str]:
+            return check_domain_with_backoff(domain, args.delay, args.retries, cancel_event=cancel_event,
+                                             budget=args.domain_budget)
+
+        time_left = None if args.time_budget is None else deadline.remaining()
+        confirmed, _ = check_domains_until(shortlist, check=confirm, time_budget=time_left)
+        for domain, (is_available, status) in confirmed.items():
+            calibrator.record(domain, results[domain]['signal'], status)
+            if status in ('available', 'taken'):
+                results[domain].update(available=is_available, status=status, source='confirmed',
+                                       confidence=1.0 if is_available else 0.0)
+    calibrator.save()
+
+    for domain in domains:
+        r = results[domain]
+        if r['status'] in ('likely_available', 'likely_taken'):
+            detail = f"{r['confidence']:.0%}, {r['signal']}"
+        else:
+            detail = r['source']
+        if r['source'] == 'cache':
+            detail += f", as of {r['checked_at'][:16]}"
+        elif 'cached_status' in r:
+            detail += f", was {r['cached_status']}" + (f" as of {r['checked_at'][:16]}" if r['checked_at'] else "")
+        print(f"{domain}: {r['status'].replace('_', ' ')} ({detail})")
+    for line in calibrator.summary_lines():
+        logger.info(f"Calibration: {line}")
+    return results
+
+
+def _setup_logging() -> None:
+    from logging_config import setup_logging
 
     try:
         logger_instance, log_file = setup_logging()
@@ -107,12 +404,122 @@ def main() -> int:
         print(f"Warning: Failed to set up logging: {e}", file=sys.stderr)
         logger_instance = logging.getLogger()
         logger_instance.setLevel(logging.WARNING)
-    
+
+
+def print_checker_stats(metrics_file: Optional[str] = None) -> None:
+    from domain_checker import BREAKERS, TIER_SCHEDULER, dns_transport, route53_pool
+
+    tier_lines = TIER_SCHEDULER.summary_lines()
+    if tier_lines:
+        print("Tiers:", file=sys.stderr)
+        for line in tier_lines:
+            print(f"  {line}", file=sys.stderr)
+            logger.info(f"Tier stats: {line}")
+    breaker_lines = BREAKERS.summary_lines()
+    if breaker_lines:
+        print("Circuit breakers:", file=sys.stderr)
+        for line in breaker_lines:
+            print(f"  {line}", file=sys.stderr)
+            logger.info(f"Circuit breaker: {line}")
+    pool = route53_pool()
+    if len(pool) > 1:
+        print("Route 53 accounts:", file=sys.stderr)
+        for line in pool.summary_lines():
+            print(f"  {line}", file=sys.stderr)
+            logger.info(f"Route 53 account: {line}")
+    transport = dns_transport()
+    transport_stats = transport.stats() if transport is not None else None
+    if transport_stats and transport_stats['queries']:
+        line = (f"{transport_stats['queries']} queries, {transport_stats['retransmits']} retransmits, "
+                f"{transport_stats['stream_fallbacks']} over {transport.stream.upper()}, "
+                f"{transport_stats['timeouts']} timed out")
+        print(f"DNS transport: {line}", file=sys.stderr)
+        logger.info(f"DNS transport: {line}")
+    if metrics_file:
+        with open(metrics_file, 'w') as f:
+            json.dump({'tiers': TIER_SCHEDULER.snapshot(), 'breakers': BREAKERS.snapshot(),
+                       'route53_accounts': pool.snapshot(), 'dns_transport': transport_stats}, f, indent=2)
+
+
+def main() -> int:
+    """Main entry point."""
+
     parser = argparse.ArgumentParser(description='Check domain availability.')
     parser.add_argument('domains', nargs='*', help='Domain(s) to check')
     parser.add_argument('--delay', type=float, default=0.0, help='Base delay for retries (not used for initial checks) in seconds')
     parser.add_argument('--retries', type=int, default=3, help='Maximum retries on error')
+    parser.add_argument('--domain-budget', type=float, default=None,
+                        help='Maximum seconds spent on one domain, retries included')
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='Maximum seconds for the whole run; domains not reached are reported as unchecked')
+    parser.add_argument('--tier-metrics', metavar='FILE',
+                        help='Write per-tier statistics and circuit breaker states to FILE as JSON')
+    parser.add_argument('--collapse-near-duplicates', action='store_true',
+                        help='Skip names that only differ from an earlier one by hyphens or a plural ending')
+    parser.add_argument('--aws-profiles', metavar='NAMES',
+                        help='Comma-separated AWS profiles to spread Route 53 checks over '
+                             '(default: $DOMAIN_CHECK_AWS_PROFILES, else the default credentials)')
+    parser.add_argument('--dns-transport', choices=('multiplexed', 'tls', 'dnspython'), default=None,
+                        help='How DNS queries are sent: one multiplexed UDP socket with TCP or DNS-over-TLS '
+                             'fallback, or a dnspython resolver per query (default: $DOMAIN_CHECK_DNS_TRANSPORT, '
+                             'else multiplexed)')
+    parser.add_argument('--cache-only', action='store_true',
+                        help='Answer from verdicts recorded by earlier searches and the watchlist; check nothing')
+    fast_group = parser.add_argument_group('fast triage')
+    fast_group.add_argument('--fast', action='store_true',
+                            help='Answer from DNS and recorded verdicts only: taken, likely available or likely taken, '
+                                 'with a confidence calibrated against past Route 53 and WHOIS verdicts')
+    fast_group.add_argument('--confirm-top', type=int, default=0, metavar='N',
+                            help='Confirm the N most promising likely-available domains with the full checks')
+    fast_group.add_argument('--min-confidence', type=float, default=0.5,
+                            help='Confidence from which a domain is reported as likely available')
+    fast_group.add_argument('--dns-concurrency', type=int, default=None, metavar='N',
+                            help='DNS lookups in flight (default: 2048, or 64 threads with --dns-transport dnspython)')
+    fast_group.add_argument('--calibrate', action='store_true',
+                            help='First calibrate against recorded verdicts of the last 30 days (one DNS lookup each)')
+    daemon_group = parser.add_argument_group('checker daemon')
+    daemon_group.add_argument('--use-daemon', action='store_true',
+                              help='Ask a running checker_daemon.py instead of checking in this process '
+                                   '(falls back to local checking if none is running)')
+    daemon_group.add_argument('--socket', default=None, help='Daemon socket path (default: .cache/checker.sock)')
+    queue_group = parser.add_argument_group('distributed checking')
+    queue_group.add_argument('--queue', metavar='DB',
+                             help='SQLite job queue (on a shared volume for several hosts); submit domains to it')
+    queue_group.add_argument('--worker', action='store_true', help='Check chunks from --queue instead of submitting')
+    queue_group.add_argument('--exit-when-done', action='store_true',
+                             help='Worker exits once no chunk is pending or leased')
+    queue_group.add_argument('--spawn-workers', type=int, default=0, metavar='N',
+                             help='Also start N local worker processes for the submitted job')
+    queue_group.add_argument('--chunk-size', type=int, default=25, help='Domains per leased chunk')
+    queue_group.add_argument('--lease', type=float, default=120.0, help='Chunk lease length in seconds')
     args = parser.parse_args()
+    use_daemon = args.use_daemon and not (args.worker or args.queue or args.cache_only or args.fast)
+    if not (use_daemon or args.cache_only):
+        _setup_logging()
+    if args.aws_profiles:
+        from domain_checker import configure_route53_pool
+        configure_route53_pool(args.aws_profiles.split(','))
+    if args.dns_transport:
+        from domain_checker import configure_dns_transport
+        configure_dns_transport(args.dns_transport)
+
+    if args.worker:
+        if not args.queue:
+            parser.error('--worker requires --queue')
+        from job_queue import JobQueue, run_worker
+
+        queue = JobQueue(args.queue, lease_seconds=args.lease)
+
+        def check(domain, cancel_event=None):
+            return check_domain_with_backoff(domain, args.delay, args.retries, cancel_event=cancel_event,
+                                             budget=args.domain_budget)
+
+        try:
+            run_worker(queue, check, exit_when_done=args.exit_when_done)
+        except KeyboardInterrupt:
+            print("\nInterrupted by user", file=sys.stderr)
+            return 130
+        return 0
     
     domains = args.domains
     if not domains:
@@ -123,15 +530,39 @@ def main() -> int:
         print("No domains provided.", file=sys.stderr)
         parser.print_help()
         return 1
-    
 
-    unique_domains = list(dict.fromkeys(domains))
-    if len(domains) != len(unique_domains):
-        print(f"Note: Removed {len(domains) - len(unique_domains)} duplicate domains.", file=sys.stderr)
-    
+    filtered = filter_candidates(domains, collapse_near_duplicates=args.collapse_near_duplicates)
+    unique_domains = filtered.accepted
+    duplicates = filtered.dropped.pop(DUPLICATE, [])
+    if duplicates:
+        print(f"Note: Removed {len(duplicates)} duplicate domains.", file=sys.stderr)
+    skipped = [d for dropped in filtered.dropped.values() for d in dropped]
+    invalid = [d for reason, dropped in filtered.dropped.items() if reason != NEAR_DUPLICATE for d in dropped]
+    for reason, dropped in filtered.dropped.items():
+        for domain in dropped:
+            print(f"{domain}: skipped ({reason.replace('_', ' ')})", file=sys.stderr)
+
     logger.info(f"Checking {len(unique_domains)} domain(s)")
     try:
-        results = check_domains(unique_domains, args.delay, args.retries)
+        results = None
+        if args.cache_only:
+            results = check_domains_cached(unique_domains)
+        elif args.fast:
+            results = check_domains_fast(unique_domains, args)
+        elif use_daemon:
+            from checker_daemon import DaemonUnavailable
+            try:
+                results = check_domains_daemon(unique_domains, args)
+            except DaemonUnavailable as e:
+                # Only pay for a log file when we end up checking locally
+                _setup_logging()
+                logger.info(f"{e}; checking locally")
+                print("Note: checker daemon unavailable, checking locally.", file=sys.stderr)
+        if results is None and args.queue:
+            results = check_domains_queued(unique_domains, args)
+        elif results is None:
+            results = check_domains(unique_domains, args.delay, args.retries,
+                                    domain_budget=args.domain_budget, time_budget=args.time_budget)
     except KeyboardInterrupt:
         print("\nInterrupted by user", file=sys.stderr)
         return 130
@@ -139,13 +570,27 @@ def main() -> int:
     available = [d for d, r in results.items() if r['status'] == 'available']
     taken = [d for d, r in results.items() if r['status'] == 'taken']
     errors = [d for d, r in results.items() if r['status'] == 'error']
+    unchecked = [d for d, r in results.items() if r['status'] == 'unchecked']
+    likely_available = [d for d, r in results.items() if r['status'] == 'likely_available']
+    likely_taken = [d for d, r in results.items() if r['status'] == 'likely_taken']
     
     print("\n=== Summary ===", file=sys.stderr)
     print(f"Available: {len(available)}", file=sys.stderr)
     print(f"Taken: {len(taken)}", file=sys.stderr)
+    if args.fast:
+        print(f"Likely available: {len(likely_available)}", file=sys.stderr)
+        print(f"Likely taken: {len(likely_taken)}", file=sys.stderr)
     print(f"Errors: {len(errors)}", file=sys.stderr)
+    if unchecked:
+        reason = 'no recorded verdict' if args.cache_only else 'time budget spent'
+        print(f"Unchecked ({reason}): {len(unchecked)}", file=sys.stderr)
+    if skipped:
+        print(f"Skipped: {len(skipped)}", file=sys.stderr)
+    # Tier and breaker stats only exist if this process checked anything itself
+    if 'domain_checker' in sys.modules:
+        print_checker_stats(args.tier_metrics)
     
-    if errors:
+    if errors or invalid or unchecked:
         return 1
     return 0
 
@@ -0,0 +1,249 @@
+#!/usr/bin/env uv run --script
+"""
+Long-running domain checker that serves requests over a Unix socket.
+
+Keeps the checking libraries imported, the Route 53 client built, the rate
+limiter, tier statistics and circuit breakers warm, and recent verdicts
+cached, so `check_domain.py --use-daemon` answers in milliseconds.
+
+Usage:
+    ./checker_daemon.py [--socket PATH] [--workers 8]
+
+Protocol: one JSON object per line in each direction.
+    {"op": "check", "domains": ["a.com"], "budget": 10, "domain_budget": 5}
+        -> {"results": [{"domain": "a.com", "available": true, "status": "available", "cached": false}]}
+    {"op": "stats"}     -> verdict cache, tier and circuit breaker statistics
+    {"op": "ping"}      -> {"ok": true}
+    {"op": "shutdown"}  -> {"ok": true}, then the daemon exits
+
+Clients import this module for request_daemon and check_via_daemon only, so
+the checker stack is imported by the server side when it starts.
+"""
+
+import sys
+import os
+import json
+import signal
+import socket
+import socketserver
+import argparse
+import functools
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from verdict_cache import VerdictCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class DaemonUnavailable(Exception):
+    """Raised by the client when no daemon answers on the socket, or it cannot serve the request."""
+
+
+def default_socket_path() -> str:
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, '.cache', 'checker.sock')
+
+
+class CheckerService:
+    """Answers check requests from the verdict cache, checking misses concurrently."""
+
+    def __init__(self, workers: int = 8, cache: Optional['VerdictCache'] = None,
+                 domain_budget: Optional[float] = None):
+        from verdict_cache import VerdictCache
+
+        self.workers = workers
+        self.cache = cache or VerdictCache()
+        self.domain_budget = domain_budget
+        self.requests = 0
+
+    def _check(self, domain, cancel_event=None, domain_budget: Optional[float] = None):
+        from domain_checker import check_domain_availability
+        budget = self.domain_budget if domain_budget is None else domain_budget
+        return check_domain_availability(domain, cancel_event=cancel_event, budget=budget)
+
+    def check(self, domains: List[str], time_budget: Optional[float] = None,
+              domain_budget: Optional[float] = None) -> List[Dict]:
+        """Verdicts in request order; domain_budget overrides the daemon's --domain-budget."""
+        results: Dict[str, Dict] = {}
+        misses = []
+        for domain in dict.fromkeys(domains):
+            cached = self.cache.get(domain)
+            if cached is not None:
+                results[domain] = {'domain': domain, 'available': cached[0], 'status': cached[1], 'cached': True}
+            else:
+                misses.append(domain)
+        if misses:
+            from domain_checker import check_domains_until
+            check = functools.partial(self._check, domain_budget=domain_budget)
+            verdicts, remaining = check_domains_until(misses, max_workers=self.workers, check=check,
+                                                      time_budget=time_budget)
+            for domain, (is_available, status) in verdicts.items():
+                self.cache.put(domain, is_available, status)
+                results[domain] = {'domain': domain, 'available': is_available, 'status': status, 'cached': False}
+            for domain in remaining:
+                results[domain] = {'domain': domain, 'available': None, 'status': 'unchecked', 'cached': False}
+        return [results[domain] for domain in dict.fromkeys(domains)]
+
+    def stats(self) -> Dict:
+        from domain_checker import BREAKERS, TIER_SCHEDULER, route53_pool
+        return {
+            'requests': self.requests,
+            'verdict_cache': self.cache.stats(),
+            'tiers': TIER_SCHEDULER.snapshot(),
+            'breakers': BREAKERS.snapshot(),
+            'route53_accounts': route53_pool().snapshot(),
+        }
+
+    def handle(self, request: Dict) -> Dict:
+        self.requests += 1
+        op = request.get('op', 'check')
+        if op == 'check':
+            domains = request.get('domains')
+            if not isinstance(domains, list) or not all(isinstance(d, str) for d in domains):
+                return {'error': "'domains' must be a list of strings"}
+            return {'results': self.check([d.strip().lower() for d in domains], request.get('budget'),
+                                          request.get('domain_budget'))}
+        if op == 'stats':
+            return self.stats()
+        if op in ('ping', 'shutdown'):
+            return {'ok': True}
+        return {'error': f"unknown op: {op}"}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = self.server.service.handle(request)
+            except ValueError:
+                request, response = {}, {'error': 'invalid JSON'}
+            except Exception as e:
+                logger.error(f"Error handling daemon request: {e}", exc_info=True)
+                request, response = {}, {'error': str(e)}
+            self.wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+            self.wfile.flush()
+            if request.get('op') == 'shutdown':
+                logger.info("Shutdown requested by client")
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class CheckerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, service: CheckerService):
+        self.service = service
+        self.socket_path = socket_path
+        _remove_stale_socket(socket_path)
+        super().__init__(socket_path, _RequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """Remove a socket file left by a daemon that died; refuse to start if one is running."""
+    if not os.path.exists(socket_path):
+        return
+    try:
+        request_daemon({'op': 'ping'}, socket_path, timeout=1.0)
+    except DaemonUnavailable:
+        os.remove(socket_path)
+        return
+    raise RuntimeError(f"A checker daemon is already listening on {socket_path}")
+
+
+def request_daemon(request: Dict, socket_path: Optional[str] = None, timeout: Optional[float] = None) -> Dict:
+    """Send one request to the daemon and return its response."""
+    socket_path = socket_path or default_socket_path()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1.0)
+            sock.connect(socket_path)
+            sock.settimeout(timeout)
+            sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+            with sock.makefile('rb') as reader:
+                line = reader.readline()
+    except OSError as e:
+        raise DaemonUnavailable(f"No checker daemon on {socket_path}: {e}") from None
+    if not line:
+        raise DaemonUnavailable(f"Checker daemon on {socket_path} closed the connection")
+    try:
+        return json.loads(line)
+    except ValueError:
+        raise DaemonUnavailable(f"Checker daemon on {socket_path} sent an invalid response") from None
+
+
+def check_via_daemon(domains: List[str], socket_path: Optional[str] = None,
+                     budget: Optional[float] = None, domain_budget: Optional[float] = None) -> List[Dict]:
+    """Check domains on the daemon; raises DaemonUnavailable if it is not running or reports an error."""
+    response = request_daemon({'op': 'check', 'domains': domains, 'budget': budget, 'domain_budget': domain_budget},
+                              socket_path, timeout=None if budget is None else budget + 10.0)
+    if 'error' in response:
+        raise DaemonUnavailable(f"Checker daemon error: {response['error']}")
+    return response['results']
+
+
+def main() -> int:
+    """Main entry point."""
+
+    parser = argparse.ArgumentParser(description='Serve domain checks over a Unix socket.')
+    parser.add_argument('--socket', default=None, help='Socket path (default: .cache/checker.sock)')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent checks per request')
+    parser.add_argument('--domain-budget', type=float, default=None, help='Maximum seconds spent on one domain')
+    parser.add_argument('--available-ttl', type=float, default=600.0,
+                        help="Seconds an 'available' verdict is served from memory")
+    parser.add_argument('--taken-ttl', type=float, default=86400.0, help="Seconds a 'taken' verdict is served from memory")
+    args = parser.parse_args()
+
+    from domain_checker import warm_up
+    from logging_config import setup_logging
+    from verdict_cache import VerdictCache
+
+    try:
+        logger_instance, log_file = setup_logging()
+        logger.info(f"Logging to {log_file}")
+    except Exception as e:
+        print(f"Warning: Failed to set up logging: {e}", file=sys.stderr)
+
+    socket_path = args.socket or default_socket_path()
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    warm_up()
+    service = CheckerService(workers=args.workers, domain_budget=args.domain_budget,
+                             cache=VerdictCache({'available': args.available_ttl, 'taken': args.taken_ttl}))
+    try:
+        server = CheckerServer(socket_path, service)
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    logger.info(f"Checker daemon listening on {socket_path}")
+    print(f"Listening on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info("Checker daemon stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Stops calling a backend that keeps failing, and probes it until it recovers.
+
+    Closed: calls go through; failure_threshold consecutive failures open it.
+    Open: allow() refuses calls, so callers fail over at once instead of
+    waiting for timeouts and back-offs. After reset_timeout one probe call is
+    let through (half-open); its success closes the breaker, its failure
+    opens it for another reset_timeout.
+
+    Callers must report every allowed call with record_success or
+    record_failure; a probe that is never reported is considered lost after
+    reset_timeout and another one is allowed.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.successes = 0
+        self.total_failures = 0
+        self.times_opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            probe_due = (self._probe_started is None and now - self._opened_at >= self.reset_timeout) or \
+                (self._probe_started is not None and now - self._probe_started >= self.reset_timeout)
+            if probe_due:
+                if self.state == OPEN:
+                    logger.info(f"Circuit {self.name} half-open, sending a probe")
+                self.state = HALF_OPEN
+                self._probe_started = now
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            self.failures = 0
+            if self.state != CLOSED:
+                logger.info(f"Circuit {self.name} closed, backend recovered")
+            self.state = CLOSED
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self.total_failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                if self.state == CLOSED:
+                    self.times_opened += 1
+                    logger.warning(f"Circuit {self.name} opened after {self.failures} consecutive failures")
+                else:
+                    logger.info(f"Circuit {self.name} probe failed, staying open")
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'failures': self.total_failures,
+                'successes': self.successes,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+            }
+
+
+class BreakerRegistry:
+    """Circuit breakers by backend name, created on first use."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, self.failure_threshold, self.reset_timeout)
+                self._breakers[name] = breaker
+            return breaker
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in sorted(breakers.items())}
+
+    def summary_lines(self) -> List[str]:
+        lines = []
+        for name, s in self.snapshot().items():
+            line = f"{name}: {s['state']}, {s['successes']} ok, {s['failures']} failed"
+            if s['times_opened']:
+                line += f", opened {s['times_opened']}x, {s['rejected']} calls skipped"
+            lines.append(line)
+        return lines
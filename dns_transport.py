@@ -0,0 +1,679 @@
+import heapq
+import logging
+import random
+import selectors
+import socket
+import ssl
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RECORD_TYPES = {'A': 1, 'NS': 2, 'CNAME': 5, 'SOA': 6, 'MX': 15, 'TXT': 16, 'AAAA': 28}
+
+# Response codes
+NOERROR = 0
+SERVFAIL = 2
+NXDOMAIN = 3
+REFUSED = 5
+
+# Header flags
+_QR = 0x8000
+_TC = 0x0200
+_RD = 0x0100
+
+_HEADER = struct.Struct('!HHHHHH')
+_LENGTH = struct.Struct('!H')
+
+# EDNS0 UDP payload size; large enough that truncation is rare, small enough to avoid fragmentation
+EDNS_PAYLOAD = 1232
+_OPT_RECORD = b'\x00' + struct.pack('!HHIH', 41, EDNS_PAYLOAD, 0, 0)
+
+# Query IDs are 16 bits and unique across the UDP sockets, so only this many queries can be told apart
+_MAX_IDS = 65536
+
+# Unpredictable IDs, so an off-path sender cannot guess which answer a query will accept
+_ID_RANDOM = random.SystemRandom()
+
+# A resolver's UDP loss rate is judged over windows of this many seconds, once it has this many outcomes
+_LOSS_WINDOW = 2.0
+_LOSS_MIN_SAMPLES = 32
+
+
+class DNSError(Exception):
+    """A query that got no usable answer."""
+
+
+class DNSTimeout(DNSError):
+    """No answer arrived before the query's timeout."""
+
+
+class DNSClosed(DNSError):
+    """The transport was closed before an answer arrived."""
+
+
+class DNSNameError(DNSError, ValueError):
+    """The name (or record type) cannot be put in a query; no resolver was asked."""
+
+
+class Answer(NamedTuple):
+    """A resolver's response: its rcode, how many answer records it had, and how it came."""
+    rcode: int
+    count: int
+    via: str
+
+
+def encode_name(name: str) -> bytes:
+    """Wire format of a domain name (which must already be ASCII/IDNA), lower-cased."""
+    try:
+        labels = name.strip('.').lower().encode('ascii').split(b'.')
+    except UnicodeError:
+        raise DNSNameError(f"Domain name is not ASCII: {name!r}") from None
+    wire = b''.join([bytes((len(label),)) + label for label in labels]) + b'\x00'
+    if len(wire) > 255 or not all(0 < len(label) <= 63 for label in labels):
+        raise DNSNameError(f"Invalid domain name: {name!r}")
+    return wire
+
+
+def build_query(qid: int, qname: bytes, qtype: int) -> bytes:
+    """A recursive query for one (name, type) with an EDNS0 OPT record."""
+    return _HEADER.pack(qid, _RD, 1, 0, 0, 1) + qname + struct.pack('!HH', qtype, 1) + _OPT_RECORD
+
+
+def parse_response(data: bytes) -> Tuple[int, int, bytes, int, int]:
+    """
+    (id, flags, question name, question type, answer count) of a response.
+
+    Only the header and question are decoded; that is all a verdict needs.
+    Raises ValueError on anything that is not a well-formed response.
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Short DNS message")
+    qid, flags, qdcount, ancount, _, _ = _HEADER.unpack_from(data)
+    if not flags & _QR or qdcount != 1:
+        raise ValueError("Not a response to a single question")
+    end = data.index(b'\x00', _HEADER.size) + 1
+    qname = data[_HEADER.size:end].lower()
+    if len(data) < end + 4:
+        raise ValueError("Truncated question")
+    qtype, = _LENGTH.unpack_from(data, end)
+    return qid, flags, qname, qtype, ancount
+
+
+# Called once per query with (answer, None) or (None, error)
+Callback = Callable[[Optional[Answer], Optional[DNSError]], None]
+
+
+def _future_callback(future: Future) -> Callback:
+    def callback(answer: Optional[Answer], error: Optional[DNSError]) -> None:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(answer)
+    return callback
+
+
+class _Query:
+    """One outstanding question and the callback its answer goes to."""
+
+    __slots__ = ('callback', 'done', 'qname', 'qtype', 'server', 'expires_at', 'qid', 'attempts', 'stream',
+                 'reconnects', 'udp')
+
+    def __init__(self, callback: Callback, qname: bytes, qtype: int, server: str, expires_at: float):
+        self.callback = callback
+        self.done = False
+        self.qname = qname
+        self.qtype = qtype
+        self.server = server
+        self.expires_at = expires_at
+        self.qid = -1
+        self.attempts = 0
+        self.stream: Optional['_StreamConnection'] = None
+        self.reconnects = 0
+        self.udp: Optional['_UDPSocket'] = None
+
+    def finish(self, answer: Optional[Answer] = None, error: Optional[DNSError] = None) -> None:
+        if self.done:
+            return
+        self.done = True
+        try:
+            self.callback(answer, error)
+        except Exception as e:
+            logger.error(f"DNS answer callback failed: {e}", exc_info=True)
+
+
+class _ServerState:
+    """Per-resolver UDP health: answers and losses in the current window, and until when to skip UDP."""
+
+    __slots__ = ('answered', 'lost', 'window_start', 'udp_blocked_until', 'stream')
+
+    def __init__(self):
+        self.answered = 0
+        self.lost = 0
+        self.window_start = time.monotonic()
+        self.udp_blocked_until = 0.0
+        self.stream: Optional['_StreamConnection'] = None
+
+
+class _UDPSocket:
+    """One of the transport's UDP sockets, on its own random port, and the packets waiting to go out on it."""
+
+    __slots__ = ('sock', 'backlog')
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        except OSError:
+            pass
+        # The kernel picks a random ephemeral port
+        self.sock.bind(('0.0.0.0', 0))
+        self.backlog: Deque[Tuple[bytes, Tuple[str, int]]] = deque()
+
+
+class _StreamConnection:
+    """
+    A persistent TCP or DNS-over-TLS connection to one resolver.
+
+    Queries are pipelined: each is written as soon as it is queued (up to
+    max_in_flight unanswered at a time), and answers are matched by ID in
+    whatever order they come back.
+    """
+
+    def __init__(self, transport: 'DNSTransport', server: str, port: int,
+                 tls_context: Optional[ssl.SSLContext], max_in_flight: int):
+        self.transport = transport
+        self.server = server
+        self.via = 'tls' if tls_context is not None else 'tcp'
+        self.tls_context = tls_context
+        self.max_in_flight = max_in_flight
+        self.pending: Dict[int, _Query] = {}
+        self.waiting: Deque[_Query] = deque()
+        self.outbuf = bytearray()
+        self.inbuf = bytearray()
+        self.state = 'connecting'
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setblocking(False)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.connect_ex((server, port))
+        transport._selector.register(self.sock, selectors.EVENT_WRITE, self)
+
+    def submit(self, query: _Query) -> None:
+        query.stream = self
+        if len(self.pending) >= self.max_in_flight:
+            self.waiting.append(query)
+            return
+        qid = self.transport._free_id(self.pending)
+        query.qid = qid
+        self.pending[qid] = query
+        packet = build_query(qid, query.qname, query.qtype)
+        self.outbuf += _LENGTH.pack(len(packet)) + packet
+        if self.state == 'open':
+            self._flush()
+
+    def forget(self, query: _Query) -> None:
+        if self.pending.get(query.qid) is query:
+            del self.pending[query.qid]
+            self._refill()
+
+    def _refill(self) -> None:
+        while self.waiting and len(self.pending) < self.max_in_flight:
+            query = self.waiting.popleft()
+            if not query.done:
+                self.submit(query)
+
+    def _events(self) -> int:
+        if self.state in ('connecting', 'want_write'):
+            return selectors.EVENT_WRITE
+        if self.state == 'open' and self.outbuf:
+            return selectors.EVENT_READ | selectors.EVENT_WRITE
+        return selectors.EVENT_READ
+
+    def _update_events(self) -> None:
+        if self.state != 'closed':
+            self.transport._selector.modify(self.sock, self._events(), self)
+
+    def handle(self, mask: int) -> None:
+        try:
+            if self.state == 'connecting':
+                error = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if error:
+                    raise OSError(error, f"connect to {self.server} failed")
+                if self.tls_context is not None:
+                    self.sock = self.tls_context.wrap_socket(self.sock, server_hostname=self.server,
+                                                             do_handshake_on_connect=False)
+                    self.transport._selector.modify(self.sock, selectors.EVENT_READ, self)
+                    self.state = 'handshake'
+                else:
+                    self.state = 'open'
+            if self.state in ('handshake', 'want_write'):
+                try:
+                    self.sock.do_handshake()
+                    self.state = 'open'
+                except ssl.SSLWantReadError:
+                    self.state = 'handshake'
+                except ssl.SSLWantWriteError:
+                    self.state = 'want_write'
+            if self.state == 'open':
+                if mask & selectors.EVENT_READ:
+                    self._read()
+                self._flush()
+            self._update_events()
+        except (OSError, ssl.SSLError, ValueError) as e:
+            self.close(e)
+
+    def _flush(self) -> None:
+        while self.outbuf:
+            try:
+                sent = self.sock.send(self.outbuf)
+            except (BlockingIOError, ssl.SSLWantWriteError, ssl.SSLWantReadError):
+                break
+            del self.outbuf[:sent]
+        if self.state == 'open':
+            self._update_events()
+
+    def _read(self) -> None:
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, ssl.SSLWantReadError, ssl.SSLWantWriteError):
+                break
+            if not data:
+                raise OSError(f"{self.via.upper()} connection to {self.server} closed")
+            self.inbuf += data
+        while len(self.inbuf) >= 2:
+            length, = _LENGTH.unpack_from(self.inbuf)
+            if len(self.inbuf) < 2 + length:
+                break
+            message = bytes(self.inbuf[2:2 + length])
+            del self.inbuf[:2 + length]
+            qid, flags, qname, qtype, ancount = parse_response(message)
+            query = self.pending.get(qid)
+            if query is None or query.qname != qname or query.qtype != qtype:
+                continue
+            del self.pending[qid]
+            query.finish(Answer(flags & 0x000F, ancount, self.via))
+        self._refill()
+
+    def close(self, error: Optional[Exception] = None) -> None:
+        """Drop the connection; queries still waiting on it are sent again on a new one (once)."""
+        if self.state == 'closed':
+            return
+        self.state = 'closed'
+        try:
+            self.transport._selector.unregister(self.sock)
+        except (KeyError, ValueError):
+            pass
+        self.sock.close()
+        state = self.transport._servers.get(self.server)
+        if state is not None and state.stream is self:
+            state.stream = None
+        orphans = list(self.pending.values()) + list(self.waiting)
+        self.pending.clear()
+        self.waiting.clear()
+        if error is not None and orphans:
+            logger.debug(f"{self.via.upper()} connection to {self.server} lost with {len(orphans)} queries: {error}")
+        for query in orphans:
+            if query.done:
+                continue
+            if error is None:
+                # Only the transport closes a connection without an error
+                query.finish(error=DNSClosed("DNS transport is closed"))
+                continue
+            if query.reconnects >= 1:
+                query.finish(error=DNSError(f"{self.via.upper()} connection to {self.server} lost: {error}"))
+                continue
+            query.reconnects += 1
+            self.transport._send_stream(query)
+
+
+class DNSTransport:
+    """
+    Multiplexed DNS client: thousands of queries in flight on a few UDP sockets.
+
+    A single I/O thread owns `udp_sockets` UDP sockets, each on its own
+    random port, and a selector. Every query goes out on a randomly chosen
+    socket with a free, unpredictable 16-bit ID, and is matched to its
+    response by ID, question name and type, the socket it was sent on and
+    the resolver address and port it was sent to, so late, stray and
+    spoofed packets are dropped. Unanswered UDP queries are retransmitted after `retransmit`
+    seconds, doubling each time, until their timeout. A truncated response
+    moves the query to a persistent pipelined TCP connection to the same
+    resolver (DNS over TLS with stream='tls'). REFUSED over UDP, or losing
+    more than udp_loss_threshold of the UDP queries to a resolver over a
+    couple of seconds, reads as UDP rate limiting and
+    moves all of that resolver's queries there for fallback_seconds.
+
+    query() returns a concurrent.futures.Future that resolves to an Answer
+    or raises DNSError, or calls a callback instead, which saves the Future
+    when many lookups are driven from callbacks; resolve() blocks. Futures
+    and callbacks complete on the I/O thread, so callbacks must be quick.
+    Safe to share between threads.
+    """
+
+    def __init__(self, port: int = 53, stream: str = 'tcp', tls_port: int = 853, retransmit: float = 0.8,
+                 udp_loss_threshold: float = 0.25, fallback_seconds: float = 60.0,
+                 max_in_flight: int = 32768, stream_in_flight: int = 128,
+                 tls_context: Optional[ssl.SSLContext] = None, udp_sockets: int = 4):
+        if stream not in ('tcp', 'tls'):
+            raise ValueError(f"stream must be 'tcp' or 'tls', not {stream!r}")
+        self.port = port
+        self.stream = stream
+        self.stream_port = tls_port if stream == 'tls' else port
+        self.retransmit = retransmit
+        self.udp_loss_threshold = udp_loss_threshold
+        self.fallback_seconds = fallback_seconds
+        self.max_in_flight = min(max_in_flight, _MAX_IDS // 2)
+        self.stream_in_flight = stream_in_flight
+        self.tls_context = (tls_context or ssl.create_default_context()) if stream == 'tls' else None
+        self.counters = dict.fromkeys(('queries', 'udp_sent', 'retransmits', 'truncated', 'stream_fallbacks',
+                                       'timeouts', 'answers'), 0)
+        self._servers: Dict[str, _ServerState] = {}
+        self._udp_pending: Dict[int, _Query] = {}
+        self._udp_waiting: Deque[_Query] = deque()
+        self._timers: List[Tuple[float, int, _Query, int]] = []
+        self._timer_seq = 0
+        self._incoming: Deque[_Query] = deque()
+        self._incoming_lock = threading.Lock()
+        self._wake_pending = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._selector = selectors.DefaultSelector()
+        self._udp = [_UDPSocket() for _ in range(max(1, udp_sockets))]
+        for udp in self._udp:
+            self._selector.register(udp.sock, selectors.EVENT_READ, udp)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, 'wake')
+
+    # Public API, any thread
+
+    def query(self, name: str, rdtype: str, server: str, timeout: float = 5.0,
+              callback: Optional[Callback] = None) -> Optional[Future]:
+        """
+        Send one question to one resolver (an IPv4 address).
+
+        Returns a Future of the Answer, which raises DNSError on failure. With
+        a callback no Future is made: callback(answer, error) is called once,
+        on the I/O thread (or right away for a name that cannot be queried),
+        and None is returned.
+        """
+        future = None
+        if callback is None:
+            future = Future()
+            future.set_running_or_notify_cancel()
+            callback = _future_callback(future)
+        try:
+            query = _Query(callback, encode_name(name), RECORD_TYPES[rdtype], server,
+                           time.monotonic() + max(0.0, timeout))
+        except KeyError:
+            callback(None, DNSNameError(f"Unsupported record type {rdtype!r}"))
+            return future
+        except DNSNameError as e:
+            callback(None, e)
+            return future
+        with self._incoming_lock:
+            closed = self._closed
+            if not closed:
+                self._incoming.append(query)
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='dns-transport', daemon=True)
+                    self._thread.start()
+                wake, self._wake_pending = not self._wake_pending, True
+        if closed:
+            query.finish(error=DNSClosed("DNS transport is closed"))
+        elif wake:
+            self._wake_w.send(b'\x00')
+        return future
+
+    def resolve(self, name: str, rdtype: str, server: str, timeout: float = 5.0) -> Answer:
+        return self.query(name, rdtype, server, timeout).result()
+
+    def close(self) -> None:
+        """Stop the I/O thread; queries still in flight fail with DNSError."""
+        with self._incoming_lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        self._wake_w.send(b'\x00')
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        else:
+            self._shutdown()
+
+    def stats(self) -> Dict:
+        return {**self.counters, 'in_flight': len(self._udp_pending),
+                'streams': sorted(s for s, state in self._servers.items() if state.stream is not None),
+                'udp_fallback': sorted(s for s, state in self._servers.items()
+                                       if state.udp_blocked_until > time.monotonic())}
+
+    # I/O thread
+
+    def _run(self) -> None:
+        try:
+            while True:
+                timeout = None
+                if self._timers:
+                    timeout = max(0.0, self._timers[0][0] - time.monotonic())
+                for key, mask in self._selector.select(timeout):
+                    if isinstance(key.data, _UDPSocket):
+                        if mask & selectors.EVENT_READ:
+                            self._read_udp(key.data)
+                        if mask & selectors.EVENT_WRITE:
+                            self._flush_udp(key.data)
+                    elif key.data == 'wake':
+                        self._drain_wakeups()
+                    else:
+                        key.data.handle(mask)
+                if self._closed:
+                    break
+                self._take_incoming()
+                self._run_timers()
+                self._refill_udp()
+        except Exception as e:
+            logger.error(f"DNS transport I/O loop failed: {e}", exc_info=True)
+        finally:
+            self._shutdown()
+
+    def _shutdown(self) -> None:
+        with self._incoming_lock:
+            self._closed = True
+            leftovers = list(self._incoming)
+            self._incoming.clear()
+        leftovers += list(self._udp_pending.values()) + list(self._udp_waiting)
+        self._udp_pending.clear()
+        self._udp_waiting.clear()
+        for state in self._servers.values():
+            if state.stream is not None:
+                state.stream.close()
+        for query in leftovers:
+            query.finish(error=DNSClosed("DNS transport is closed"))
+        try:
+            self._selector.close()
+        except (OSError, RuntimeError):
+            pass
+        for sock in [udp.sock for udp in self._udp] + [self._wake_r, self._wake_w]:
+            sock.close()
+
+    def _drain_wakeups(self) -> None:
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _take_incoming(self) -> None:
+        with self._incoming_lock:
+            queries, self._incoming = self._incoming, deque()
+            self._wake_pending = False
+        now = time.monotonic()
+        for query in queries:
+            self.counters['queries'] += 1
+            state = self._servers.get(query.server)
+            if state is None:
+                state = self._servers[query.server] = _ServerState()
+            if state.udp_blocked_until > now:
+                self._send_stream(query)
+            else:
+                self._send_udp(query)
+
+    def _free_id(self, used: Dict[int, _Query]) -> int:
+        qid = _ID_RANDOM.getrandbits(16)
+        while qid in used:
+            qid = _ID_RANDOM.getrandbits(16)
+        return qid
+
+    def _schedule(self, when: float, query: _Query) -> None:
+        self._timer_seq += 1
+        heapq.heappush(self._timers, (when, self._timer_seq, query, query.attempts))
+
+    def _send_udp(self, query: _Query) -> None:
+        if len(self._udp_pending) >= self.max_in_flight:
+            self._udp_waiting.append(query)
+            return
+        query.qid = self._free_id(self._udp_pending)
+        query.udp = _ID_RANDOM.choice(self._udp)
+        self._udp_pending[query.qid] = query
+        self._transmit(query)
+
+    def _transmit(self, query: _Query) -> None:
+        packet = build_query(query.qid, query.qname, query.qtype)
+        address = (query.server, self.port)
+        udp = query.udp
+        self.counters['udp_sent'] += 1
+        if udp.backlog:
+            udp.backlog.append((packet, address))
+        else:
+            try:
+                udp.sock.sendto(packet, address)
+            except (BlockingIOError, InterruptedError):
+                udp.backlog.append((packet, address))
+                self._selector.modify(udp.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, udp)
+            except OSError as e:
+                self._release_udp(query)
+                query.finish(error=DNSError(f"UDP send to {query.server} failed: {e}"))
+                return
+        interval = self.retransmit * (2 ** query.attempts)
+        self._schedule(min(time.monotonic() + interval, query.expires_at), query)
+
+    def _flush_udp(self, udp: _UDPSocket) -> None:
+        while udp.backlog:
+            packet, address = udp.backlog[0]
+            try:
+                udp.sock.sendto(packet, address)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logger.debug(f"UDP send to {address[0]} failed: {e}")
+            udp.backlog.popleft()
+        self._selector.modify(udp.sock, selectors.EVENT_READ, udp)
+
+    def _release_udp(self, query: _Query) -> None:
+        if self._udp_pending.get(query.qid) is query:
+            del self._udp_pending[query.qid]
+
+    def _refill_udp(self) -> None:
+        # Freed slots are refilled once per loop pass, so packets go out in bursts rather than one per answer
+        while self._udp_waiting and len(self._udp_pending) < self.max_in_flight:
+            waiting = self._udp_waiting.popleft()
+            if not waiting.done:
+                self._send_udp(waiting)
+
+    def _read_udp(self, udp: _UDPSocket) -> None:
+        while True:
+            try:
+                data, address = udp.sock.recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                # e.g. ICMP port unreachable reported on the next read; the retransmit timer handles it
+                logger.debug(f"UDP receive failed: {e}")
+                continue
+            try:
+                qid, flags, qname, qtype, ancount = parse_response(data)
+            except ValueError:
+                continue
+            query = self._udp_pending.get(qid)
+            if (query is None or query.udp is not udp or address != (query.server, self.port)
+                    or query.qname != qname or query.qtype != qtype):
+                continue
+            self._release_udp(query)
+            state = self._servers[query.server]
+            state.answered += 1
+            rcode = flags & 0x000F
+            if flags & _TC:
+                self.counters['truncated'] += 1
+                self._send_stream(query)
+            elif rcode == REFUSED:
+                self._fall_back(query.server, 'refused UDP')
+                self._send_stream(query)
+            else:
+                self.counters['answers'] += 1
+                query.finish(Answer(rcode, ancount, 'udp'))
+
+    def _fall_back(self, server: str, reason: str) -> None:
+        state = self._servers[server]
+        if state.udp_blocked_until <= time.monotonic():
+            logger.info(f"Resolver {server} {reason}; using {self.stream.upper()} for {self.fallback_seconds:.0f}s")
+        state.udp_blocked_until = time.monotonic() + self.fallback_seconds
+        # UDP gets a clean slate when it is tried again
+        state.answered = state.lost = 0
+        state.window_start = time.monotonic()
+
+    def _lost_udp(self, server: str, state: _ServerState, now: float) -> bool:
+        """Count a lost UDP packet; True if the resolver has just been moved to the stream transport."""
+        if now - state.window_start > _LOSS_WINDOW:
+            state.answered = state.lost = 0
+            state.window_start = now
+        state.lost += 1
+        total = state.answered + state.lost
+        if total >= _LOSS_MIN_SAMPLES and state.lost / total > self.udp_loss_threshold:
+            self._fall_back(server, f"lost {state.lost} of its last {total} UDP queries")
+            return True
+        return False
+
+    def _send_stream(self, query: _Query) -> None:
+        self.counters['stream_fallbacks'] += 1
+        state = self._servers[query.server]
+        if state.stream is None:
+            try:
+                state.stream = _StreamConnection(self, query.server, self.stream_port, self.tls_context,
+                                                 self.stream_in_flight)
+            except OSError as e:
+                query.finish(error=DNSError(f"{self.stream.upper()} connection to {query.server} failed: {e}"))
+                return
+        # Attempts advance so timers set for UDP retransmits no longer apply
+        query.attempts += 1
+        state.stream.submit(query)
+        self._schedule(query.expires_at, query)
+
+    def _run_timers(self) -> None:
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            _, _, query, attempts = heapq.heappop(self._timers)
+            if query.done or attempts != query.attempts:
+                continue
+            if now >= query.expires_at:
+                self.counters['timeouts'] += 1
+                if query.stream is not None:
+                    query.stream.forget(query)
+                else:
+                    self._release_udp(query)
+                    self._lost_udp(query.server, self._servers[query.server], now)
+                query.finish(error=DNSTimeout(f"No answer from {query.server}"))
+                continue
+            # A UDP packet (or its answer) was lost
+            state = self._servers[query.server]
+            query.attempts += 1
+            if state.udp_blocked_until > now or self._lost_udp(query.server, state, now):
+                self._release_udp(query)
+                self._send_stream(query)
+                continue
+            self.counters['retransmits'] += 1
+            self._transmit(query)
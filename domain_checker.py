@@ -1,26 +1,480 @@
 import logging
+import math
+import os
+import threading
 import time
-from typing import Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from circuit_breaker import CLOSED, BreakerRegistry
+from tier_stats import CONCLUSIVE, FAILED, INCONCLUSIVE, TierScheduler
 
 logger = logging.getLogger(__name__)
 
-_last_aws_call_time = 0.0
+# One circuit breaker per backend (each resolver, Route 53, each WHOIS/RDAP server), shared process-wide
+BREAKERS = BreakerRegistry()
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            # Tokens earned so far accrue at the old rate
+            self._refill()
+            self.rate = rate
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def time_until_available(self, tokens: float = 1.0) -> float:
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                return 0.0
+            return (tokens - self._tokens) / self.rate if self.rate > 0 else float('inf')
 
-def _rate_limit_aws_calls(min_interval: float = 1.0) -> None:
-    """Ensure at least min_interval seconds between AWS Route 53 API calls."""
-    global _last_aws_call_time
-    now = time.time()
-    elapsed = now - _last_aws_call_time
-    if elapsed < min_interval:
-        sleep_time = min_interval - elapsed
-        logger.debug(f"Rate limiting AWS API calls: sleeping {sleep_time:.2f}s")
-        time.sleep(sleep_time)
-    _last_aws_call_time = time.time()
 
+class Deadline:
+    """
+    Cancellation token that also fires when its time runs out.
 
-def check_dns_records(domain: str, timeout: float = 5.0) -> Tuple[Optional[bool], str]:
+    Behaves like a threading.Event (is_set, set, wait), so it can be passed
+    anywhere a cancel_event is accepted. A deadline created with a parent
+    (an Event or another Deadline) is also set when the parent is, and never
+    outlives it. seconds=None means no time limit of its own.
     """
-    Check if a domain has any DNS records.
+
+    _POLL_INTERVAL = 0.1
+
+    def __init__(self, seconds: Optional[float] = None, parent=None):
+        self.expires_at = None if seconds is None else time.monotonic() + max(0.0, seconds)
+        self.parent = parent
+        self._event = threading.Event()
+
+    def remaining(self) -> float:
+        remaining = float('inf') if self.expires_at is None else max(0.0, self.expires_at - time.monotonic())
+        if isinstance(self.parent, Deadline):
+            remaining = min(remaining, self.parent.remaining())
+        return remaining
+
+    def timed_out(self) -> bool:
+        """True if this deadline's own time limit has passed (not a parent's)."""
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def parent_set(self) -> bool:
+        return self.parent is not None and self.parent.is_set()
+
+    def is_set(self) -> bool:
+        return self._event.is_set() or self.timed_out() or self.parent_set()
+
+    def set(self) -> None:
+        self._event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        end = None if timeout is None else time.monotonic() + timeout
+        while not self.is_set():
+            step = min(self._POLL_INTERVAL, self.remaining())
+            if end is not None:
+                step = min(step, end - time.monotonic())
+            if step <= 0:
+                break
+            self._event.wait(step)
+        return self.is_set()
+
+    def child(self, seconds: Optional[float] = None) -> 'Deadline':
+        return Deadline(seconds, parent=self)
+
+
+# Share of the remaining per-domain budget each tier may spend; unused time rolls over
+TIER_BUDGET_SHARE = {
+    'dns': 0.3,
+    'route53': 0.6,
+    'whois': 1.0,
+}
+
+
+def _tier_deadline(domain_deadline: Optional[Deadline], tier: str) -> Optional[Deadline]:
+    if domain_deadline is None:
+        return None
+    remaining = domain_deadline.remaining()
+    share = None if remaining == float('inf') else remaining * TIER_BUDGET_SHARE[tier]
+    return domain_deadline.child(share)
+
+
+def _tld_of(domain: str) -> str:
+    return domain.rstrip('.').rsplit('.', 1)[-1].lower()
+
+
+def _remaining(deadline: Optional[Deadline], default: float) -> float:
+    return default if deadline is None else min(default, deadline.remaining())
+
+
+def _run_with_timeout(func: Callable, timeout: float, *args):
+    """
+    Run a blocking call that has no timeout of its own on a daemon thread.
+
+    Returns (finished, result). If it does not finish in time the thread is
+    abandoned; it exits on its own once the call returns.
+    """
+    result = {}
+
+    def target():
+        try:
+            result['value'] = func(*args)
+        except BaseException as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=target, name=f"timeout-{getattr(func, '__name__', 'call')}", daemon=True)
+    thread.start()
+    thread.join(None if timeout == float('inf') else timeout)
+    if thread.is_alive():
+        return False, None
+    if 'error' in result:
+        raise result['error']
+    return True, result['value']
+
+
+def _cancelled(cancel_event: Optional[threading.Event]) -> bool:
+    return cancel_event is not None and cancel_event.is_set()
+
+
+def _sleep(seconds: float, cancel_event: Optional[threading.Event] = None) -> bool:
+    """Sleep for seconds; returns True if the sleep was cut short by cancellation."""
+    if cancel_event is None:
+        time.sleep(seconds)
+        return False
+    return cancel_event.wait(seconds)
+
+
+# Public resolvers, tried in order; each has its own circuit breaker
+DNS_RESOLVERS = ['8.8.8.8', '1.1.1.1', '9.9.9.9']
+RDAP_SERVER = 'rdap.org'
+
+
+# DNS signals: records prove registration; NXDOMAIN and an empty (NODATA) answer are only hints
+DNS_RECORDS = 'records'
+DNS_NXDOMAIN = 'nxdomain'
+DNS_NODATA = 'nodata'
+DNS_ERROR = 'error'
+
+
+# How DNS queries are sent: 'multiplexed' (dns_transport.DNSTransport, TCP fallback), 'tls' (the same with
+# DNS-over-TLS fallback) or 'dnspython' (a dnspython resolver and socket per query)
+DNS_TRANSPORT_ENV = 'DOMAIN_CHECK_DNS_TRANSPORT'
+DNS_TRANSPORT_MODES = ('multiplexed', 'tls', 'dnspython')
+_dns_transport = None
+_dns_transport_mode: Optional[str] = None
+_dns_transport_lock = threading.Lock()
+
+
+def configure_dns_transport(mode: str = 'multiplexed', **kwargs):
+    """
+    Choose how DNS queries are sent (see DNS_TRANSPORT_MODES). Extra arguments
+    go to DNSTransport, e.g. port. Returns the transport, or None for dnspython.
+    """
+    global _dns_transport, _dns_transport_mode
+    if mode not in DNS_TRANSPORT_MODES:
+        raise ValueError(f"Unknown DNS transport {mode!r}; expected one of {', '.join(DNS_TRANSPORT_MODES)}")
+    transport = None
+    if mode != 'dnspython':
+        from dns_transport import DNSTransport
+        transport = DNSTransport(stream='tls' if mode == 'tls' else 'tcp', **kwargs)
+    with _dns_transport_lock:
+        old, _dns_transport, _dns_transport_mode = _dns_transport, transport, mode
+    if old is not None:
+        old.close()
+    return transport
+
+
+def dns_transport():
+    """The process-wide DNSTransport (None with dnspython), chosen by $DOMAIN_CHECK_DNS_TRANSPORT on first use."""
+    with _dns_transport_lock:
+        transport, mode = _dns_transport, _dns_transport_mode
+    if mode is None:
+        transport = configure_dns_transport(os.environ.get(DNS_TRANSPORT_ENV) or 'multiplexed')
+    return transport
+
+
+class _TransportLookup:
+    """
+    One domain's DNS signal over the multiplexed transport, driven by callbacks.
+
+    A is asked first, since most names either do not exist or have an
+    address; only an empty answer sends the other record types, all at
+    once. Resolvers are tried in order behind their circuit breakers, as in
+    the dnspython path; a resolver that times out or whose connection fails
+    is charged and the next one is asked. A resolver that refuses the name
+    is passed over without a charge. Any other error rcode, such as
+    SERVFAIL, is an answer about the domain and ends the lookup.
+    """
+
+    def __init__(self, transport, domain: str, timeout: float, deadline: Optional[Deadline],
+                 on_done: Callable[[str], None]):
+        self.transport = transport
+        self.domain = domain
+        self.timeout = timeout
+        self.deadline = deadline
+        self.on_done = on_done
+        self.done = False
+        self._resolvers = iter(DNS_RESOLVERS)
+        self._nameserver = None
+        self._breaker = None
+        self._record_types: List[str] = []
+        self._outstanding = 0
+        self._generation = 0
+        # The transport calls back on the calling thread for a bad name or once closed, i.e. re-entrantly
+        self._lock = threading.RLock()
+
+    def start(self) -> None:
+        with self._lock:
+            self._next_resolver()
+
+    def _finish(self, signal: str) -> None:
+        if not self.done:
+            self.done = True
+            self.on_done(signal)
+
+    def _next_resolver(self) -> None:
+        for nameserver in self._resolvers:
+            breaker = BREAKERS.get(f"dns:{nameserver}")
+            if not breaker.allow():
+                logger.debug(f"Skipping resolver {nameserver} for {self.domain} (circuit open)")
+                continue
+            self._nameserver, self._breaker = nameserver, breaker
+            self._ask(['A'])
+            return
+        logger.warning(f"DNS check failed for {self.domain}: no resolver answered")
+        self._finish(DNS_ERROR)
+
+    def _ask(self, record_types: List[str]) -> None:
+        if self.deadline is not None and self.deadline.is_set():
+            logger.warning(f"DNS check for {self.domain} ran out of time")
+            self._finish(DNS_ERROR)
+            return
+        timeout = _remaining(self.deadline, self.timeout)
+        self._generation += 1
+        generation = self._generation
+        self._record_types = record_types
+        self._outstanding = len(record_types)
+        for record_type in record_types:
+            self.transport.query(self.domain, record_type, self._nameserver, timeout,
+                                 callback=lambda answer, error, generation=generation:
+                                 self._on_answer(answer, error, generation))
+
+    def _on_answer(self, answer, error, generation: int) -> None:
+        from dns_transport import NOERROR, NXDOMAIN, REFUSED, DNSClosed, DNSNameError
+        with self._lock:
+            if self.done or generation != self._generation:
+                return
+            self._outstanding -= 1
+            if isinstance(error, DNSNameError):
+                # Not the resolver's fault, and no other resolver will do better
+                logger.warning(f"Cannot look up {self.domain} in DNS: {error}")
+                self._finish(DNS_ERROR)
+                return
+            if isinstance(error, DNSClosed):
+                logger.warning(f"DNS check for {self.domain} stopped: {error}")
+                self._finish(DNS_ERROR)
+                return
+            if error is None and answer.rcode not in (NOERROR, NXDOMAIN):
+                # The resolver is up; it refused the name or the domain's own nameservers failed (SERVFAIL)
+                logger.warning(f"DNS check via {self._nameserver} failed for {self.domain}: rcode {answer.rcode}")
+                self._generation += 1
+                self._breaker.record_success()
+                if answer.rcode == REFUSED:
+                    self._next_resolver()
+                else:
+                    self._finish(DNS_ERROR)
+                return
+            if error is not None:
+                # Answers still due from this resolver are ignored
+                self._generation += 1
+                if self.deadline is not None and self.deadline.is_set():
+                    logger.warning(f"DNS check for {self.domain} ran out of time: {error}")
+                    self._finish(DNS_ERROR)
+                    return
+                self._breaker.record_failure()
+                logger.warning(f"DNS check via {self._nameserver} failed for {self.domain}: {error}")
+                self._next_resolver()
+                return
+            if answer.rcode == NXDOMAIN:
+                logger.debug(f"Domain {self.domain} has no DNS records (NXDOMAIN)")
+                signal = DNS_NXDOMAIN
+            elif answer.count:
+                logger.debug(f"Domain {self.domain} has DNS records")
+                signal = DNS_RECORDS
+            elif self._outstanding:
+                return
+            elif self._record_types == ['A']:
+                self._ask(['AAAA', 'MX', 'NS', 'CNAME', 'TXT', 'SOA'])
+                return
+            else:
+                logger.debug(f"Domain {self.domain} has no DNS records across all checked types")
+                signal = DNS_NODATA
+            self._generation += 1
+            self._breaker.record_success()
+            self._finish(signal)
+
+
+def dns_signal(domain: str, timeout: float = 5.0, deadline: Optional[Deadline] = None) -> str:
+    """
+    Ask the public resolvers what DNS says about a domain.
+
+    Each query waits at most `timeout` seconds, and all of them together stay
+    within `deadline`; running out of time is reported as an error. Resolvers
+    are asked one at a time: one that fails is skipped for the rest of this
+    check, and one whose circuit breaker is open is not asked at all.
+
+    Returns DNS_RECORDS if any record exists, DNS_NXDOMAIN if the name does
+    not exist, DNS_NODATA if it exists without any of the record types asked
+    for, and DNS_ERROR if no resolver answered. Queries go over the transport
+    chosen with configure_dns_transport().
+    """
+    transport = dns_transport()
+    if transport is None:
+        return _dns_signal_dnspython(domain, timeout, deadline)
+    future: Future = Future()
+    future.set_running_or_notify_cancel()
+    _TransportLookup(transport, domain, timeout, deadline, future.set_result).start()
+    return future.result()
+
+
+def _dns_signal_dnspython(domain: str, timeout: float = 5.0, deadline: Optional[Deadline] = None) -> str:
+    try:
+        import dns.resolver
+        from dns.resolver import NXDOMAIN, NoAnswer, NoNameservers, LifetimeTimeout
+    except ImportError:
+        logger.warning("dnspython library not installed. DNS checking disabled.")
+        return DNS_ERROR
+    
+    record_types = ["A", "AAAA", "MX", "NS", "CNAME", "TXT", "SOA"]
+
+    for nameserver in DNS_RESOLVERS:
+        breaker = BREAKERS.get(f"dns:{nameserver}")
+        if not breaker.allow():
+            logger.debug(f"Skipping resolver {nameserver} for {domain} (circuit open)")
+            continue
+        try:
+            resolver = dns.resolver.Resolver(configure=False)
+            resolver.timeout = timeout
+            resolver.lifetime = timeout
+            resolver.nameservers = [nameserver]
+
+            signal = DNS_NODATA
+            for record_type in record_types:
+                if deadline is not None:
+                    if deadline.is_set():
+                        logger.warning(f"DNS check for {domain} ran out of time before {record_type}")
+                        # Our budget ran out, not the resolver, so the breaker is not charged
+                        return DNS_ERROR
+                    resolver.lifetime = _remaining(deadline, timeout)
+                    resolver.timeout = resolver.lifetime
+                try:
+                    answers = resolver.resolve(domain, record_type, raise_on_no_answer=False)
+                    if len(answers) > 0:
+                        logger.debug(f"Domain {domain} has {record_type} DNS records")
+                        signal = DNS_RECORDS
+                        break
+                except NXDOMAIN:
+                    logger.debug(f"Domain {domain} has no DNS records (NXDOMAIN)")
+                    signal = DNS_NXDOMAIN
+                    break
+                except NoAnswer:
+                    continue
+            breaker.record_success()
+            if signal == DNS_NODATA:
+                logger.debug(f"Domain {domain} has no DNS records across all checked types")
+            return signal
+
+        except NoNameservers as e:
+            # The resolver answered (usually SERVFAIL): a problem with this domain's
+            # own nameservers, which says nothing about the resolver's health
+            breaker.record_success()
+            logger.warning(f"DNS check via {nameserver} failed for {domain}: {e}")
+            return DNS_ERROR
+        except LifetimeTimeout as e:
+            if deadline is not None and deadline.is_set():
+                logger.warning(f"DNS check for {domain} ran out of time: {e}")
+                return DNS_ERROR
+            breaker.record_failure()
+            logger.warning(f"DNS check via {nameserver} failed for {domain}: {e}")
+        except Exception as e:
+            breaker.record_failure()
+            logger.error(f"Unexpected error in DNS check for {domain} via {nameserver}: {e}", exc_info=True)
+
+    logger.warning(f"DNS check failed for {domain}: no resolver answered")
+    return DNS_ERROR
+
+
+def dns_signals(domains: Iterable[str], timeout: float = 5.0, deadline: Optional[Deadline] = None,
+                concurrency: Optional[int] = None) -> Dict[str, str]:
+    """
+    DNS signals for many domains, as {domain: signal}.
+
+    Over the multiplexed transport up to `concurrency` lookups (default 2048)
+    are in flight at once from this thread; with dnspython they run on that
+    many worker threads (default 64). Domains not reached before `deadline`,
+    or cut short by it, are left out.
+    """
+    results: Dict[str, str] = {}
+    transport = dns_transport()
+    if transport is None:
+        def probe(domain: str, cancel_event=None) -> Tuple[Optional[bool], str]:
+            signal = _dns_signal_dnspython(domain, timeout, cancel_event)
+            return None, 'unchecked' if signal == DNS_ERROR and cancel_event.is_set() else signal
+
+        signals, _ = check_domains_until(domains, max_workers=concurrency or 64, check=probe,
+                                         time_budget=None if deadline is None else deadline.remaining())
+        return {domain: signal for domain, (_, signal) in signals.items()}
+
+    limit = concurrency or 2048
+    in_flight = 0
+    finished = threading.Condition()
+
+    def collect(domain: str, signal: str) -> None:
+        nonlocal in_flight
+        with finished:
+            if not (signal == DNS_ERROR and deadline is not None and deadline.is_set()):
+                results[domain] = signal
+            in_flight -= 1
+            # Wake the submitting thread only once half the window is free, not per answer
+            if in_flight <= limit // 2:
+                finished.notify()
+
+    for domain in domains:
+        with finished:
+            finished.wait_for(lambda: in_flight < limit)
+            if deadline is not None and deadline.is_set():
+                break
+            in_flight += 1
+        _TransportLookup(transport, domain, timeout, deadline,
+                         lambda signal, domain=domain: collect(domain, signal)).start()
+    with finished:
+        finished.wait_for(lambda: in_flight == 0)
+        return dict(results)
+
+
+def check_dns_records(domain: str, timeout: float = 5.0,
+                      deadline: Optional[Deadline] = None) -> Tuple[Optional[bool], str]:
+    """
+    Check if a domain has any DNS records (see dns_signal).
     
     Returns:
         Tuple[is_available, status]
@@ -29,47 +483,87 @@ def check_dns_records(domain: str, timeout: float = 5.0) -> Tuple[Optional[bool]
                      None if error
         status: 'available', 'taken', or 'error'
     """
-    try:
-        import dns.resolver
-        from dns.resolver import NXDOMAIN, NoAnswer, NoNameservers, LifetimeTimeout
-    except ImportError:
-        logger.warning("dnspython library not installed. DNS checking disabled.")
-        return None, 'error'
-    
-    try:
-        resolver = dns.resolver.Resolver()
-        resolver.timeout = timeout
-        resolver.lifetime = timeout
-        resolver.nameservers = ['8.8.8.8', '1.1.1.1', '9.9.9.9']
-        
-        record_types = ["A", "AAAA", "MX", "NS", "CNAME", "TXT", "SOA"]
-        
-        for record_type in record_types:
-            try:
-                answers = resolver.resolve(domain, record_type, raise_on_no_answer=False)
-                if len(answers) > 0:
-                    logger.debug(f"Domain {domain} has {record_type} DNS records")
-                    return False, 'taken'
-            except NXDOMAIN:
-                logger.debug(f"Domain {domain} has no DNS records (NXDOMAIN)")
-                return True, 'available'
-            except NoAnswer:
-                continue
-            except (NoNameservers, LifetimeTimeout) as e:
-                logger.warning(f"DNS check failed for {domain}: {e}")
-                return None, 'error'
-        
-        logger.debug(f"Domain {domain} has no DNS records across all checked types")
+    signal = dns_signal(domain, timeout, deadline)
+    if signal == DNS_RECORDS:
+        return False, 'taken'
+    if signal in (DNS_NXDOMAIN, DNS_NODATA):
         return True, 'available'
-        
-    except Exception as e:
-        logger.error(f"Unexpected error in DNS check for {domain}: {e}", exc_info=True)
-        return None, 'error'
+    return None, 'error'
+
+
+# Route 53 error codes that mean the backend (or our access to it) is unhealthy
+_ROUTE53_BACKEND_ERRORS = {
+    'ThrottlingException', 'RequestLimitExceeded', 'ServiceUnavailable', 'InternalFailure',
+    'AccessDeniedException', 'UnrecognizedClientException', 'InvalidClientTokenId', 'ExpiredTokenException',
+}
+
+
+_THROTTLING_ERRORS = {'ThrottlingException', 'RequestLimitExceeded'}
+
+# AWS profiles to spread Route 53 calls over when none are configured explicitly
+ROUTE53_PROFILES_ENV = 'DOMAIN_CHECK_AWS_PROFILES'
+
+# Route 53 call budget shared by main.py, check_domain.py, the watchlist and the services
+ROUTE53_RATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'route53_rate.db')
+
+_route53_pool = None
+_route53_pool_lock = threading.Lock()
+
+
+def configure_route53_pool(profiles: Optional[Iterable[str]] = None, **kwargs):
+    """
+    Set the AWS profiles Route 53 checks are spread over (None or empty: the
+    default credentials). Extra arguments go to Route53Pool, e.g. client_factory.
+    The rate limits are shared with every other process on this machine
+    through ROUTE53_RATE_FILE unless shared_path is given (None: this process only).
+    """
+    global _route53_pool
+    from route53_pool import Route53Pool
+    profiles = [p for p in (profiles or []) if p] or [None]
+    if 'shared_path' not in kwargs:
+        os.makedirs(os.path.dirname(ROUTE53_RATE_FILE), exist_ok=True)
+        kwargs['shared_path'] = ROUTE53_RATE_FILE
+    with _route53_pool_lock:
+        _route53_pool = Route53Pool(profiles, breakers=BREAKERS, **kwargs)
+    if len(_route53_pool) > 1:
+        logger.info(f"Spreading Route 53 checks over AWS profiles: {', '.join(a.name for a in _route53_pool.accounts)}")
+    return _route53_pool
+
+
+def route53_pool():
+    """The process-wide Route53Pool, built from $DOMAIN_CHECK_AWS_PROFILES on first use."""
+    with _route53_pool_lock:
+        pool = _route53_pool
+    if pool is None:
+        pool = configure_route53_pool(os.environ.get(ROUTE53_PROFILES_ENV, '').split(','))
+    return pool
+
+
+def route53_api_calls() -> int:
+    """Route 53 Domains API calls this process has sent so far, retries included (0 before any pool is built)."""
+    with _route53_pool_lock:
+        pool = _route53_pool
+    if pool is None:
+        return 0
+    return sum(account['calls'] for account in pool.snapshot().values())
+
 
+def _half_seconds(seconds: float) -> float:
+    # Coarse timeouts keep the number of cached clients small
+    return max(0.5, math.ceil(seconds * 2) / 2)
 
-def check_aws_route53(domain: str, max_retries: int = 3) -> Tuple[Optional[bool], str]:
+
+def check_aws_route53(domain: str, max_retries: int = 3,
+                      cancel_event: Optional[threading.Event] = None) -> Tuple[Optional[bool], str]:
     """
     Check domain availability using AWS Route 53 Domains API.
+
+    cancel_event may be a Deadline: retries and back-off sleeps stop when it
+    fires, and each HTTP call's connect/read timeouts are capped by the time left.
+    Calls are spread over the accounts of route53_pool(). Throttling, server
+    and credential errors count against that account's circuit breaker, and a
+    throttled request is retried on another account when there is one; while
+    every account's breaker is open this returns an error without calling AWS.
     
     Returns:
         Tuple[is_available, status]
@@ -79,19 +573,28 @@ def check_aws_route53(domain: str, max_retries: int = 3) -> Tuple[Optional[bool]
         status: 'available', 'taken', or 'error'
     """
     try:
-        import boto3
         from botocore.exceptions import ClientError, BotoCoreError
     except ImportError:
         logger.warning("boto3 library not installed. AWS Route 53 checking disabled.")
         return None, 'error'
     
-    region = 'us-east-1'
+    pool = route53_pool()
+    throttled_by = []
     
     for attempt in range(max_retries):
+        if _cancelled(cancel_event):
+            return None, 'unchecked'
+        account = pool.acquire(cancel_event, avoid=throttled_by)
+        if account is None:
+            if _cancelled(cancel_event):
+                return None, 'unchecked'
+            logger.debug(f"AWS Route 53 skipped for {domain} (circuit open)")
+            return None, 'error'
         try:
-            client = boto3.client('route53domains', region_name=region)
-            _rate_limit_aws_calls()
+            time_left = cancel_event.remaining() if isinstance(cancel_event, Deadline) else float('inf')
+            client = account.client(_half_seconds(min(5.0, time_left)), _half_seconds(min(15.0, time_left)))
             response = client.check_domain_availability(DomainName=domain)
+            pool.record_success(account)
             availability = response.get('Availability', 'DONT_KNOW')
             
             if availability in ['AVAILABLE', 'AVAILABLE_RESERVED', 'AVAILABLE_PREORDER']:
@@ -103,7 +606,7 @@ def check_aws_route53(domain: str, max_retries: int = 3) -> Tuple[Optional[bool]
                 return False, 'taken'
             elif availability == 'PENDING':
                 logger.debug(f"AWS Route 53: Domain {domain} status is PENDING, retrying...")
-                time.sleep(0.5)
+                _sleep(0.5, cancel_event)
                 continue
             else:
                 logger.debug(f"AWS Route 53: Domain {domain} status is {availability}")
@@ -112,34 +615,53 @@ def check_aws_route53(domain: str, max_retries: int = 3) -> Tuple[Optional[bool]
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_msg = e.response['Error']['Message']
+            if error_code in _THROTTLING_ERRORS:
+                pool.record_throttle(account)
+                throttled_by.append(account)
+            elif error_code in _ROUTE53_BACKEND_ERRORS:
+                pool.record_failure(account)
+            else:
+                # The service answered; the request itself was wrong (e.g. unsupported TLD)
+                pool.record_success(account)
             
-            if error_code in ['ThrottlingException', 'RequestLimitExceeded'] and attempt < max_retries - 1:
-                wait_time = (2 ** attempt) + 0.1
-                logger.warning(f"AWS error for {domain} (attempt {attempt+1}/{max_retries}): "
-                              f"{error_code}, retrying in {wait_time:.1f}s")
-                time.sleep(wait_time)
-                continue
+            if error_code in _THROTTLING_ERRORS and attempt < max_retries - 1:
+                if len(throttled_by) < len(pool):
+                    logger.info(f"AWS Route 53 account {account.name} throttled {domain}, retrying on another account")
+                    continue
+                if account.breaker.state == CLOSED:
+                    wait_time = (2 ** attempt) + 0.1
+                    logger.warning(f"AWS error for {domain} (attempt {attempt+1}/{max_retries}): "
+                                  f"{error_code}, retrying in {wait_time:.1f}s")
+                    _sleep(wait_time, cancel_event)
+                    continue
             
             logger.error(f"AWS ClientError checking {domain}: {error_code} - {error_msg}")
             return None, 'error'
             
         except BotoCoreError as e:
+            # Connection failures, timeouts and missing credentials
+            pool.record_failure(account)
             logger.error(f"AWS BotoCoreError checking {domain}: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
+            if attempt < max_retries - 1 and account.breaker.state == CLOSED:
+                _sleep(2 ** attempt, cancel_event)
                 continue
             return None, 'error'
             
         except Exception as e:
+            pool.record_failure(account)
             logger.error(f"Unexpected error in AWS check for {domain}: {e}", exc_info=True)
             return None, 'error'
     
     return None, 'error'
 
 
-def check_whois_fallback(domain: str) -> Tuple[Optional[bool], str]:
+def check_whois_fallback(domain: str, deadline: Optional[Deadline] = None) -> Tuple[Optional[bool], str]:
     """
     Fallback to WHOIS checking if DNS and AWS checks fail.
+
+    WHOIS has no timeout of its own, so with a deadline the lookup runs on a
+    helper thread and is abandoned (reported as an error) when time runs out.
+    Each TLD's WHOIS server has its own circuit breaker ('whois:<tld>').
     
     Returns:
         Tuple[is_available, status]
@@ -155,9 +677,22 @@ def check_whois_fallback(domain: str) -> Tuple[Optional[bool], str]:
         logger.warning("python-whois library not installed. WHOIS fallback disabled.")
         return None, 'error'
     
+    breaker = BREAKERS.get(f"whois:{_tld_of(domain)}")
+    if not breaker.allow():
+        logger.debug(f"WHOIS skipped for {domain} (circuit open)")
+        return None, 'error'
+
     try:
         logger.debug(f"WHOIS fallback checking: {domain}")
-        domain_info = whois.whois(domain)
+        if deadline is None:
+            domain_info = whois.whois(domain)
+        else:
+            finished, domain_info = _run_with_timeout(whois.whois, deadline.remaining(), domain)
+            if not finished:
+                logger.warning(f"WHOIS lookup for {domain} timed out")
+                breaker.record_failure()
+                return None, 'error'
+        breaker.record_success()
         
         if domain_info.get('domain_name'):
             logger.debug(f"WHOIS: Domain {domain} is taken (registered)")
@@ -167,78 +702,253 @@ def check_whois_fallback(domain: str) -> Tuple[Optional[bool], str]:
             return True, 'available'
             
     except WhoisError as e:
+        breaker.record_success()
         logger.debug(f"WHOIS error for {domain} (likely available): {e}")
         return True, 'available'
         
     except Exception as e:
+        breaker.record_failure()
         logger.error(f"Unexpected error in WHOIS check for {domain}: {e}", exc_info=True)
         return None, 'error'
 
 
-def check_domain_availability(domain: str) -> Tuple[Optional[bool], str]:
+def lookup_expiration_date(domain: str, timeout: float = 10.0) -> Optional[float]:
+    """
+    Return the registration expiry of a domain as a Unix timestamp, if published.
+
+    Tries RDAP first (structured, one HTTPS request) and falls back to WHOIS.
+    Both go through the same circuit breakers as the availability checks.
+    """
+    import json
+    import urllib.error
+    import urllib.request
+    from datetime import datetime
+
+    rdap_breaker = BREAKERS.get(f"rdap:{RDAP_SERVER}")
+    if rdap_breaker.allow():
+        try:
+            request = urllib.request.Request(f"https://{RDAP_SERVER}/domain/{domain}",
+                                             headers={'Accept': 'application/rdap+json'})
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                data = json.load(response)
+            rdap_breaker.record_success()
+            for event in data.get('events', []):
+                if event.get('eventAction') == 'expiration' and event.get('eventDate'):
+                    expires = datetime.fromisoformat(event['eventDate'].replace('Z', '+00:00'))
+                    logger.debug(f"RDAP: {domain} expires {expires.isoformat()}")
+                    return expires.timestamp()
+        except urllib.error.HTTPError as e:
+            # 4xx means no record for this domain, not an unhealthy server
+            if e.code >= 500 or e.code == 429:
+                rdap_breaker.record_failure()
+            else:
+                rdap_breaker.record_success()
+            logger.debug(f"RDAP expiry lookup failed for {domain}: {e}")
+        except Exception as e:
+            rdap_breaker.record_failure()
+            logger.debug(f"RDAP expiry lookup failed for {domain}: {e}")
+
+    try:
+        import whois
+    except ImportError:
+        return None
+    whois_breaker = BREAKERS.get(f"whois:{_tld_of(domain)}")
+    if not whois_breaker.allow():
+        return None
+    try:
+        expires = whois.whois(domain).get('expiration_date')
+        whois_breaker.record_success()
+        if isinstance(expires, list):
+            expires = min(expires) if expires else None
+        if isinstance(expires, datetime):
+            logger.debug(f"WHOIS: {domain} expires {expires.isoformat()}")
+            return expires.timestamp()
+    except Exception as e:
+        whois_breaker.record_failure()
+        logger.debug(f"WHOIS expiry lookup failed for {domain}: {e}")
+    return None
+
+
+def _route53_tier(domain: str, deadline: Optional[Deadline]) -> Tuple[Optional[bool], str]:
+    available, status = check_aws_route53(domain, cancel_event=deadline)
+    # check_domain_availability tells a cancelled domain from a tier out of time
+    return (None, 'error') if status == 'unchecked' else (available, status)
+
+
+# Checking tiers by name, each called as tier(domain, deadline)
+TIERS: Dict[str, Callable[[str, Optional[Deadline]], Tuple[Optional[bool], str]]] = {
+    'dns': lambda domain, deadline: check_dns_records(domain, deadline=deadline),
+    'route53': _route53_tier,
+    'whois': lambda domain, deadline: check_whois_fallback(domain, deadline=deadline),
+}
+TIER_NAMES = {'dns': 'DNS', 'route53': 'AWS Route 53', 'whois': 'WHOIS'}
+
+# Shared by every check in the process, so what one check learns speeds up the next
+TIER_SCHEDULER = TierScheduler()
+
+
+def check_domain_availability(domain: str, cancel_event: Optional[threading.Event] = None,
+                              budget: Optional[float] = None,
+                              scheduler: Optional[TierScheduler] = None) -> Tuple[Optional[bool], str]:
     """
-    Check domain availability with the following flow:
-    1. DNS check first - if domain has DNS records, it's taken
-    2. If no DNS records, check AWS Route 53 Domains API
-    3. If AWS fails, fallback to WHOIS
+    Check domain availability with three tiers:
+    - DNS: if the domain has DNS records, it's taken; no records is only a hint
+    - AWS Route 53 Domains API
+    - WHOIS
     
+    The first conclusive answer wins. Tiers run DNS -> Route 53 -> WHOIS
+    until live statistics say otherwise: the scheduler (TIER_SCHEDULER by
+    default) reorders them per TLD by expected time to a verdict and skips
+    tiers that keep failing, e.g. Route 53 without AWS credentials.
+
+    If cancel_event is set (it may itself be a Deadline), no further tier is
+    started and the domain is reported as 'unchecked'. budget caps the whole
+    check in seconds; each tier gets a share of what is left (see
+    TIER_BUDGET_SHARE), a tier that runs out of time counts as failed, and a
+    domain whose budget is spent is reported as an error.
+
     Returns:
         Tuple[is_available, status]
         is_available: True if domain is available,
                      False if domain is taken,
-                     None if error
-        status: 'available', 'taken', or 'error'
+                     None if error or unchecked
+        status: 'available', 'taken', 'error' or 'unchecked'
     """
     logger.debug(f"Starting domain availability check for: {domain}")
-    
-    dns_available, dns_status = check_dns_records(domain)
-    
-    if dns_status == 'taken':
-        logger.info(f"Domain {domain} is taken (DNS records found)")
-        return False, 'taken'
-    
-    if dns_status == 'available':
-        logger.debug(f"Domain {domain} has no DNS records, checking AWS Route 53...")
-        
-        aws_available, aws_status = check_aws_route53(domain)
-        
-        if aws_status == 'available':
-            logger.info(f"Domain {domain} is available (AWS Route 53 confirmed)")
-            return True, 'available'
-        
-        if aws_status == 'taken':
-            logger.info(f"Domain {domain} is taken (AWS Route 53 confirmed)")
-            return False, 'taken'
-        
-        logger.debug(f"AWS check for {domain} failed or inconclusive ({aws_status}), "
-                    f"falling back to WHOIS")
-        
-        whois_available, whois_status = check_whois_fallback(domain)
-        
-        if whois_status in ['available', 'taken']:
-            logger.info(f"Domain {domain} is {'available' if whois_available else 'taken'} "
-                       f"(WHOIS fallback)")
-            return whois_available, whois_status
-        
-        logger.error(f"All domain checking methods failed for {domain}")
-        return None, 'error'
-    
-    logger.debug(f"DNS check for {domain} failed ({dns_status}), checking AWS directly...")
-    
-    aws_available, aws_status = check_aws_route53(domain)
-    
-    if aws_status in ['available', 'taken']:
-        logger.info(f"Domain {domain} is {'available' if aws_available else 'taken'} "
-                   f"(AWS check, DNS failed)")
-        return aws_available, aws_status
-    
-    logger.debug(f"AWS check for {domain} also failed, trying WHOIS fallback...")
-    whois_available, whois_status = check_whois_fallback(domain)
-    
-    if whois_status in ['available', 'taken']:
-        logger.info(f"Domain {domain} is {'available' if whois_available else 'taken'} "
-                   f"(WHOIS fallback, DNS/AWS failed)")
-        return whois_available, whois_status
-    
-    logger.error(f"All domain checking methods failed for {domain}")
-    return None, 'error'
\ No newline at end of file
+    scheduler = scheduler or TIER_SCHEDULER
+    deadline = Deadline(budget, parent=cancel_event) if (budget is not None or cancel_event is not None) else None
+    tld = _tld_of(domain)
+
+    def interrupted() -> Optional[Tuple[Optional[bool], str]]:
+        if _cancelled(cancel_event):
+            return None, 'unchecked'
+        if deadline is not None and deadline.timed_out():
+            logger.warning(f"Check for {domain} exceeded its {budget:.1f}s budget")
+            return None, 'error'
+        return None
+
+    no_dns_records = False
+    tried = []
+    for tier in scheduler.plan(tld, TIERS):
+        stop = interrupted()
+        if stop:
+            return stop
+        tried.append(tier)
+        started = time.monotonic()
+        available, status = TIERS[tier](domain, _tier_deadline(deadline, tier))
+        latency = time.monotonic() - started
+
+        if status not in ('available', 'taken'):
+            stop = interrupted()
+            if stop:
+                # Cut short by the caller or the domain budget, which says nothing about the tier
+                return stop
+        if tier == 'dns' and status == 'available':
+            # No records is not proof: registered domains can be parked without DNS
+            scheduler.record(tier, tld, INCONCLUSIVE, latency)
+            no_dns_records = True
+            logger.debug(f"Domain {domain} has no DNS records, trying the next tier...")
+            continue
+        if status in ('available', 'taken'):
+            scheduler.record(tier, tld, CONCLUSIVE, latency)
+            logger.info(f"Domain {domain} is {status} ({TIER_NAMES[tier]}"
+                        f"{', no DNS records' if no_dns_records and tier != 'dns' else ''})")
+            return available, status
+        scheduler.record(tier, tld, FAILED, latency)
+        logger.debug(f"{TIER_NAMES[tier]} check for {domain} failed or inconclusive ({status}), trying the next tier...")
+
+    logger.error(f"All domain checking methods failed for {domain} (tried {', '.join(tried)})")
+    return None, 'error'
+
+
+def check_domains_until(domains: Iterable[str], target: Optional[int] = None, max_workers: int = 4,
+                        priority: Optional[Callable[[str], float]] = None,
+                        check: Optional[Callable[..., Tuple[Optional[bool], str]]] = None,
+                        on_result: Optional[Callable[[str, Optional[bool], str], None]] = None,
+                        time_budget: Optional[float] = None
+                        ) -> Tuple[Dict[str, Tuple[Optional[bool], str]], List[str]]:
+    """
+    Check domains concurrently, highest priority first, until `target` are available.
+
+    priority maps a domain to a number (higher is checked first). check is
+    called as check(domain, cancel_event=event) and defaults to
+    check_domain_availability. on_result is called on the calling thread as
+    each verdict arrives. Once the target is met, in-flight checks are
+    cancelled cooperatively and nothing new is started. The same happens
+    when time_budget seconds have passed.
+
+    Returns (results, remaining): verdicts by domain, and the domains that
+    were never checked (or were cancelled), in priority order.
+    """
+    check = check or check_domain_availability
+    ordered = list(domains)
+    if priority is not None:
+        ordered.sort(key=priority, reverse=True)
+    queue_iter = iter(ordered)
+    cancel_event = Deadline(time_budget)
+    results: Dict[str, Tuple[Optional[bool], str]] = {}
+    cancelled: List[str] = []
+    found = 0
+    budget_spent = False
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        in_flight = {}
+
+        def submit_next() -> bool:
+            for domain in queue_iter:
+                in_flight[pool.submit(check, domain, cancel_event=cancel_event)] = domain
+                return True
+            return False
+
+        for _ in range(max(1, max_workers)):
+            if not submit_next():
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                domain = in_flight.pop(future)
+                try:
+                    is_available, status = future.result()
+                except Exception as e:
+                    logger.error(f"Unexpected error checking {domain}: {e}", exc_info=True)
+                    is_available, status = None, 'error'
+                if status == 'unchecked':
+                    cancelled.append(domain)
+                    continue
+                results[domain] = (is_available, status)
+                if status == 'available':
+                    found += 1
+                if on_result is not None:
+                    on_result(domain, is_available, status)
+            if target is not None and found >= target:
+                if not cancel_event.is_set():
+                    logger.info(f"Found {found} available domains (target {target}), cancelling remaining checks")
+                    cancel_event.set()
+                continue
+            if cancel_event.is_set():
+                if cancel_event.timed_out() and not budget_spent:
+                    budget_spent = True
+                    logger.info(f"Time budget of {time_budget:.1f}s spent, leaving remaining domains unchecked")
+                continue
+            while len(in_flight) < max(1, max_workers) and submit_next():
+                pass
+
+    cancelled_set = set(cancelled)
+    remaining = [d for d in ordered if d in cancelled_set] + list(queue_iter)
+    return results, remaining
+
+
+def warm_up() -> None:
+    """Import the checking libraries and build the Route 53 clients ahead of the first check."""
+    modules = ('whois',) if dns_transport() is not None else ('dns.resolver', 'whois')
+    for module in modules:
+        try:
+            __import__(module)
+        except ImportError:
+            logger.warning(f"{module} is not installed; that tier will be unavailable")
+    for account in route53_pool().accounts:
+        try:
+            account.client()
+        except Exception as e:
+            logger.warning(f"Could not create the Route 53 client for {account.name}: {e}")
@@ -0,0 +1,207 @@
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+from wordlists import AMBIGUOUS_GRAPHEMES, COMMON_WORDS, MAX_WORD_LENGTH, PINYIN_SYLLABLES
+
+logger = logging.getLogger(__name__)
+
+_VOWEL_GROUPS = re.compile(r'[aeiouy]+')
+_CONSONANT_RUNS = re.compile(r'[bcdfghjklmnpqrstvwxz]{3,}')
+
+
+# Vowels that are easy to mishear for one another share a class
+_VOWEL_CLASSES = str.maketrans('aeiou', 'aiiuu')
+
+
+def _sound_key(word: str) -> str:
+    """Collapse spellings that sound alike (ph/f, ck/k, c/k/s, doubled letters, close vowels)."""
+    key = word
+    for src, dst in (('ph', 'f'), ('ck', 'k'), ('gh', ''), ('kn', 'n'), ('wr', 'r'),
+                     ('ce', 'se'), ('ci', 'si'), ('cy', 'sy'), ('c', 'k'), ('q', 'k'),
+                     ('x', 'ks'), ('z', 's'), ('y', 'i')):
+        key = key.replace(src, dst)
+    # Vowel quality is easy to mishear, whether there is a vowel is not, so vowels only lose their class detail
+    key = key.translate(_VOWEL_CLASSES)
+    collapsed = []
+    for ch in key:
+        if not collapsed or collapsed[-1] != ch:
+            collapsed.append(ch)
+    return ''.join(collapsed)
+
+
+def _build_sound_index() -> Dict[str, frozenset]:
+    index: Dict[str, set] = {}
+    for word in COMMON_WORDS:
+        index.setdefault(_sound_key(word), set()).add(word)
+    return {key: frozenset(words) for key, words in index.items()}
+
+
+# Words that share a sound key with another common word are easy to mishear
+_SOUND_INDEX = _build_sound_index()
+
+
+@lru_cache(maxsize=65536)
+def segment(label: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Split a label into the cheapest sequence of known words.
+
+    Returns a tuple of (segment, kind) where kind is 'word', 'pinyin' or
+    'unknown'. Dictionary words are cheapest, pinyin syllables slightly
+    dearer, and every unknown character costs the most.
+    """
+    n = len(label)
+    best = [(0.0, ())] + [(float('inf'), ())] * n
+    for end in range(1, n + 1):
+        for start in range(max(0, end - MAX_WORD_LENGTH), end):
+            cost, parts = best[start]
+            if cost == float('inf'):
+                continue
+            piece = label[start:end]
+            if piece in COMMON_WORDS:
+                step = 1.0
+                kind = 'word'
+            elif piece in PINYIN_SYLLABLES:
+                step = 1.3
+                kind = 'pinyin'
+            elif end - start == 1:
+                step = 3.0
+                kind = 'unknown'
+            else:
+                continue
+            if cost + step < best[end][0]:
+                best[end] = (cost + step, parts + ((piece, kind),))
+    merged: List[Tuple[str, str]] = []
+    for piece, kind in best[n][1]:
+        if kind == 'unknown' and merged and merged[-1][1] == 'unknown':
+            merged[-1] = (merged[-1][0] + piece, 'unknown')
+        else:
+            merged.append((piece, kind))
+    return tuple(merged)
+
+
+def count_syllables(label: str) -> int:
+    total = 0
+    for piece, kind in segment(label):
+        if kind == 'pinyin':
+            total += 1
+            continue
+        groups = len(_VOWEL_GROUPS.findall(piece))
+        if piece.endswith('e') and not piece.endswith('le') and groups > 1:
+            groups -= 1
+        total += max(1, groups)
+    return total
+
+
+def _label_of(domain: str) -> str:
+    label = domain.strip().lower().split('.', 1)[0]
+    return label
+
+
+@lru_cache(maxsize=65536)
+def score_components(domain: str) -> Dict[str, float]:
+    """Return the individual memorability penalties for a domain (lower is better)."""
+    label = _label_of(domain)
+    parts = segment(label.replace('-', ''))
+    unknown_chars = sum(len(piece) for piece, kind in parts if kind == 'unknown')
+    known_parts = [piece for piece, kind in parts if kind != 'unknown']
+
+    syllables = count_syllables(label.replace('-', ''))
+
+    clarity = 0.0
+    for piece, kind in parts:
+        if kind == 'pinyin':
+            # q, x and zh are ordinary pinyin initials, not ambiguous spellings
+            continue
+        clarity += sum(piece.count(g) for g in AMBIGUOUS_GRAPHEMES)
+    clarity += sum(ch.isdigit() for ch in label) * 2
+    clarity += label.count('-') * 2
+    # Doubled letters across a word boundary ("bookkeeper") get dropped when typed
+    for (left, _), (right, _) in zip(parts, parts[1:]):
+        if left[-1] == right[0]:
+            clarity += 1
+
+    # Unknown stretches that cannot be said aloud ("qwzrtk") are the hardest to recall
+    unpronounceable = 0.0
+    for piece, kind in parts:
+        if kind == 'unknown':
+            unpronounceable += sum(len(run) - 2 for run in _CONSONANT_RUNS.findall(piece))
+
+    plural = 0.0
+    bare = label.replace('-', '')
+    if known_parts and bare.endswith('s') and not bare.endswith('ss'):
+        for stem in (bare[:-1], bare[:-2] if bare.endswith('es') else None):
+            if stem and all(kind != 'unknown' for _, kind in segment(stem)):
+                plural = 1.0
+                break
+
+    confusable = 0.0
+    for piece, kind in parts:
+        if kind != 'word':
+            continue
+        sound_alikes = _SOUND_INDEX.get(_sound_key(piece), frozenset())
+        if len(sound_alikes) > 1:
+            confusable += 1
+
+    return {
+        'length': float(len(label)),
+        'syllables': float(syllables),
+        'segments': float(len(parts)),
+        'unknown_chars': float(unknown_chars),
+        'clarity': clarity,
+        'unpronounceable': unpronounceable,
+        'plural': plural,
+        'confusable': confusable,
+    }
+
+
+# Weight of each penalty in the final score
+WEIGHTS = {
+    'length': 1.0,
+    'syllables': 2.0,
+    'segments': 1.5,
+    'unknown_chars': 3.0,
+    'clarity': 3.0,
+    'unpronounceable': 6.0,
+    'plural': 4.0,
+    'confusable': 3.0,
+}
+
+
+def score_domain(domain: str) -> float:
+    """Memorability score on a 0-100 scale, higher is easier to remember when heard."""
+    components = score_components(domain)
+    penalty = sum(WEIGHTS[name] * value for name, value in components.items())
+    return max(0.0, 100.0 - penalty)
+
+
+def rank_domains(domains: Iterable[str]) -> List[str]:
+    """Return unique domains, most memorable first; ties break on (length, name)."""
+    unique_domains = list(dict.fromkeys(domains))
+    return sorted(unique_domains, key=lambda d: (-score_domain(d), len(d), d))
+
+
+def predicted_availability(domain: str) -> float:
+    """
+    Rough prior probability (0-1) that a domain is unregistered.
+
+    Short names and single dictionary words are almost always taken; longer
+    names and combinations that are not plain words are far more often free.
+    """
+    label = _label_of(domain).replace('-', '')
+    parts = segment(label)
+    if len(parts) == 1 and parts[0][1] == 'word':
+        base = 0.01
+    elif len(label) <= 5:
+        base = 0.03
+    else:
+        base = min(0.9, 0.05 * (len(label) - 5) + 0.08 * (len(parts) - 1))
+    if any(kind == 'pinyin' for _, kind in parts):
+        base = min(0.9, base + 0.1)
+    return max(0.01, base)
+
+
+def search_priority(domain: str) -> float:
+    """Expected value of checking a domain: chance it is available times how good it is."""
+    return predicted_availability(domain) * score_domain(domain) / 100.0
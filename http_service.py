@@ -0,0 +1,308 @@
+#!/usr/bin/env uv run --script
+"""
+HTTP JSON service for domain availability checks.
+
+Usage:
+    ./http_service.py [--port 8053] [--workers 8] [--max-queue 200]
+
+Endpoints:
+    GET  /check?domain=example.com   one verdict as a JSON object
+    POST /check {"domains": [...]}   batch; results stream back as NDJSON, one
+                                     line per domain in completion order
+    GET  /stats                      verdict cache, queue, tier and breaker stats
+    GET  /healthz
+
+Concurrent requests for the same domain share one check, answers come from
+a shared verdict cache when fresh, and when more than --max-queue checks are
+waiting new requests get 429 with a Retry-After header.
+"""
+
+import sys
+import json
+import math
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from domain_checker import BREAKERS, TIER_SCHEDULER, check_domain_availability, route53_pool, warm_up
+from candidate_filter import normalize_candidate, to_ascii, validation_error
+from verdict_cache import SingleFlight, VerdictCache
+from logging_config import setup_logging
+
+
+logger = logging.getLogger(__name__)
+
+# Largest request body accepted, in bytes
+MAX_BODY = 1024 * 1024
+
+
+class Overloaded(Exception):
+    """Raised when accepting a request would exceed the queue bound."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Too many pending checks, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AvailabilityService:
+    """
+    Shared checker behind the HTTP handlers.
+
+    Checks run on a fixed pool of workers. A domain already being checked for
+    another request is not checked again (SingleFlight), and fresh verdicts
+    are answered from the VerdictCache. At most max_queue new checks may be
+    waiting for a worker; a request that would go past that is refused
+    as a whole with Overloaded.
+    """
+
+    def __init__(self, workers: int = 8, max_queue: int = 200, cache: Optional[VerdictCache] = None,
+                 domain_budget: Optional[float] = 20.0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.cache = cache or VerdictCache()
+        self.domain_budget = domain_budget
+        self.flights = SingleFlight()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='check')
+        self.checks = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self._pending = 0
+        self._check_seconds = 1.0
+        self._lock = threading.Lock()
+
+    def _check(self, domain: str) -> Tuple[Optional[bool], str]:
+        started = time.monotonic()
+        try:
+            is_available, status = check_domain_availability(domain, budget=self.domain_budget)
+        except Exception as e:
+            logger.error(f"Unexpected error checking {domain}: {e}", exc_info=True)
+            is_available, status = None, 'error'
+        # Cache before the flight ends, so the next caller finds the verdict
+        self.cache.put(domain, is_available, status)
+        with self._lock:
+            self._pending -= 1
+            self.checks += 1
+            # Moving average of check time, for Retry-After estimates
+            self._check_seconds = 0.9 * self._check_seconds + 0.1 * (time.monotonic() - started)
+        return is_available, status
+
+    def retry_after(self) -> int:
+        with self._lock:
+            return max(1, math.ceil(self._pending / max(1, self.workers) * self._check_seconds))
+
+    def submit(self, domains: List[str]) -> Tuple[Dict[str, Dict], Dict[Future, List[str]]]:
+        """
+        Start checks for the domains that need one.
+
+        Returns (answered, futures): results available immediately (cached or
+        invalid) by domain, and the domains waiting on each in-flight check.
+        """
+        answered: Dict[str, Dict] = {}
+        futures: Dict[Future, List[str]] = {}
+        needed: List[str] = []
+        for raw in dict.fromkeys(domains):
+            domain = to_ascii(normalize_candidate(raw))
+            if domain is None or validation_error(domain):
+                answered[raw] = {'domain': raw, 'available': None, 'status': 'invalid'}
+                continue
+            cached = self.cache.get(domain)
+            if cached is not None:
+                answered[raw] = {'domain': domain, 'available': cached[0], 'status': cached[1], 'cached': True}
+                continue
+            # Joining a check that is already running costs no queue space
+            in_flight = self.flights.get(domain)
+            if in_flight is not None:
+                futures.setdefault(in_flight, []).append(domain)
+                with self._lock:
+                    self.coalesced += 1
+            else:
+                needed.append(domain)
+
+        with self._lock:
+            if needed and self._pending + len(needed) > self.max_queue + self.workers:
+                self.rejected += 1
+                overloaded = True
+            else:
+                overloaded = False
+                # Reserved up front; released as each new check finishes, coalesced ones give theirs back below
+                self._pending += len(needed)
+        if overloaded:
+            raise Overloaded(self.retry_after())
+
+        for domain in needed:
+            future, shared = self.flights.submit(domain, self.executor, self._check, domain)
+            if shared:
+                with self._lock:
+                    self._pending -= 1
+                    self.coalesced += 1
+            futures.setdefault(future, []).append(domain)
+        return answered, futures
+
+    def close(self) -> None:
+        """Stop the workers without waiting; checks still queued for one are cancelled."""
+        self.executor.shutdown(wait=False)
+        # ThreadPoolExecutor.shutdown(cancel_futures=True) needs Python 3.9
+        cancelled = self.flights.cancel_pending()
+        if cancelled:
+            logger.info(f"Cancelled {cancelled} queued check(s)")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            queue = {'pending': self._pending, 'in_flight_domains': len(self.flights), 'workers': self.workers,
+                     'max_queue': self.max_queue, 'checks': self.checks, 'coalesced': self.coalesced,
+                     'rejected': self.rejected}
+        return {'queue': queue, 'verdict_cache': self.cache.stats(),
+                'tiers': TIER_SCHEDULER.snapshot(), 'breakers': BREAKERS.snapshot(),
+                'route53_accounts': route53_pool().snapshot()}
+
+
+def _result(domain: str, future: Future) -> Dict:
+    is_available, status = future.result()
+    return {'domain': domain, 'available': is_available, 'status': status, 'cached': False}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'domain-check'
+
+    @property
+    def service(self) -> AvailabilityService:
+        return self.server.service
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _overloaded(self, e: Overloaded) -> None:
+        self._send_json(429, {'error': str(e)}, {'Retry-After': str(e.retry_after)})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/healthz':
+            self._send_json(200, {'ok': True})
+        elif url.path == '/stats':
+            self._send_json(200, self.service.stats())
+        elif url.path == '/check':
+            domain = parse_qs(url.query).get('domain', [''])[0]
+            if not domain:
+                self._send_json(400, {'error': "missing 'domain' query parameter"})
+                return
+            try:
+                answered, futures = self.service.submit([domain])
+            except Overloaded as e:
+                self._overloaded(e)
+                return
+            if answered:
+                result = next(iter(answered.values()))
+            else:
+                future, (name,) = next(iter(futures.items()))
+                result = _result(name, future)
+            self._send_json(400 if result['status'] == 'invalid' else 200, result)
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/check':
+            self._send_json(404, {'error': 'not found'})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY:
+            self._send_json(413, {'error': 'request body too large'})
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+            domains = body['domains']
+            if not isinstance(domains, list) or not all(isinstance(d, str) for d in domains):
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {'error': "body must be a JSON object with a 'domains' list of strings"})
+            return
+        if len(domains) > self.service.max_queue + self.service.workers:
+            self._send_json(413, {'error': f"at most {self.service.max_queue + self.service.workers} domains per batch"})
+            return
+        try:
+            answered, futures = self.service.submit(domains)
+        except Overloaded as e:
+            self._overloaded(e)
+            return
+
+        # Stream one NDJSON line per domain as soon as its verdict is known
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for result in answered.values():
+                self._write_line(result)
+            waiting = set(futures)
+            while waiting:
+                done, waiting = wait(waiting, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for domain in futures[future]:
+                        self._write_line(_result(domain, future))
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; its checks still finish and warm the cache
+            logger.debug("Client disconnected before the batch finished")
+
+    def _write_line(self, result: Dict) -> None:
+        self.wfile.write((json.dumps(result) + '\n').encode('utf-8'))
+        self.wfile.flush()
+
+
+class AvailabilityServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: AvailabilityService):
+        self.service = service
+        super().__init__(address, _Handler)
+
+
+def main() -> int:
+    """Main entry point."""
+
+    parser = argparse.ArgumentParser(description='Serve domain availability checks over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8053, help='Port to listen on')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent checks')
+    parser.add_argument('--max-queue', type=int, default=200,
+                        help='Checks allowed to wait for a worker before requests get 429')
+    parser.add_argument('--domain-budget', type=float, default=20.0, help='Maximum seconds spent on one domain')
+    args = parser.parse_args()
+
+    try:
+        logger_instance, log_file = setup_logging()
+        logger.info(f"Logging to {log_file}")
+    except Exception as e:
+        print(f"Warning: Failed to set up logging: {e}", file=sys.stderr)
+
+    warm_up()
+    service = AvailabilityService(workers=args.workers, max_queue=args.max_queue, domain_budget=args.domain_budget)
+    server = AvailabilityServer((args.host, args.port), service)
+    logger.info(f"HTTP service listening on http://{args.host}:{args.port}")
+    print(f"Listening on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
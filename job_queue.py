@@ -0,0 +1,317 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    total INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    domains TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS chunks_claimable ON chunks (state, lease_expires);
+CREATE TABLE IF NOT EXISTS verdicts (
+    job_id TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    available INTEGER,
+    status TEXT NOT NULL,
+    worker TEXT,
+    checked_at REAL NOT NULL,
+    PRIMARY KEY (job_id, domain)
+);
+"""
+
+
+class Chunk(NamedTuple):
+    """A leased slice of a job. lease_token proves the lease is still ours."""
+    job_id: str
+    index: int
+    domains: List[str]
+    lease_token: str
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    Lease-based work queue for domain checks, stored in one SQLite file.
+
+    A job is a list of domains split into chunks. Workers claim a chunk,
+    which leases it for lease_seconds; they must renew the lease while
+    working and complete it when done. A chunk whose lease expires (the
+    worker died or lost its connection) is handed to the next claimant, up
+    to max_attempts times, after which it is marked failed. Verdicts are
+    keyed by (job, domain), so a chunk that gets checked twice is harmless.
+
+    The file can live on a shared volume so workers on several hosts pull
+    from the same queue; every claim runs in an IMMEDIATE transaction, so
+    two workers never lease the same chunk.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 120.0, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # IMMEDIATE takes the write lock up front, so concurrent claims serialize
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def submit(self, domains: Iterable[str], chunk_size: int = 25) -> str:
+        """Split domains into chunks and enqueue them; returns the job id."""
+        domains = list(domains)
+        chunk_size = max(1, chunk_size)
+        job_id = uuid.uuid4().hex[:12]
+        with self._transaction() as conn:
+            conn.execute('INSERT INTO jobs (id, created_at, total) VALUES (?, ?, ?)',
+                         (job_id, time.time(), len(domains)))
+            conn.executemany(
+                'INSERT INTO chunks (job_id, idx, domains) VALUES (?, ?, ?)',
+                [(job_id, i // chunk_size, json.dumps(domains[i:i + chunk_size]))
+                 for i in range(0, len(domains), chunk_size)]
+            )
+        logger.info(f"Submitted job {job_id}: {len(domains)} domains in chunks of {chunk_size}")
+        return job_id
+
+    def _expire_leases(self, conn: sqlite3.Connection, now: float) -> None:
+        """Put chunks with an expired lease back to pending, or fail them after max_attempts leases."""
+        expired = conn.execute(
+            "SELECT job_id, idx, worker, attempts FROM chunks WHERE state = 'leased' AND lease_expires < ?", (now,)
+        ).fetchall()
+        for job_id, index, worker, attempts in expired:
+            state = 'failed' if attempts >= self.max_attempts else 'pending'
+            conn.execute(
+                "UPDATE chunks SET state = ?, lease_token = NULL, lease_expires = NULL WHERE job_id = ? AND idx = ?",
+                (state, job_id, index)
+            )
+            logger.warning(f"Lease on {job_id}/{index} held by {worker} expired, chunk is now {state}")
+
+    def claim(self, worker_id: str) -> Optional[Chunk]:
+        """Lease the oldest pending (or expired) chunk, or return None if there is none."""
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+            row = conn.execute(
+                "SELECT c.job_id, c.idx, c.domains FROM chunks c JOIN jobs j ON j.id = c.job_id "
+                "WHERE c.state = 'pending' ORDER BY j.created_at, c.idx LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, index, domains = row
+            token = uuid.uuid4().hex
+            conn.execute(
+                "UPDATE chunks SET state = 'leased', worker = ?, lease_token = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE job_id = ? AND idx = ?",
+                (worker_id, token, now + self.lease_seconds, job_id, index)
+            )
+        logger.debug(f"{worker_id} leased chunk {job_id}/{index}")
+        return Chunk(job_id, index, json.loads(domains), token)
+
+    def renew(self, chunk: Chunk) -> bool:
+        """Extend the lease; False means it expired and was taken by someone else."""
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE chunks SET lease_expires = ? WHERE job_id = ? AND idx = ? "
+                "AND state = 'leased' AND lease_token = ?",
+                (time.time() + self.lease_seconds, chunk.job_id, chunk.index, chunk.lease_token)
+            ).rowcount
+        return updated == 1
+
+    def record(self, chunk: Chunk, domain: str, is_available: Optional[bool], status: str,
+               worker_id: Optional[str] = None) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO verdicts (job_id, domain, available, status, worker, checked_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (chunk.job_id, domain, None if is_available is None else int(is_available), status,
+                 worker_id, time.time())
+            )
+
+    def complete(self, chunk: Chunk) -> bool:
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE chunks SET state = 'done', lease_token = NULL WHERE job_id = ? AND idx = ? "
+                "AND state = 'leased' AND lease_token = ?",
+                (chunk.job_id, chunk.index, chunk.lease_token)
+            ).rowcount
+        return updated == 1
+
+    def release(self, chunk: Chunk) -> None:
+        """Give a chunk back without waiting for its lease to expire."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE chunks SET state = 'pending', lease_token = NULL, lease_expires = NULL "
+                "WHERE job_id = ? AND idx = ? AND lease_token = ?",
+                (chunk.job_id, chunk.index, chunk.lease_token)
+            )
+
+    def progress(self, job_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Chunk counts by state, for one job or the whole queue.
+
+        Expired leases are settled first (pending again, or failed after
+        max_attempts), so a job whose workers all died is not shown as
+        leased forever.
+        """
+        query = 'SELECT state, COUNT(*) FROM chunks'
+        params: Tuple = ()
+        if job_id is not None:
+            query += ' WHERE job_id = ?'
+            params = (job_id,)
+        with self._transaction() as conn:
+            self._expire_leases(conn, time.time())
+            rows = conn.execute(query + ' GROUP BY state', params).fetchall()
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        counts.update(dict(rows))
+        return counts
+
+    def is_finished(self, job_id: Optional[str] = None) -> bool:
+        counts = self.progress(job_id)
+        return counts['pending'] == 0 and counts['leased'] == 0
+
+    def results(self, job_id: str) -> Dict[str, Tuple[Optional[bool], str]]:
+        rows = self._connect().execute(
+            'SELECT domain, available, status FROM verdicts WHERE job_id = ?', (job_id,)
+        ).fetchall()
+        return {domain: (None if available is None else bool(available), status)
+                for domain, available, status in rows}
+
+    def wait(self, job_id: str, poll_interval: float = 1.0,
+             on_progress: Optional[Callable[[Dict[str, int]], None]] = None,
+             timeout: Optional[float] = None,
+             stop: Optional[Callable[[], bool]] = None) -> Dict[str, Tuple[Optional[bool], str]]:
+        """
+        Block until every chunk of the job is done or failed, then return its verdicts.
+
+        With a timeout, return the verdicts recorded so far once it passes.
+        stop is polled along with the progress; once it returns True (e.g.
+        every worker process has exited) the verdicts so far are returned.
+        """
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+        last = None
+        while True:
+            counts = self.progress(job_id)
+            if counts != last and on_progress is not None:
+                on_progress(counts)
+            last = counts
+            if counts['pending'] == 0 and counts['leased'] == 0:
+                return self.results(job_id)
+            if give_up_at is not None and time.monotonic() >= give_up_at:
+                logger.info(f"Stopped waiting for job {job_id} after {timeout:.1f}s")
+                return self.results(job_id)
+            if stop is not None and stop():
+                logger.info(f"Stopped waiting for job {job_id} with {counts['pending'] + counts['leased']} "
+                            f"chunks outstanding")
+                return self.results(job_id)
+            time.sleep(poll_interval if give_up_at is None
+                       else max(0.0, min(poll_interval, give_up_at - time.monotonic())))
+
+
+def run_worker(queue: JobQueue, check: Callable[..., Tuple[Optional[bool], str]],
+               worker_id: Optional[str] = None, exit_when_done: bool = False,
+               poll_interval: float = 2.0, stop_event: Optional[threading.Event] = None) -> int:
+    """
+    Claim chunks and check their domains until stopped; returns the number of domains checked.
+
+    check is called as check(domain, cancel_event=event). A heartbeat thread
+    renews the lease every third of its length; if renewal fails the chunk
+    belongs to someone else, so the in-flight check is cancelled and the rest
+    of the chunk is abandoned. With exit_when_done the worker returns once
+    no chunk in the queue is pending or leased.
+    """
+    worker_id = worker_id or default_worker_id()
+    stop_event = stop_event or threading.Event()
+    checked = 0
+    logger.info(f"Worker {worker_id} started on {queue.path}")
+    while not stop_event.is_set():
+        chunk = queue.claim(worker_id)
+        if chunk is None:
+            if exit_when_done and queue.is_finished():
+                break
+            stop_event.wait(poll_interval)
+            continue
+
+        lost_lease = threading.Event()
+        finished = threading.Event()
+
+        def heartbeat():
+            heartbeat_queue = JobQueue(queue.path, queue.lease_seconds, queue.max_attempts)
+            try:
+                while not finished.wait(queue.lease_seconds / 3):
+                    if not heartbeat_queue.renew(chunk):
+                        logger.warning(f"Worker {worker_id} lost lease on {chunk.job_id}/{chunk.index}")
+                        lost_lease.set()
+                        return
+            finally:
+                heartbeat_queue.close()
+
+        renewer = threading.Thread(target=heartbeat, name=f"lease-{chunk.job_id}-{chunk.index}", daemon=True)
+        renewer.start()
+        try:
+            for domain in chunk.domains:
+                if lost_lease.is_set() or stop_event.is_set():
+                    break
+                is_available, status = check(domain, cancel_event=lost_lease)
+                if status == 'unchecked':
+                    break
+                queue.record(chunk, domain, is_available, status, worker_id)
+                checked += 1
+        except BaseException:
+            queue.release(chunk)
+            raise
+        finally:
+            finished.set()
+            renewer.join()
+
+        if lost_lease.is_set():
+            continue
+        if stop_event.is_set():
+            queue.release(chunk)
+        elif not queue.complete(chunk):
+            logger.warning(f"Worker {worker_id} finished {chunk.job_id}/{chunk.index} after losing its lease")
+    logger.info(f"Worker {worker_id} exiting after {checked} checks")
+    return checked
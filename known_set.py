@@ -0,0 +1,172 @@
+import threading
+from array import array
+from bisect import bisect_right
+from collections.abc import Set
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from candidate_filter import near_duplicate_key
+
+# Names per block of the packed blob; the sparse index holds the first name of each block
+BLOCK_SIZE = 64
+
+
+class KnownDomainSet(Set):
+    """
+    Compact set of domain names for membership tests over millions of entries.
+
+    Names live UTF-8 encoded in one sorted, newline-terminated bytes blob,
+    about len(name) + 1 bytes each against ~100 for a str in a set. A sparse
+    index of every BLOCK_SIZE-th name finds the block a name would be in
+    (bisect), and one substring search over that block settles membership.
+    Inserts go to a small delta set that is merged into the blob once it
+    grows past merge_ratio of it, so adding stays amortized cheap and nothing
+    is rebuilt per round.
+
+    With track_near_keys the near_duplicate_key() of every name is kept in a
+    second set (near_keys), so filter_candidates() does not recompute them on
+    every call. Names are stored as given; pass normalized, lower-case names.
+    Safe to share between threads.
+    """
+
+    def __init__(self, domains: Iterable[str] = (), track_near_keys: bool = False, merge_ratio: float = 0.0625):
+        self.merge_ratio = merge_ratio
+        self.near_keys: Optional['KnownDomainSet'] = KnownDomainSet() if track_near_keys else None
+        self._blob = b''
+        self._packed = 0
+        self._index: List[bytes] = []
+        self._starts = array('Q', [0])
+        self._delta: set = set()
+        # Count of names per length, for percentile queries without decoding the blob
+        self._length_counts: Dict[int, int] = {}
+        self._lock = threading.RLock()
+        self.update(domains)
+
+    def __len__(self) -> int:
+        return self._packed + len(self._delta)
+
+    def _packed_contains(self, key: bytes) -> bool:
+        block = bisect_right(self._index, key) - 1
+        if block < 0:
+            return False
+        data = self._blob[self._starts[block]:self._starts[block + 1]]
+        return data.startswith(key + b'\n') or b'\n' + key + b'\n' in data
+
+    def __contains__(self, domain) -> bool:
+        if not isinstance(domain, str):
+            return False
+        key = domain.encode('utf-8')
+        with self._lock:
+            return key in self._delta or self._packed_contains(key)
+
+    def add(self, domain: str) -> bool:
+        """Insert a name; returns False if it was already present."""
+        key = domain.encode('utf-8')
+        with self._lock:
+            if key in self._delta or self._packed_contains(key):
+                return False
+            self._insert({key: domain})
+            return True
+
+    def update(self, domains: Iterable[str]) -> None:
+        new = {domain.encode('utf-8'): domain for domain in domains}
+        if not new:
+            return
+        with self._lock:
+            if self._delta or self._packed:
+                new = {key: domain for key, domain in new.items()
+                       if key not in self._delta and not self._packed_contains(key)}
+            self._insert(new)
+
+    def _insert(self, new: Dict[bytes, str]) -> None:
+        for domain in new.values():
+            self._length_counts[len(domain)] = self._length_counts.get(len(domain), 0) + 1
+        if self.near_keys is not None:
+            self.near_keys.update(near_duplicate_key(domain) for domain in new.values())
+        self._delta.update(new)
+        if len(self._delta) > max(1024, self.merge_ratio * self._packed):
+            self._merge()
+
+    def _merge(self) -> None:
+        """Fold the delta into the packed blob; the sort merges two sorted runs in O(n)."""
+        items = self._blob.split(b'\n')[:-1] if self._blob else []
+        items.extend(sorted(self._delta))
+        items.sort()
+        self._blob = b'\n'.join(items) + b'\n' if items else b''
+        self._packed = len(items)
+        self._index = items[::BLOCK_SIZE]
+        starts = array('Q', [0])
+        for block in range(0, len(items), BLOCK_SIZE):
+            chunk = items[block:block + BLOCK_SIZE]
+            # Each name is followed by its newline
+            starts.append(starts[-1] + sum(map(len, chunk)) + len(chunk))
+        self._starts = starts
+        self._delta = set()
+
+    def compact(self) -> None:
+        """Merge pending inserts now, e.g. before measuring or a long read-only phase."""
+        with self._lock:
+            if self._delta:
+                self._merge()
+
+    def __iter__(self) -> Iterator[str]:
+        """Names in sorted order (of their UTF-8 encoding), from a snapshot taken at the call."""
+        with self._lock:
+            self.compact()
+            blob = self._blob
+        for item in blob.split(b'\n')[:-1]:
+            yield item.decode('utf-8')
+
+    def length_counts(self) -> Dict[int, int]:
+        """{name length: number of names}."""
+        with self._lock:
+            return dict(self._length_counts)
+
+    def length_percentile(self, q: float) -> int:
+        """Length at index int(q * len) of the sorted name lengths (0 if empty)."""
+        counts = self.length_counts()
+        total = sum(counts.values())
+        if not total:
+            return 0
+        index = min(int(q * total), total - 1)
+        seen = 0
+        for length in sorted(counts):
+            seen += counts[length]
+            if seen > index:
+                return length
+        return max(counts)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held, in bytes (index and delta entries counted as bytes objects)."""
+        with self._lock:
+            objects = sum(33 + len(key) + 8 for key in self._index) + sum(33 + len(key) + 16 for key in self._delta)
+            size = len(self._blob) + self._starts.itemsize * len(self._starts) + objects
+            return size + (self.near_keys.nbytes if self.near_keys is not None else 0)
+
+
+class KnownDomainUnion(Set):
+    """
+    Read-only view of several sets of names as one, without copying them.
+
+    Lets a caller keep its own additions apart from a large shared
+    KnownDomainSet and still filter against both in one call. near_keys is
+    the union of the parts' near_keys when every part tracks them.
+    """
+
+    def __init__(self, *parts: Set):
+        self.parts = parts
+        near_keys = [getattr(part, 'near_keys', None) for part in parts]
+        self.near_keys: Optional[KnownDomainUnion] = (
+            KnownDomainUnion(*near_keys) if all(keys is not None for keys in near_keys) else None)
+
+    def __contains__(self, domain) -> bool:
+        return any(domain in part for part in self.parts)
+
+    def __iter__(self) -> Iterator[str]:
+        for index, part in enumerate(self.parts):
+            for domain in part:
+                if not any(domain in earlier for earlier in self.parts[:index]):
+                    yield domain
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CACHE_MODES = ('off', 'readwrite', 'replay')
+
+
+class LLMCacheMiss(Exception):
+    """Raised in replay mode when a request has no cached response."""
+
+
+def get_llm_cache_dir():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, '.cache', 'llm_responses')
+
+
+class LLMResponseCache:
+    """
+    Content-addressed on-disk cache of chat completion responses.
+
+    Entries are keyed by a hash of (model, temperature, messages, max_tokens)
+    and stored one JSON file per key. The directory is kept under max_bytes
+    by evicting least recently used entries (file mtime is the access time).
+
+    Modes:
+        off       - never read or write
+        readwrite - serve hits and store new responses
+        replay    - serve hits only; a miss raises LLMCacheMiss, so sessions
+                    run offline against recorded responses (main.py turns off
+                    prefetching and concurrent checks so prompts are rebuilt
+                    in the recorded order)
+
+    Responses sampled at a non-zero temperature are stored but only reused
+    when reuse_nonzero_temperature is set (replay mode always reuses them).
+    """
+
+    def __init__(self, cache_dir=None, mode='readwrite', max_bytes=50 * 1024 * 1024,
+                 reuse_nonzero_temperature=False):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode: {mode} (expected one of {', '.join(CACHE_MODES)})")
+        self.cache_dir = cache_dir or get_llm_cache_dir()
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.reuse_nonzero_temperature = reuse_nonzero_temperature
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        if mode != 'off' and not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    @staticmethod
+    def make_key(model, temperature, messages, max_tokens):
+        payload = json.dumps(
+            {'model': model, 'temperature': temperature, 'messages': messages, 'max_tokens': max_tokens},
+            sort_keys=True, ensure_ascii=False, separators=(',', ':')
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def can_reuse(self, temperature):
+        if self.mode == 'replay':
+            return True
+        if self.mode == 'off':
+            return False
+        return temperature == 0 or self.reuse_nonzero_temperature
+
+    def get(self, key, temperature):
+        """Return the cached record for key, or None if it should not be served."""
+        if not self.can_reuse(temperature):
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            if self.mode == 'replay':
+                raise LLMCacheMiss(f"No recorded response for request {key[:12]}") from None
+            return None
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Discarding unreadable LLM cache entry {path}: {e}")
+            self._remove(path)
+            self.misses += 1
+            if self.mode == 'replay':
+                raise LLMCacheMiss(f"Unreadable recorded response for request {key[:12]}")
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self.hits += 1
+        logger.debug(f"LLM cache hit {key[:12]}")
+        return record
+
+    def put(self, key, record):
+        if self.mode != 'readwrite':
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        data = json.dumps(record, ensure_ascii=False).encode('utf-8')
+        try:
+            # An entry being replaced no longer counts towards the total
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write LLM cache entry {path}: {e}")
+            self._remove(tmp_path)
+            return
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(data) - replaced
+        self._evict_if_needed()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict_if_needed(self):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            if self._total_bytes <= self.max_bytes:
+                return
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+                evicted += 1
+            self._total_bytes = total
+        logger.debug(f"Evicted {evicted} LLM cache entries, {total} bytes remain")
+
+    def cached_completion(self, model, temperature, messages, max_tokens, create):
+        """
+        Return the response content for this request, calling create() on a miss.
+
+        create() must return the response content as a string.
+        """
+        key = self.make_key(model, temperature, messages, max_tokens)
+        record = self.get(key, temperature)
+        if record is not None:
+            return record['content']
+        content = create()
+        self.put(key, {
+            'model': model,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'messages': messages,
+            'content': content,
+            'created': time.time(),
+        })
+        return content
@@ -1,17 +1,25 @@
 #!/usr/bin/env uv run --script
 import os
-import readline
+import argparse
 import json
+import logging
 import time
 import traceback
 from datetime import datetime
 from openai_helper import OpenAIHelper
-from domain_checker import check_domain_availability
+from llm_cache import LLMResponseCache, CACHE_MODES
+from domain_checker import (BREAKERS, TIER_SCHEDULER, Deadline, check_domain_availability, check_domains_until,
+                            configure_route53_pool)
 from utils import load_api_key
 from logging_config import setup_logging
+from search_pipeline import GenerationTimeout, PrefetchingGenerator
+from domain_ranker import rank_domains, score_domain, search_priority
+from candidate_filter import filter_candidates, normalize_candidate, TOO_LONG
+from candidate_generator import CandidateStream, extract_seeds
+from session_stats import SessionStats
+from known_set import KnownDomainSet
 
-# Set up logging first
-logger, log_file = setup_logging()
+logger = logging.getLogger(__name__)
 
 
 def get_cache_dir():
@@ -51,6 +59,8 @@ def save_query_history(queries):
 
 def setup_readline_history():
     # Set up readline with custom history file in .cache directory
+    import readline
+
     histfile = os.path.join(get_cache_dir(), ".domain_finder_history")
     try:
         readline.read_history_file(histfile)
@@ -104,7 +114,7 @@ def load_cached_results(query):
     }
 
 
-def save_domains_to_cache(query, available_domains, unavailable_domains, existing_data=None):
+def save_domains_to_cache(query, available_domains, unavailable_domains, existing_data=None, stats=None):
     try:
         if existing_data is None:
             existing_data = load_cached_results(query)
@@ -117,6 +127,8 @@ def save_domains_to_cache(query, available_domains, unavailable_domains, existin
             'new_available_domains': list(set(available_domains)),  # Deduplicate new results
             'new_unavailable_domains': list(set(unavailable_domains))  # Deduplicate new results
         }
+        if stats is not None:
+            search_data['stats'] = stats
         
         # Update the main data structure
         existing_data['searches'].append(search_data)
@@ -149,22 +161,39 @@ def save_domains_to_cache(query, available_domains, unavailable_domains, existin
         raise
 
 
-def check_domain_with_backoff(domain, base_delay=0, max_retries=3):
+def save_session_stats(query, record, existing_data=None):
+    """Append one session's search-efficiency record to the query's cache file."""
+    try:
+        if existing_data is None:
+            existing_data = load_cached_results(query)
+        existing_data.setdefault('sessions', []).append(record)
+        cache_file = get_cache_file_path(query)
+        with open(cache_file, 'w') as f:
+            json.dump(existing_data, f, indent=2)
+        logger.info(f"Saved session stats for {len(record['rounds'])} rounds to {cache_file}")
+        return cache_file
+    except Exception as e:
+        logger.error(f"Error saving session stats: {e}", exc_info=True)
+        raise
+
+
+def check_domain_with_backoff(domain, base_delay=0, max_retries=3, cancel_event=None):
     """Check domain availability with exponential backoff on failure.
     
     The base_delay parameter is only used for exponential backoff between retries
     when errors occur. There is no delay between successful domain checks.
     AWS Route 53 API calls have a separate 1-second rate limit.
     
-    Returns (is_available, status) where status can be 'available', 'taken', or 'error'
+    Returns (is_available, status) where status can be 'available', 'taken', 'error',
+    or 'unchecked' if cancel_event was set before a verdict was reached
     """
     for attempt in range(max_retries):
         try:
 
-            is_available, status = check_domain_availability(domain)
+            is_available, status = check_domain_availability(domain, cancel_event=cancel_event)
             
             # If we got a successful result (available or taken), return it
-            if status in ('available', 'taken'):
+            if status in ('available', 'taken', 'unchecked'):
                 return is_available, status
             
             # If we got an error, retry
@@ -207,14 +236,16 @@ def get_max_domain_length(cached_domains, available_domains=None, default_max=30
     if not cached_domains:
         return default_max
     
-    # Get sorted lengths of cached domains
-    lengths = sorted([len(d) for d in cached_domains])
-    
     # Use 90th percentile length to allow more creative/longer domains
-    percentile_idx = int(0.90 * len(lengths))
-    if percentile_idx >= len(lengths):
-        percentile_idx = len(lengths) - 1
-    suggested_length = lengths[percentile_idx]
+    if isinstance(cached_domains, KnownDomainSet):
+        # Read from its length histogram instead of sorting millions of lengths
+        suggested_length = cached_domains.length_percentile(0.90)
+    else:
+        lengths = sorted([len(d) for d in cached_domains])
+        percentile_idx = int(0.90 * len(lengths))
+        if percentile_idx >= len(lengths):
+            percentile_idx = len(lengths) - 1
+        suggested_length = lengths[percentile_idx]
     
     # If we have available domains, ensure we can generate similar lengths
     if available_domains and len(available_domains) > 0:
@@ -231,61 +262,358 @@ def get_max_domain_length(cached_domains, available_domains=None, default_max=30
     return suggested_length
 
 
-def check_domains_batch(domains, known_domains, available_list, unavailable_list, max_length):
-    """Check a batch of domains with rate limiting"""
-    # Deduplicate input domains and filter by length
-    unique_domains = [d.lower() for d in domains if len(d) <= max_length]
-    unique_domains = list(dict.fromkeys(unique_domains))
-    known_set = set(d.lower() for d in known_domains)
-    
-    if len(domains) > len(unique_domains):
-        print(f"\nSkipping {len(domains) - len(unique_domains)} domains that exceed maximum length of {max_length} characters")
-    
-    for domain in unique_domains:
-        if domain not in known_set:  # Only check new domains
-            print(f"Checking domain: {domain}")  # Show progress
-            is_available, status = check_domain_with_backoff(domain)
-            
-            if status == 'available' and is_available:
-                available_list.append(domain)
-                print(f"✓ {domain} is available!")
-            elif status == 'taken':
-                unavailable_list.append(domain)
-                print(f"✗ {domain} is taken")
-            elif status == 'error':
-                # Don't add to unavailable_list for errors, just log
-                print(f"⚠ {domain} - error occurred during check")
-                logger.warning(f"Could not determine availability for {domain} due to errors")
-
-
-def display_top_domains(all_domains, limit=20):
-    """Display all domains, sorted alphabetically"""
-    # Deduplicate domains while preserving order
-    unique_domains = list(dict.fromkeys(all_domains))
-    
-    # Sort domains first by length, then alphabetically
-    sorted_domains = sorted(unique_domains, key=lambda x: (len(x), x))
-    
+def check_domains_batch(domains, known_domains, available_list, unavailable_list, max_length,
+                        target=None, max_workers=1, time_budget=None, stats=None):
+    """Check a batch of domains with rate limiting.
+
+    Candidates are checked most promising first (predicted availability times
+    memorability). With a target, checking stops once that many available
+    domains are found; with a time_budget (seconds), once it is spent. The
+    unchecked candidates are returned so the caller can keep them for the
+    next round. Filtering and verdicts are counted in stats (a SessionStats) if given.
+    known_domains should be a KnownDomainSet; conclusive verdicts are added to it.
+    """
+    if not isinstance(known_domains, KnownDomainSet):
+        known_domains = KnownDomainSet(known_domains, track_near_keys=True)
+    # Validate, canonicalize and drop known/near-duplicate names before any network check
+    filtered = filter_candidates(domains, known_domains, max_length=max_length, allowed_tlds=['com'])
+    if stats is not None:
+        stats.record_filter(filtered)
+
+    if filtered.dropped:
+        print(f"\nSkipping {filtered.dropped_count} of {len(domains)} suggestions before checking ({filtered.summary()})")
+        if TOO_LONG in filtered.dropped:
+            print(f"Maximum length is {max_length} characters")
+
+    def check(domain, cancel_event=None):
+        print(f"Checking domain: {domain}")  # Show progress
+        return check_domain_with_backoff(domain, cancel_event=cancel_event)
+
+    def report(domain, is_available, status):
+        if stats is not None:
+            stats.record_verdict(status)
+        if status == 'available' and is_available:
+            available_list.append(domain)
+            known_domains.add(domain)
+            print(f"✓ {domain} is available!")
+        elif status == 'taken':
+            unavailable_list.append(domain)
+            known_domains.add(domain)
+            print(f"✗ {domain} is taken")
+        elif status == 'error':
+            # Don't add to unavailable_list for errors, just log
+            print(f"⚠ {domain} - error occurred during check")
+            logger.warning(f"Could not determine availability for {domain} due to errors")
+
+    _, remaining = check_domains_until(filtered.accepted, target=target, max_workers=max_workers,
+                                       priority=search_priority, check=check, on_result=report,
+                                       time_budget=time_budget)
+    if remaining:
+        logger.info(f"Stopped early, keeping {len(remaining)} unchecked candidates for later")
+    return remaining
+
+
+def refine_ranking_with_llm(openai_helper, ranked_domains, top_n):
+    """Let the LLM reorder the top_n locally ranked domains; the rest keep their order."""
+    head, tail = ranked_domains[:top_n], ranked_domains[top_n:]
+    if len(head) < 2:
+        return ranked_domains
+    try:
+        rankings = openai_helper.rank_domain_names(head)
+    except Exception as e:
+        logger.warning(f"LLM ranking refinement failed, keeping local ranking: {e}")
+        return ranked_domains
+
+    # Rankings are free-form strings; order by where each domain is first mentioned
+    def first_mention(domain):
+        for position, entry in enumerate(rankings):
+            if domain in str(entry).lower():
+                return position
+        return len(rankings)
+
+    refined = sorted(head, key=lambda d: (first_mention(d), head.index(d)))
+    return refined + tail
+
+
+def display_top_domains(all_domains, limit=20, refine=None):
+    """Display all domains, most memorable first.
+
+    Domains are ranked by the local memorability scorer. refine, if given,
+    is called with the ranked list and may reorder it (e.g. an LLM pass over
+    the top entries).
+    """
+    sorted_domains = rank_domains(all_domains)
+    if refine is not None and sorted_domains:
+        sorted_domains = refine(sorted_domains)
+
     if not sorted_domains:
         print("\nNo domains to display.")
         return
-    
+
     # Always show all domains
-    print(f"\nAll {len(sorted_domains)} domains (sorted by length, then alphabetically):")
+    print(f"\nAll {len(sorted_domains)} domains (ranked by memorability):")
     for rank, domain in enumerate(sorted_domains, 1):
-        print(f"{rank:2d}. {domain} ({len(domain)} chars)")
+        print(f"{rank:2d}. {domain} ({len(domain)} chars, score {score_domain(domain):.0f})")
+
+
+def build_generation_prompt(user_input, known_domains, unavailable_domains, max_length):
+    """Build the generation prompt from everything known about this query so far."""
+    prompt = (
+        f"Generate 20 unique and creative domain name suggestions, typically 1-3 words, "
+        f"based on the following idea: {user_input}. "
+        f"CRITICAL: Each domain must be no longer than {max_length} characters including '.com'. This is a hard limit - any domain longer than {max_length} characters will be automatically filtered out. "
+        f"Generate domains with the .com extension (e.g., example.com). "
+        f"IMPORTANT: The domain name will be HEARD by the audience (spoken aloud), not just read. "
+        f"They need to remember it for a few minutes before typing it into their browser. "
+        f"Therefore, domains must be: "
+        f"(1) Easily remembered when heard - use simple, memorable words "
+        f"(2) Easy to spell correctly - avoid complex spellings, homophones, or words that sound similar to other common words "
+        f"(3) Phonetically clear - the spelling should be obvious from how it sounds "
+        f"(4) Not easily confused - avoid domains that sound like other common words or domains "
+        f"(5) Easy to remember for non-native English speakers - use common English words, avoid idioms, slang, or culturally specific references "
+        f"(6) Avoid plural forms if possible - prefer singular nouns to make the domain simpler and easier to remember "
+        f"(7) Consider using pinyin romanization when appropriate - the audience may prefer pinyin-based words in the domain name."
+        f"(8) Do not use zen or other japanese words."
+    )
+    if known_domains:
+        prompt += f"\nPlease avoid these existing domains: {', '.join(known_domains)}"
+    if unavailable_domains:
+        prompt += (
+            f" Please avoid these already taken domains: {', '.join(unavailable_domains)}. "
+            f"CRITICAL: Keep domains under {max_length} characters (hard limit), and prioritize "
+            f"domains that are easily remembered and spelled correctly when heard, "
+            f"especially for non-native English speakers. Prefer singular forms over plural when possible. "
+            f"Consider using pinyin romanization when it would help the audience remember the domain."
+        )
+    return prompt
+
+
+def run_search_rounds(openai_helper, user_input, cached_data, histfile, args, stats=None):
+    """Run generate/check rounds for one query until the user stops asking for more.
+
+    Generation is pipelined with checking: while one batch is being checked,
+    up to args.lookahead further batches are generated in the background from
+    the verdicts known at that moment. Each round is accounted in stats, and
+    the rounds of this run are saved to the query's cache file at the end.
+    """
+    stats = stats if stats is not None else SessionStats()
+    first_round = len(stats.rounds)
+    outside_at_start = stats.outside_counts()
+    refine = None
+    if args.llm_rank_top > 0:
+        refine = lambda ranked: refine_ranking_with_llm(openai_helper, ranked, args.llm_rank_top)
+
+    available_domains = []
+    unavailable_domains = []
+
+    # Every domain with a verdict for this query, built once and grown as checks finish; shared by
+    # the pre-check filter, the local generator and the prompt's avoid-list
+    known = KnownDomainSet(filter(None, map(normalize_candidate, cached_data['available_domains']
+                                            + cached_data['unavailable_domains'])), track_near_keys=True)
+    marked = [0, 0]
+
+    def newly_known():
+        """Verdicts found since the last call, so the local generator is told about each only once."""
+        available_count, taken_count = len(available_domains), len(unavailable_domains)
+        new = available_domains[marked[0]:available_count] + unavailable_domains[marked[1]:taken_count]
+        marked[:] = [available_count, taken_count]
+        return new
+
+    stream = None
+    if args.generator != 'llm':
+        seeds = extract_seeds(user_input)
+        if args.generator == 'seeded':
+            try:
+                seeds = list(dict.fromkeys(openai_helper.extract_keywords(user_input) + seeds))
+            except Exception as e:
+                logger.error(f"Error extracting keywords, using query words as seeds: {e}", exc_info=True)
+        logger.info(f"Local generator seeds: {', '.join(seeds)}")
+        stream = CandidateStream(seeds, known=known,
+                                 max_length=get_max_domain_length(known, cached_data['available_domains']))
+
+    def generate_batch():
+        if stream is not None:
+            stream.mark_known(newly_known())
+            suggestions = stream.next_batch(args.batch_size)
+            if not suggestions:
+                raise RuntimeError("Local generator has run out of candidates for these seeds")
+            logger.info(f"Generated {len(suggestions)} local domain suggestions")
+            return suggestions
+        max_length = get_max_domain_length(known, cached_data['available_domains'])
+        prompt = build_generation_prompt(user_input, known, list(unavailable_domains), max_length)
+        suggestions = openai_helper.generate_domain_names(prompt)
+        logger.info(f"Generated {len(suggestions)} domain suggestions")
+        return suggestions
+
+    # A round ends once this many new available domains are found
+    round_goal = args.target or 1
+    # Candidates left unchecked when an earlier round met its goal
+    pending = []
+
+    pipeline = PrefetchingGenerator(generate_batch, lookahead=args.lookahead).start()
+    try:
+        while True:
+            try:
+                # Track available domains count at start of this iteration
+                available_before_iteration = len(available_domains)
+                round_deadline = Deadline(args.round_slo)
+                stats.start_round(user_input, known=len(known))
+
+                while True:
+                    if pending:
+                        domain_suggestions, pending = pending, []
+                    else:
+                        try:
+                            # The round's time limit also covers waiting for the next batch
+                            domain_suggestions = pipeline.get(
+                                timeout=round_deadline.remaining() if args.round_slo else None)
+                            stats.record_suggestions(len(domain_suggestions))
+                        except GenerationTimeout:
+                            found = len(available_domains) - available_before_iteration
+                            print(f"\nRound time limit of {args.round_slo:.0f}s reached while generating "
+                                  f"suggestions, with {found} new available domains.")
+                            break
+                        except Exception as e:
+                            logger.error(f"Error generating domain names: {e}", exc_info=True)
+                            print(f"\nError generating domain suggestions: {e}")
+                            break
 
+                    max_length = get_max_domain_length(known, cached_data['available_domains'])
+                    found = len(available_domains) - available_before_iteration
 
-def main():
+                    print("\nChecking domain availability...")
+                    pending = check_domains_batch(
+                        domain_suggestions, known, available_domains, unavailable_domains, max_length,
+                        target=round_goal - found if args.target else None, max_workers=args.workers,
+                        time_budget=round_deadline.remaining() if args.round_slo else None, stats=stats
+                    )
+
+                    found = len(available_domains) - available_before_iteration
+                    if found >= round_goal:
+                        break
+                    if round_deadline.is_set():
+                        print(f"\nRound time limit of {args.round_slo:.0f}s reached with {found} new available domains.")
+                        break
+                    if found:
+                        print(f"\nFound {found} of {round_goal} available domains. Generating more suggestions...")
+                    else:
+                        print("\nNo new available domains found. Generating more suggestions...")
+
+                finished_round = stats.end_round()
+                if available_domains:
+                    print("\nNewly found available domains:")
+                    display_top_domains(available_domains, refine=refine)
+
+                    print(f"\nNumber of unavailable domains in this search: {len(unavailable_domains)}")
+
+                    # Save domains to cache
+                    try:
+                        cache_file = save_domains_to_cache(user_input, available_domains, unavailable_domains, cached_data,
+                                                           stats=finished_round.to_dict())
+                        print(f"\nDomain search results saved to: {cache_file}")
+                    except Exception as e:
+                        logger.error(f"Error saving domains to cache: {e}", exc_info=True)
+
+                    # Show total available domains after this search
+                    all_available = cached_data['available_domains'] + available_domains
+                    print(f"\nTotal available domains found so far: {len(all_available)}")
+                    display_top_domains(all_available, refine=refine)
+
+                print("\nWould you like to generate more ideas based on these results?")
+                print("Enter 'y' for yes or 'n' for no:")
+                user_choice = input("> ").lower()
+                if histfile:
+                    try:
+                        import readline
+                        readline.write_history_file(histfile)
+                    except Exception as e:
+                        logger.error(f"Error saving readline history: {e}", exc_info=True)
+                if user_choice in ['n', 'no']:
+                    break
+            except KeyboardInterrupt:
+                logger.info("User interrupted with Ctrl+C")
+                raise
+            except Exception as e:
+                logger.error(f"Error in domain generation loop: {e}", exc_info=True)
+                print(f"\nAn error occurred: {e}")
+                print("Please try again or type 'quit' to exit.")
+                break
+    finally:
+        # Stop prefetching on 'n', errors and Ctrl+C alike
+        pipeline.close()
+        stats.end_round()
+        if len(stats.rounds) > first_round:
+            try:
+                save_session_stats(user_input, stats.record(stats.rounds[first_round:], outside_at_start),
+                                   cached_data)
+            except Exception as e:
+                logger.error(f"Error saving session stats: {e}", exc_info=True)
+        for line in TIER_SCHEDULER.summary_lines():
+            logger.info(f"Tier stats: {line}")
+        for line in BREAKERS.summary_lines():
+            logger.info(f"Circuit breaker: {line}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Interactive domain name finder.')
+    parser.add_argument('--lookahead', type=int, default=1,
+                        help='Number of suggestion batches to generate ahead of the checker (0 disables prefetching)')
+    parser.add_argument('--llm-cache', choices=CACHE_MODES, default='readwrite',
+                        help="LLM response cache mode; 'replay' answers only from recorded responses and needs no API key")
+    parser.add_argument('--llm-cache-reuse', action='store_true',
+                        help='Reuse cached responses for sampled (non-zero temperature) requests')
+    parser.add_argument('--llm-cache-size', type=float, default=50.0,
+                        help='Maximum size of the LLM response cache in MB')
+    parser.add_argument('--generator', choices=('llm', 'local', 'seeded'), default='llm',
+                        help="Where candidates come from: 'llm' asks DeepSeek for every batch, 'local' combines "
+                             "words from the query offline, 'seeded' asks DeepSeek once for seed words and then "
+                             "generates locally")
+    parser.add_argument('--batch-size', type=int, default=20,
+                        help='Candidates per batch for the local generators')
+    parser.add_argument('--target', type=int, default=None,
+                        help='Finish each round as soon as this many new available domains are found')
+    parser.add_argument('--round-slo', type=float, default=None,
+                        help='End a round after this many seconds even if its goal is not met; '
+                             'unchecked candidates carry over to the next round')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Number of domains checked concurrently')
+    parser.add_argument('--aws-profiles', metavar='NAMES',
+                        help='Comma-separated AWS profiles to spread Route 53 checks over '
+                             '(default: $DOMAIN_CHECK_AWS_PROFILES, else the default credentials)')
+    parser.add_argument('--llm-rank-top', type=int, default=0,
+                        help='Ask the LLM to reorder the top N locally ranked domains (0 uses the local ranking only)')
+    args = parser.parse_args(argv)
+    if args.llm_cache == 'replay' and (args.lookahead or args.workers > 1):
+        # Prompts are built from the verdicts known when they are generated, so replay must generate
+        # and check in the recorded order: no prefetching and one check at a time
+        args.lookahead = 0
+        args.workers = 1
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Only now: --help should not create a log file
+    _, log_file = setup_logging()
+    # Importing readline also gives input() line editing and history
+    import readline
     try:
+        if args.aws_profiles:
+            configure_route53_pool(args.aws_profiles.split(','))
         api_key = load_api_key()
-        if not api_key:
+        if not api_key and args.llm_cache != 'replay':
             error_msg = "Error: DeepSeek API key not found. Please add it to ~/.mingdaoai/deepseek.key"
             print(error_msg)
             logger.error(error_msg)
             return
 
-        openai_helper = OpenAIHelper(api_key)
+        llm_cache = LLMResponseCache(
+            mode=args.llm_cache,
+            max_bytes=int(args.llm_cache_size * 1024 * 1024),
+            reuse_nonzero_temperature=args.llm_cache_reuse
+        )
+        session_stats = SessionStats()
+        openai_helper = OpenAIHelper(api_key, cache=llm_cache, stats=session_stats)
         logger.info("DeepSeek API client initialized successfully")
 
         print("Welcome to the Domain Name Finder!")
@@ -354,108 +682,7 @@ def main():
                     display_top_domains(cached_data['available_domains'])
                     print("\nGenerating additional suggestions...")
 
-                available_domains = []
-                unavailable_domains = []
-
-                while True:
-                    try:
-                        # Track available domains count at start of this iteration
-                        available_before_iteration = len(available_domains)
-                        
-                        # Start with all previously known domains to avoid duplicates
-                        known_domains = cached_data['available_domains'] + cached_data['unavailable_domains']
-                        
-                        # Get maximum allowed domain length based on existing domains
-                        max_length = get_max_domain_length(known_domains, cached_data['available_domains'])
-                        
-                        prompt = (
-                            f"Generate 20 unique and creative domain name suggestions, typically 1-3 words, "
-                            f"based on the following idea: {user_input}. "
-                            f"CRITICAL: Each domain must be no longer than {max_length} characters including '.com'. This is a hard limit - any domain longer than {max_length} characters will be automatically filtered out. "
-                            f"Generate domains with the .com extension (e.g., example.com). "
-                            f"IMPORTANT: The domain name will be HEARD by the audience (spoken aloud), not just read. "
-                            f"They need to remember it for a few minutes before typing it into their browser. "
-                            f"Therefore, domains must be: "
-                            f"(1) Easily remembered when heard - use simple, memorable words "
-                            f"(2) Easy to spell correctly - avoid complex spellings, homophones, or words that sound similar to other common words "
-                            f"(3) Phonetically clear - the spelling should be obvious from how it sounds "
-                            f"(4) Not easily confused - avoid domains that sound like other common words or domains "
-                            f"(5) Easy to remember for non-native English speakers - use common English words, avoid idioms, slang, or culturally specific references "
-                            f"(6) Avoid plural forms if possible - prefer singular nouns to make the domain simpler and easier to remember "
-                            f"(7) Consider using pinyin romanization when appropriate - the audience may prefer pinyin-based words in the domain name."
-                            f"(8) Do not use zen or other japanese words."
-                        )
-                        if known_domains:
-                            prompt += f"\nPlease avoid these existing domains: {', '.join(known_domains)}"
-                        
-                        try:
-                            domain_suggestions = openai_helper.generate_domain_names(prompt)
-                            logger.info(f"Generated {len(domain_suggestions)} domain suggestions")
-                        except Exception as e:
-                            logger.error(f"Error generating domain names: {e}", exc_info=True)
-                            print(f"\nError generating domain suggestions: {e}")
-                            break
-                        
-                        print("\nChecking domain availability...")
-                        check_domains_batch(domain_suggestions, known_domains, available_domains, unavailable_domains, max_length)
-
-                        while len(available_domains) == available_before_iteration:
-                            print("\nNo new available domains found. Generating more suggestions...")
-                            all_unavailable = known_domains + unavailable_domains
-                            new_prompt = (
-                                f"{prompt} Please avoid these already taken domains: {', '.join(all_unavailable)}. "
-                                f"CRITICAL: Keep domains under {max_length} characters (hard limit), and prioritize "
-                                f"domains that are easily remembered and spelled correctly when heard, "
-                                f"especially for non-native English speakers. Prefer singular forms over plural when possible. "
-                                f"Consider using pinyin romanization when it would help the audience remember the domain."
-                            )
-                            try:
-                                new_domain_suggestions = openai_helper.generate_domain_names(new_prompt)
-                                logger.info(f"Generated {len(new_domain_suggestions)} additional domain suggestions")
-                            except Exception as e:
-                                logger.error(f"Error generating additional domain names: {e}", exc_info=True)
-                                print(f"\nError generating additional suggestions: {e}")
-                                break
-                            
-                            print("\nChecking new suggestions...")
-                            check_domains_batch(new_domain_suggestions, all_unavailable, available_domains, unavailable_domains, max_length)
-
-                        if available_domains:
-                            print("\nNewly found available domains:")
-                            display_top_domains(available_domains)
-
-                            print(f"\nNumber of unavailable domains in this search: {len(unavailable_domains)}")
-
-                            # Save domains to cache
-                            try:
-                                cache_file = save_domains_to_cache(user_input, available_domains, unavailable_domains, cached_data)
-                                print(f"\nDomain search results saved to: {cache_file}")
-                            except Exception as e:
-                                logger.error(f"Error saving domains to cache: {e}", exc_info=True)
-
-                            # Show total available domains after this search
-                            all_available = cached_data['available_domains'] + available_domains
-                            print(f"\nTotal available domains found so far: {len(all_available)}")
-                            display_top_domains(all_available)
-
-                        print("\nWould you like to generate more ideas based on these results?")
-                        print("Enter 'y' for yes or 'n' for no:")
-                        user_choice = input("> ").lower()
-                        if histfile:
-                            try:
-                                readline.write_history_file(histfile)
-                            except Exception as e:
-                                logger.error(f"Error saving readline history: {e}", exc_info=True)
-                        if user_choice in ['n', 'no']:
-                            break
-                    except KeyboardInterrupt:
-                        logger.info("User interrupted with Ctrl+C")
-                        raise
-                    except Exception as e:
-                        logger.error(f"Error in domain generation loop: {e}", exc_info=True)
-                        print(f"\nAn error occurred: {e}")
-                        print("Please try again or type 'quit' to exit.")
-                        break
+                run_search_rounds(openai_helper, user_input, cached_data, histfile, args, stats=session_stats)
             except KeyboardInterrupt:
                 print("\n\nThank you for using the Domain Name Finder. Goodbye!")
                 logger.info("User interrupted with Ctrl+C")
@@ -468,6 +695,18 @@ def main():
         logger.critical(f"Fatal error in main: {e}", exc_info=True)
         print(f"\nFatal error: {e}")
         print(f"Check log file for details: {log_file}")
+        return
+    print_session_summary(session_stats)
+
+
+def print_session_summary(session_stats):
+    """Show what this session spent per available domain found."""
+    if not session_stats.rounds:
+        return
+    print("\nSession summary:")
+    for line in session_stats.summary_lines():
+        print(f"  {line}")
+        logger.info(f"Session stats: {line}")
 
 
 if __name__ == "__main__":
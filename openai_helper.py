@@ -1,11 +1,29 @@
 import logging
-from openai import OpenAI
+
+from llm_cache import LLMResponseCache
 
 logger = logging.getLogger(__name__)
 
+MODEL = "deepseek-chat"
+
+
 class OpenAIHelper:
-    def __init__(self, api_key):
+    def __init__(self, api_key, cache=None, stats=None):
+        """
+        cache is an optional LLMResponseCache. In replay mode no client is
+        created and every request must be answered from the cache.
+        stats is an optional SessionStats that is told the token usage of
+        every completion.
+        """
+        self.cache = cache if cache is not None else LLMResponseCache(mode='off')
+        self.stats = stats
+        self.client = None
+        if self.cache.mode == 'replay':
+            logger.info("DeepSeek client disabled, replaying cached responses")
+            return
         try:
+            # Imported here: the SDK takes longer to import than the rest of the app, and replay never needs it
+            from openai import OpenAI
             self.client = OpenAI(
                 api_key=api_key,
                 base_url="https://api.deepseek.com"
@@ -15,6 +33,33 @@ class OpenAIHelper:
             logger.error(f"Error initializing DeepSeek client: {e}", exc_info=True)
             raise
 
+    def _complete(self, messages, temperature=0.7, max_tokens=4096):
+        """Return the content of a chat completion, served from the cache when allowed."""
+        usage = {}
+
+        def create():
+            response = self.client.chat.completions.create(
+                model=MODEL,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=messages
+            )
+            try:
+                content = response.choices[0].message.content
+            except (IndexError, AttributeError) as e:
+                logger.error(f"Error accessing response content: {e}. Response structure: {response}", exc_info=True)
+                raise
+            usage['prompt_tokens'] = getattr(response.usage, 'prompt_tokens', 0) or 0
+            usage['completion_tokens'] = getattr(response.usage, 'completion_tokens', 0) or 0
+            return content if content is not None else ""
+
+        content = self.cache.cached_completion(MODEL, temperature, messages, max_tokens, create)
+        if self.stats is not None:
+            # create() never ran when the answer came from the cache
+            self.stats.record_llm_call(usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0),
+                                       cached=not usage)
+        return content
+
     def generate_domain_names(self, user_input):
         try:
             assert "domain" in user_input, "User input must contain the word 'domain'"
@@ -26,10 +71,7 @@ class OpenAIHelper:
                       f" Include the .com extension in each domain name (e.g., example.com).")
 
             try:
-                response = self.client.chat.completions.create(
-                    model="deepseek-chat",
-                    max_tokens=4096,
-                    temperature=0.7,
+                message_content = self._complete(
                     messages=[
                         {"role": "system", "content": "You are a helpful assistant that generates creative domain name suggestions in JSON format. "
                            "When generating domains, prioritize names that are easy to remember and spell correctly "
@@ -41,7 +83,7 @@ class OpenAIHelper:
                         {"role": "user", "content": prompt}
                     ]
                 )
-                logger.debug("Received response from DeepSeek API")
+                logger.debug(f"Received response from DeepSeek API, content length: {len(message_content)}")
             except Exception as e:
                 logger.error(f"Error calling DeepSeek API: {e}", exc_info=True)
                 raise
@@ -49,15 +91,6 @@ class OpenAIHelper:
             import json
             import re
 
-            try:
-                message_content = response.choices[0].message.content
-                if message_content is None:
-                    message_content = ""
-                logger.debug(f"Response content length: {len(message_content)}")
-            except (IndexError, AttributeError) as e:
-                logger.error(f"Error accessing response content: {e}. Response structure: {response}", exc_info=True)
-                raise
-
             message_content = message_content.strip().replace("\n", "")
             
             # Use regex to find the JSON part enclosed in curly braces
@@ -81,6 +114,45 @@ class OpenAIHelper:
             logger.error(f"Error in generate_domain_names: {e}", exc_info=True)
             raise
 
+    def extract_keywords(self, user_input, limit=8):
+        """Ask the LLM for seed words for the local candidate generator."""
+        try:
+            logger.debug(f"Extracting keywords from query: {user_input}")
+            prompt = (f"Extract up to {limit} short, simple English words or pinyin syllables that capture the idea "
+                      f"behind this domain name request: {user_input}. Include close synonyms that would work well "
+                      f"in a domain name. Provide them in a JSON format, with a key 'keywords' and value of an array "
+                      f"of lowercase strings.")
+            try:
+                content = self._complete(
+                    messages=[
+                        {"role": "system", "content": "You are a helpful assistant that extracts keywords for domain name generation in JSON format."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0
+                )
+            except Exception as e:
+                logger.error(f"Error calling DeepSeek API for keywords: {e}", exc_info=True)
+                raise
+
+            import json
+            import re
+
+            json_match = re.search(r'\{.*\}', content.strip().replace("\n", ""), re.DOTALL)
+            keywords = []
+            if json_match:
+                try:
+                    keywords = json.loads(json_match.group()).get('keywords', [])
+                except json.JSONDecodeError as e:
+                    logger.error(f"Error parsing keyword JSON: {e}. Content: {content[:500]}", exc_info=True)
+            else:
+                logger.warning(f"No JSON pattern found in keyword response. Content: {content[:500]}")
+            result = [str(k).strip().lower() for k in keywords if str(k).strip()][:limit]
+            logger.info(f"Extracted {len(result)} keywords")
+            return result
+        except Exception as e:
+            logger.error(f"Error in extract_keywords: {e}", exc_info=True)
+            raise
+
     def rank_domain_names(self, domain_names):
         try:
             logger.debug(f"Ranking {len(domain_names)} domain names")
@@ -89,28 +161,19 @@ class OpenAIHelper:
                       f" and each suggestion as a string in the array.")
 
             try:
-                response = self.client.chat.completions.create(
-                    model="deepseek-chat",
-                    max_tokens=4096,
-                    temperature=0.7,
+                rankings = self._complete(
                     messages=[
                         {"role": "system", "content": "You are a helpful assistant that ranks domain names based on memorability."},
                         {"role": "user", "content": prompt}
-                    ]
+                    ],
+                    # Deterministic, so ranking the same names again is a cache hit
+                    temperature=0
                 )
+                logger.debug(f"Ranking response length: {len(rankings)}")
             except Exception as e:
                 logger.error(f"Error calling DeepSeek API for ranking: {e}", exc_info=True)
                 raise
 
-            try:
-                rankings = response.choices[0].message.content
-                if rankings is None:
-                    rankings = ""
-                logger.debug(f"Ranking response length: {len(rankings)}")
-            except (IndexError, AttributeError) as e:
-                logger.error(f"Error accessing ranking response content: {e}. Response: {response}", exc_info=True)
-                raise
-
             import json
             import re
 
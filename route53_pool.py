@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from circuit_breaker import CLOSED, BreakerRegistry
+from domain_checker import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Route 53 Domains is only served from us-east-1
+REGION = 'us-east-1'
+
+# Highest rate (calls per second) an account's AIMD estimate may reach when there are several
+MULTI_ACCOUNT_MAX_RATE = 2.0
+
+
+def default_client_factory(profile: Optional[str], connect_timeout: float, read_timeout: float):
+    """Route 53 Domains client for a named AWS profile (None: the default credential chain)."""
+    import boto3
+    from botocore.config import Config
+    config = Config(connect_timeout=connect_timeout, read_timeout=read_timeout, retries={'max_attempts': 1})
+    return boto3.session.Session(profile_name=profile).client('route53domains', region_name=REGION, config=config)
+
+
+class Route53Account:
+    """
+    One set of AWS credentials: its own clients, token bucket and circuit breaker.
+
+    The bucket's rate is the account's estimated quota. It grows additively
+    after each successful call, up to max_rate, and is halved on every
+    throttling error (AIMD), so it settles just under what AWS allows.
+    With shared_path the bucket is a SharedTokenBucket in that SQLite file,
+    so every process using the account draws from the same quota.
+    """
+
+    def __init__(self, profile: Optional[str], breaker, client_factory: Callable,
+                 rate: float = 1.0, min_rate: float = 0.2, max_rate: float = 2.0, increase: float = 0.05,
+                 shared_path: Optional[str] = None):
+        self.profile = profile
+        self.name = profile or 'default'
+        self.breaker = breaker
+        self.client_factory = client_factory
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        if shared_path is None:
+            self.bucket = TokenBucket(rate, capacity=1.0)
+        else:
+            from shared_bucket import SharedTokenBucket
+            self.bucket = SharedTokenBucket(shared_path, breaker.name, rate, capacity=1.0)
+            # Another process may have left a rate outside this one's bounds
+            self._set_rate(self.bucket.rate)
+        self.calls = 0
+        self.throttles = 0
+        self._clients: Dict = {}
+        self._lock = threading.Lock()
+
+    def client(self, connect_timeout: float = 5.0, read_timeout: float = 15.0):
+        """Client for this account, created once per timeout pair and reused (clients are thread-safe)."""
+        # Creating clients from a boto3 session is not thread-safe
+        with self._lock:
+            key = (connect_timeout, read_timeout)
+            client = self._clients.get(key)
+            if client is None:
+                client = self.client_factory(self.profile, connect_timeout, read_timeout)
+                self._clients[key] = client
+            return client
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    def _set_rate(self, rate: float) -> None:
+        self.bucket.set_rate(min(self.max_rate, max(self.min_rate, rate)))
+
+    def snapshot(self) -> Dict:
+        return {'rate': round(self.rate, 3), 'calls': self.calls, 'throttles': self.throttles,
+                'breaker': self.breaker.state}
+
+
+class Route53Pool:
+    """
+    Spreads Route 53 Domains calls over one or more AWS accounts.
+
+    Route 53 Domains throttles per account, so each account gets its own
+    token bucket and circuit breaker ('route53' for the default credentials,
+    'route53:<profile>' for named profiles). acquire() hands out the account
+    whose next token comes soonest, which weights traffic by each account's
+    learned quota. Accounts whose breaker is open are skipped until their
+    half-open probe is due; the probe then takes the account's next slot
+    ahead of the healthy accounts, so a throttled account rejoins the pool
+    once it recovers. client_factory(profile, connect_timeout,
+    read_timeout) builds the clients and can be replaced, e.g. to return
+    clients wrapped in botocore's Stubber.
+
+    Each account starts at rate calls per second. max_rate defaults to rate
+    for a single account, which keeps the fixed rate of the single-client
+    setup, and to MULTI_ACCOUNT_MAX_RATE when there are several. With
+    shared_path the accounts' buckets and rates are shared with every other
+    process that uses the same file (see SharedTokenBucket); without it they
+    only limit this process.
+    """
+
+    def __init__(self, profiles: Iterable[Optional[str]] = (None,), breakers: Optional[BreakerRegistry] = None,
+                 client_factory: Callable = default_client_factory, rate: float = 1.0,
+                 max_rate: Optional[float] = None, shared_path: Optional[str] = None):
+        breakers = breakers if breakers is not None else BreakerRegistry()
+        profiles = list(dict.fromkeys(profiles or (None,)))
+        if max_rate is None:
+            max_rate = rate if len(profiles) == 1 else MULTI_ACCOUNT_MAX_RATE
+        self.accounts: List[Route53Account] = []
+        for profile in profiles:
+            breaker = breakers.get('route53' if profile is None else f"route53:{profile}")
+            self.accounts.append(Route53Account(profile, breaker, client_factory, rate=rate,
+                                                max_rate=max(rate, max_rate), shared_path=shared_path))
+        # Guards the accounts' call counters and rate updates, which come from every checking thread
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def acquire(self, cancel_event: Optional[threading.Event] = None,
+                avoid: Iterable[Route53Account] = ()) -> Optional[Route53Account]:
+        """
+        Wait for a call slot and return the account to make the call with.
+
+        Accounts in avoid (e.g. one that just throttled this request) are only
+        used when no other account is usable. Returns None if every account's
+        circuit breaker is open or cancel_event fires while waiting.
+        """
+        avoid = set(id(a) for a in avoid)
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            closed = [a for a in self.accounts if a.breaker.state == CLOSED]
+            # allow() is what moves an open breaker to half-open, so ask every open one
+            for account in self.accounts:
+                if account.breaker.state != CLOSED and (id(account) not in avoid or not closed) \
+                        and account.breaker.allow():
+                    return self._wait_for_token(account, cancel_event)
+            preferred = [a for a in closed if id(a) not in avoid] or closed
+            for account in sorted(preferred, key=lambda a: a.bucket.time_until_available()):
+                if account.bucket.try_acquire():
+                    with self._lock:
+                        account.calls += 1
+                    return account
+            if not preferred:
+                # Every breaker is open and no probe is due
+                return None
+            wait = min(a.bucket.time_until_available() for a in preferred)
+            if cancel_event is not None:
+                cancel_event.wait(wait)
+            else:
+                time.sleep(wait)
+
+    def _wait_for_token(self, account: Route53Account,
+                        cancel_event: Optional[threading.Event]) -> Optional[Route53Account]:
+        while not account.bucket.try_acquire():
+            wait = account.bucket.time_until_available()
+            if cancel_event is not None:
+                if cancel_event.wait(wait):
+                    return None
+            else:
+                time.sleep(wait)
+        with self._lock:
+            account.calls += 1
+        return account
+
+    def record_success(self, account: Route53Account) -> None:
+        account.breaker.record_success()
+        with self._lock:
+            account._set_rate(account.rate + account.increase)
+
+    def record_throttle(self, account: Route53Account) -> None:
+        account.breaker.record_failure()
+        with self._lock:
+            account.throttles += 1
+            account._set_rate(account.rate / 2)
+        logger.info(f"Route 53 account {account.name} throttled, rate lowered to {account.rate:.2f}/s")
+
+    def record_failure(self, account: Route53Account) -> None:
+        account.breaker.record_failure()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {account.name: account.snapshot() for account in self.accounts}
+
+    def summary_lines(self) -> List[str]:
+        return [f"{name}: {s['calls']} calls, {s['throttles']} throttled, {s['rate']:.2f}/s, breaker {s['breaker']}"
+                for name, s in self.snapshot().items()]
@@ -0,0 +1,130 @@
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineClosed(Exception):
+    """Raised when a batch is requested from a pipeline that has been closed."""
+
+
+class GenerationTimeout(Exception):
+    """Raised by get() when no batch is ready before its timeout."""
+
+
+class PrefetchingGenerator:
+    """
+    Producer side of the generate -> check pipeline.
+
+    A background thread calls generate_batch() and keeps up to `lookahead`
+    finished batches queued, so the next batch is being generated while the
+    current one is checked. generate_batch is called with no arguments and
+    should read whatever verdicts are known at the time it runs.
+
+    A lookahead of 0 disables prefetching: get() generates synchronously, or
+    in a one-off thread when it is given a timeout.
+    """
+
+    def __init__(self, generate_batch, lookahead=1):
+        self._generate_batch = generate_batch
+        self.lookahead = max(0, int(lookahead))
+        self._queue = queue.Queue(maxsize=max(1, self.lookahead))
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.lookahead == 0 or self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._run, name="domain-prefetch", daemon=True)
+        self._thread.start()
+        logger.debug(f"Started prefetching generator with lookahead {self.lookahead}")
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                item = self._generate_batch()
+            except Exception as e:
+                logger.warning(f"Error generating prefetched batch: {e}")
+                item = e
+            # Errors are handed to the consumer, which decides whether to ask again
+            if not self._put(item):
+                return
+
+    def _put(self, item):
+        """Block until the item is queued or the pipeline is closed."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, timeout=None):
+        """Return the next batch, re-raising any error the producer hit.
+
+        With a timeout (seconds), raise GenerationTimeout if no batch is ready
+        by then. A batch still being generated is returned by a later get().
+        """
+        if self._stop.is_set():
+            raise PipelineClosed("Pipeline is closed")
+        if self.lookahead == 0:
+            if timeout is None and self._thread is None:
+                return self._generate_batch()
+            if self._thread is None:
+                # Generate just this batch in the background so the wait can be bounded
+                self._thread = threading.Thread(target=self._run_once, name="domain-generate", daemon=True)
+                self._thread.start()
+        elif self._thread is None:
+            self.start()
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            step = 0.1 if end is None else min(0.1, max(0.0, end - time.monotonic()))
+            try:
+                item = self._queue.get(timeout=step)
+                break
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise PipelineClosed("Pipeline is closed")
+                if end is not None and time.monotonic() >= end:
+                    raise GenerationTimeout(f"No batch generated within {timeout:.1f}s")
+        if self.lookahead == 0:
+            self._thread = None
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def _run_once(self):
+        try:
+            item = self._generate_batch()
+        except Exception as e:
+            logger.warning(f"Error generating batch: {e}")
+            item = e
+        self._put(item)
+
+    def close(self, timeout=1.0):
+        """Stop producing and discard queued batches."""
+        self._stop.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        if self._thread is not None:
+            # A generation call in flight cannot be interrupted; the thread is a
+            # daemon and exits as soon as that call returns.
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.debug("Prefetch thread still finishing an in-flight generation call")
+            self._thread = None
+        logger.debug("Prefetching generator closed")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
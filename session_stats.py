@@ -0,0 +1,208 @@
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from candidate_filter import DUPLICATE, KNOWN, NEAR_DUPLICATE, TOO_LONG, FilterResult
+from domain_checker import TIER_SCHEDULER, route53_api_calls
+
+# Filter reasons that mean the LLM repeated itself or the known list
+_DUPLICATE_REASONS = (DUPLICATE, KNOWN, NEAR_DUPLICATE)
+
+COUNTERS = (
+    'llm_calls', 'llm_cache_hits', 'prompt_tokens', 'completion_tokens',
+    'suggestions', 'filtered_duplicate', 'filtered_too_long', 'filtered_other',
+    'checked', 'available', 'taken', 'errors', 'unchecked',
+)
+
+
+def _tier_calls() -> Dict[str, int]:
+    return {tier: int(s['calls']) for tier, s in TIER_SCHEDULER.snapshot().get('*', {}).items()}
+
+
+class RoundStats:
+    """Counters for one generate/check round of main.py."""
+
+    def __init__(self, query: str, number: int):
+        self.query = query
+        self.number = number
+        self.started_at = datetime.now().isoformat()
+        self.counts: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self.tier_calls: Dict[str, int] = {}
+        # Requests actually sent to Route 53; one route53 tier check can make several
+        self.route53_calls = 0
+        self.known_at_start = 0
+        self.seconds = 0.0
+        self._started = time.monotonic()
+        self._tier_baseline = _tier_calls()
+        self._route53_baseline = route53_api_calls()
+
+    def finish(self) -> None:
+        self.seconds = time.monotonic() - self._started
+        now = _tier_calls()
+        self.tier_calls = {tier: now[tier] - self._tier_baseline.get(tier, 0) for tier in now
+                           if now[tier] - self._tier_baseline.get(tier, 0)}
+        self.route53_calls = max(0, route53_api_calls() - self._route53_baseline)
+
+    def to_dict(self) -> Dict:
+        return {
+            'round': self.number,
+            'started_at': self.started_at,
+            'seconds': round(self.seconds, 2),
+            'known_at_start': self.known_at_start,
+            **self.counts,
+            'tier_calls': dict(self.tier_calls),
+            'route53_calls': self.route53_calls,
+        }
+
+
+def summarize(rounds: List[Dict]) -> Dict:
+    """Totals over round dicts plus the per-available-domain costs and suggestion quality shares."""
+    totals: Dict = dict.fromkeys(COUNTERS, 0)
+    totals['seconds'] = 0.0
+    totals['route53_calls'] = 0
+    tier_calls: Dict[str, int] = {}
+    for r in rounds:
+        for name in COUNTERS:
+            totals[name] += r.get(name, 0)
+        totals['seconds'] += r.get('seconds', 0.0)
+        totals['route53_calls'] += r.get('route53_calls', 0)
+        for tier, calls in r.get('tier_calls', {}).items():
+            tier_calls[tier] = tier_calls.get(tier, 0) + calls
+    totals['rounds'] = len([r for r in rounds if r.get('round')])
+    totals['tier_calls'] = tier_calls
+    totals['seconds'] = round(totals['seconds'], 2)
+
+    found = totals['available']
+    tokens = totals['prompt_tokens'] + totals['completion_tokens']
+    totals['per_available'] = None if not found else {
+        'tokens': round(tokens / found, 1),
+        'llm_calls': round(totals['llm_calls'] / found, 2),
+        'route53_calls': round(totals['route53_calls'] / found, 2),
+        'tier_calls': round(sum(tier_calls.values()) / found, 2),
+        'seconds': round(totals['seconds'] / found, 2),
+    }
+    suggestions = totals['suggestions']
+    totals['duplicate_share'] = round(totals['filtered_duplicate'] / suggestions, 3) if suggestions else None
+    totals['too_long_share'] = round(totals['filtered_too_long'] / suggestions, 3) if suggestions else None
+    decided = totals['available'] + totals['taken']
+    totals['taken_share'] = round(totals['taken'] / decided, 3) if decided else None
+    return totals
+
+
+class SessionStats:
+    """
+    Search-efficiency accounting for a main.py session.
+
+    LLM calls may come from the prefetch thread, so every update is locked.
+    Calls made while no round is open (seed extraction, prefetching after a
+    round ended) are kept in a separate bucket that still counts in totals.
+    """
+
+    def __init__(self):
+        self.rounds: List[RoundStats] = []
+        self.current: Optional[RoundStats] = None
+        self.outside = RoundStats('', 0)
+        self._lock = threading.Lock()
+
+    def _bucket(self) -> RoundStats:
+        return self.current if self.current is not None else self.outside
+
+    def _add(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._bucket().counts[name] += value
+
+    def start_round(self, query: str, known: int = 0) -> RoundStats:
+        with self._lock:
+            number = sum(1 for r in self.rounds if r.query == query) + 1
+            self.current = RoundStats(query, number)
+            self.current.known_at_start = known
+            self.rounds.append(self.current)
+            return self.current
+
+    def end_round(self) -> Optional[RoundStats]:
+        with self._lock:
+            finished, self.current = self.current, None
+        if finished is not None:
+            finished.finish()
+        return finished
+
+    def record_llm_call(self, prompt_tokens: int = 0, completion_tokens: int = 0, cached: bool = False) -> None:
+        with self._lock:
+            counts = self._bucket().counts
+            if cached:
+                counts['llm_cache_hits'] += 1
+                return
+            counts['llm_calls'] += 1
+            counts['prompt_tokens'] += prompt_tokens
+            counts['completion_tokens'] += completion_tokens
+
+    def record_suggestions(self, count: int) -> None:
+        self._add('suggestions', count)
+
+    def record_filter(self, result: FilterResult) -> None:
+        with self._lock:
+            counts = self._bucket().counts
+            for reason, dropped in result.dropped.items():
+                if reason in _DUPLICATE_REASONS:
+                    counts['filtered_duplicate'] += len(dropped)
+                elif reason == TOO_LONG:
+                    counts['filtered_too_long'] += len(dropped)
+                else:
+                    counts['filtered_other'] += len(dropped)
+
+    def record_verdict(self, status: str) -> None:
+        name = {'available': 'available', 'taken': 'taken', 'unchecked': 'unchecked'}.get(status, 'errors')
+        with self._lock:
+            counts = self._bucket().counts
+            counts[name] += 1
+            if status != 'unchecked':
+                counts['checked'] += 1
+
+    def outside_counts(self) -> Dict[str, int]:
+        """Snapshot of the between-rounds bucket, to pass to record() later as outside_since."""
+        with self._lock:
+            return dict(self.outside.counts)
+
+    def record(self, rounds: List[RoundStats], outside_since: Optional[Dict[str, int]] = None) -> Dict:
+        """
+        Rounds and their totals, as stored in a query's cache file.
+
+        With outside_since, what was counted between rounds since that
+        snapshot (prefetched batches, seed extraction) is stored as 'outside'
+        and included in the totals.
+        """
+        rounds = [r.to_dict() for r in rounds]
+        record = {'timestamp': datetime.now().isoformat(), 'rounds': rounds}
+        parts = list(rounds)
+        if outside_since is not None:
+            with self._lock:
+                outside = {name: value - outside_since.get(name, 0) for name, value in self.outside.counts.items()}
+            if any(outside.values()):
+                record['outside'] = outside
+                parts.append(outside)
+        record['totals'] = summarize(parts)
+        return record
+
+    def totals(self) -> Dict:
+        return summarize([r.to_dict() for r in self.rounds] + [self.outside.to_dict()])
+
+    def summary_lines(self) -> List[str]:
+        lines = []
+        for r in self.rounds:
+            d = r.to_dict()
+            dup = f"{d['filtered_duplicate'] / d['suggestions']:.0%}" if d['suggestions'] else '-'
+            lines.append(f"Round {d['round']} ({r.query[:30]}): {d['suggestions']} suggestions, {dup} duplicate, "
+                         f"{d['filtered_too_long']} too long, {d['checked']} checked, {d['available']} available, "
+                         f"{d['prompt_tokens'] + d['completion_tokens']} tokens, {d['seconds']:.1f}s")
+        t = self.totals()
+        lines.append(f"Session: {t['rounds']} rounds, {t['llm_calls']} LLM calls ({t['llm_cache_hits']} cached), "
+                     f"{t['prompt_tokens']} prompt + {t['completion_tokens']} completion tokens, "
+                     f"{sum(t['tier_calls'].values())} tier checks ({t['tier_calls'].get('route53', 0)} Route 53), "
+                     f"{t['route53_calls']} Route 53 API calls, "
+                     f"{t['available']} available of {t['checked']} checked in {t['seconds']:.0f}s")
+        if t['per_available']:
+            p = t['per_available']
+            lines.append(f"Per available domain: {p['tokens']:.0f} tokens, {p['llm_calls']} LLM calls, "
+                         f"{p['route53_calls']} Route 53 API calls, {p['seconds']:.1f}s")
+        return lines
@@ -0,0 +1,138 @@
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from domain_checker import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    rate REAL NOT NULL,
+    capacity REAL NOT NULL,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+class SharedTokenBucket:
+    """
+    Token bucket shared by every process that opens the same SQLite file.
+
+    Same interface as domain_checker.TokenBucket, but the tokens and the
+    rate live in one row of the file, so all processes on a machine (or
+    a shared volume) draw from one budget, and a rate lowered after a
+    throttle in one process slows the others too. Every take runs in an
+    IMMEDIATE transaction. If the file cannot be used, the bucket falls
+    back to an in-process TokenBucket and logs it once.
+    """
+
+    def __init__(self, path: str, name: str, rate: float, capacity: Optional[float] = None):
+        self.path = path
+        self.name = name
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._local = threading.local()
+        self._fallback: Optional[TokenBucket] = None
+        self._fallback_lock = threading.Lock()
+        try:
+            conn = self._connect()
+            conn.executescript(_SCHEMA)
+            # The first process to create the row sets the starting rate; later ones join it
+            conn.execute('INSERT OR IGNORE INTO buckets (name, rate, capacity, tokens, updated) VALUES (?, ?, ?, ?, ?)',
+                         (name, rate, self.capacity, self.capacity, time.time()))
+        except sqlite3.Error as e:
+            self._fail(e, rate)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _fail(self, error: Exception, rate: float) -> None:
+        with self._fallback_lock:
+            if self._fallback is None:
+                logger.warning(f"Shared rate limit {self.name} in {self.path} unavailable, "
+                               f"limiting this process only: {error}")
+                self._fallback = TokenBucket(rate, self.capacity)
+
+    def _refilled(self, row: Tuple[float, float, float], now: float) -> float:
+        rate, tokens, updated = row
+        return min(self.capacity, tokens + max(0.0, now - updated) * rate)
+
+    def _read(self) -> Tuple[float, float, float]:
+        return self._connect().execute('SELECT rate, tokens, updated FROM buckets WHERE name = ?',
+                                       (self.name,)).fetchone()
+
+    @property
+    def rate(self) -> float:
+        if self._fallback is not None:
+            return self._fallback.rate
+        try:
+            return self._read()[0]
+        except sqlite3.Error as e:
+            self._fail(e, 1.0)
+            return self._fallback.rate
+
+    def set_rate(self, rate: float) -> None:
+        if self._fallback is not None:
+            self._fallback.set_rate(rate)
+            return
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                now = time.time()
+                # Tokens earned so far accrue at the old rate
+                tokens = self._refilled(self._read(), now)
+                conn.execute('UPDATE buckets SET rate = ?, tokens = ?, updated = ? WHERE name = ?',
+                             (rate, tokens, now, self.name))
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            self._fail(e, rate)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        if self._fallback is not None:
+            return self._fallback.try_acquire(tokens)
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                now = time.time()
+                row = self._read()
+                available = self._refilled(row, now)
+                taken = available >= tokens
+                if taken:
+                    available -= tokens
+                conn.execute('UPDATE buckets SET tokens = ?, updated = ? WHERE name = ?',
+                             (available, now, self.name))
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+            return taken
+        except sqlite3.Error as e:
+            self._fail(e, 1.0)
+            return self._fallback.try_acquire(tokens)
+
+    def time_until_available(self, tokens: float = 1.0) -> float:
+        if self._fallback is not None:
+            return self._fallback.time_until_available(tokens)
+        try:
+            row = self._read()
+        except sqlite3.Error as e:
+            self._fail(e, 1.0)
+            return self._fallback.time_until_available(tokens)
+        available = self._refilled(row, time.time())
+        if available >= tokens:
+            return 0.0
+        rate = row[0]
+        return (tokens - available) / rate if rate > 0 else float('inf')
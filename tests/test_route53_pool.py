@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+botocore_session = pytest.importorskip('botocore.session')
+from botocore.stub import Stubber
+
+import domain_checker
+from circuit_breaker import CLOSED, OPEN, BreakerRegistry
+from route53_pool import Route53Pool
+
+
+class StubbedClients:
+    """client_factory handing out one Stubber-wrapped route53domains client per profile."""
+
+    def __init__(self):
+        self.stubbers = {}
+
+    def __call__(self, profile, connect_timeout, read_timeout):
+        if profile not in self.stubbers:
+            client = botocore_session.get_session().create_client(
+                'route53domains', region_name='us-east-1',
+                aws_access_key_id='testing', aws_secret_access_key='testing')
+            stubber = Stubber(client)
+            stubber.activate()
+            self.stubbers[profile] = stubber
+        return self.stubbers[profile].client
+
+    def throttle(self, profile, domain):
+        self.stubbers[profile].add_client_error('check_domain_availability', service_error_code='ThrottlingException',
+                                                service_message='Rate exceeded', http_status_code=400,
+                                                expected_params={'DomainName': domain})
+
+    def answer(self, profile, domain, availability='AVAILABLE'):
+        self.stubbers[profile].add_response('check_domain_availability', {'Availability': availability},
+                                            expected_params={'DomainName': domain})
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    clients = StubbedClients()
+    pool = Route53Pool(['a', 'b'], breakers=BreakerRegistry(reset_timeout=0.3), client_factory=clients, rate=100.0)
+    for account in pool.accounts:
+        account.client()
+    monkeypatch.setattr(domain_checker, 'route53_pool', lambda: pool)
+    return pool, clients
+
+
+def test_throttled_request_moves_to_another_account(pool):
+    pool, clients = pool
+    a, b = pool.accounts
+    # Send the first call to a
+    b.bucket.try_acquire()
+    clients.throttle('a', 'example.com')
+    clients.answer('b', 'example.com')
+    assert domain_checker.check_aws_route53('example.com') == (True, 'available')
+    assert a.throttles == 1
+    assert b.calls == 1
+
+
+def test_throttled_account_recovers(pool):
+    pool, clients = pool
+    a, b = pool.accounts
+    for _ in range(a.breaker.failure_threshold):
+        pool.record_throttle(a)
+    assert a.breaker.state == OPEN
+
+    # While a's breaker is open, every call goes to b
+    clients.answer('b', 'first.com')
+    assert domain_checker.check_aws_route53('first.com') == (True, 'available')
+    assert a.calls == 0
+
+    # Once the cooldown is over, a gets the half-open probe even though b is healthy
+    time.sleep(a.breaker.reset_timeout + 0.05)
+    clients.answer('a', 'second.com', 'UNAVAILABLE')
+    assert domain_checker.check_aws_route53('second.com') == (False, 'taken')
+    assert a.breaker.state == CLOSED
+    assert a.calls == 1
+    for stubber in clients.stubbers.values():
+        stubber.assert_no_pending_responses()
@@ -0,0 +1,152 @@
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of one tier call
+CONCLUSIVE = 'conclusive'
+INCONCLUSIVE = 'inconclusive'
+FAILED = 'failed'
+
+# Assumed (mean latency in seconds, conclusive rate) before a tier has been measured;
+# these reproduce the historical DNS -> Route 53 -> WHOIS order
+PRIORS = {
+    'dns': (0.2, 0.5),
+    'route53': (1.0, 0.95),
+    'whois': (2.0, 0.8),
+}
+
+
+class TierStats:
+    """Rolling window of one tier's recent calls: outcome and latency."""
+
+    def __init__(self, window: int = 100):
+        self.calls: Deque[Tuple[str, float]] = deque(maxlen=window)
+        self.total = 0
+
+    def record(self, outcome: str, latency: float) -> None:
+        self.calls.append((outcome, latency))
+        self.total += 1
+
+    def __len__(self) -> int:
+        return len(self.calls)
+
+    def rate(self, outcome: str) -> float:
+        if not self.calls:
+            return 0.0
+        return sum(1 for o, _ in self.calls if o == outcome) / len(self.calls)
+
+    def mean_latency(self) -> float:
+        if not self.calls:
+            return 0.0
+        return sum(latency for _, latency in self.calls) / len(self.calls)
+
+    def percentile(self, q: float) -> float:
+        if not self.calls:
+            return 0.0
+        latencies = sorted(latency for _, latency in self.calls)
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            'calls': self.total,
+            'window': len(self.calls),
+            'success_rate': self.rate(CONCLUSIVE),
+            'inconclusive_rate': self.rate(INCONCLUSIVE),
+            'failure_rate': self.rate(FAILED),
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+        }
+
+
+class TierScheduler:
+    """
+    Orders the checking tiers per TLD by expected time to a verdict.
+
+    Each call's outcome and latency is recorded per (tier, TLD) and per tier
+    across all TLDs. Tiers are ordered by mean latency divided by conclusive
+    rate, which minimizes expected time-to-verdict when the tiers answer
+    independently. A tier failing at least skip_failure_rate of its recent
+    calls is skipped, except on every explore_every-th check of that TLD so
+    that recovery (credentials added, resolver back) is noticed. TLD-specific
+    stats are used once they have min_samples calls; until then the global
+    stats, and before that PRIORS, decide.
+    """
+
+    def __init__(self, window: int = 100, min_samples: int = 5, skip_failure_rate: float = 0.9,
+                 explore_every: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self.skip_failure_rate = skip_failure_rate
+        self.explore_every = explore_every
+        self._stats: Dict[Tuple[str, str], TierStats] = {}
+        self._plans: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+        self._checks: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, tier: str, tld: str) -> TierStats:
+        key = (tier, tld)
+        if key not in self._stats:
+            self._stats[key] = TierStats(self.window)
+        return self._stats[key]
+
+    def record(self, tier: str, tld: str, outcome: str, latency: float) -> None:
+        with self._lock:
+            self._get(tier, tld).record(outcome, latency)
+            self._get(tier, '*').record(outcome, latency)
+
+    def _estimate(self, tier: str, tld: str) -> Tuple[float, float, float]:
+        """(mean latency, conclusive rate, failure rate) for a tier, falling back to global stats and priors."""
+        for key in ((tier, tld), (tier, '*')):
+            stats = self._stats.get(key)
+            if stats is not None and len(stats) >= self.min_samples:
+                return stats.mean_latency(), stats.rate(CONCLUSIVE), stats.rate(FAILED)
+        latency, success = PRIORS.get(tier, (1.0, 0.5))
+        return latency, success, 0.0
+
+    def plan(self, tld: str, tiers: Iterable[str]) -> List[str]:
+        """Return the tiers to try for a domain under tld, in order."""
+        tiers = list(tiers)
+        with self._lock:
+            self._checks[tld] = self._checks.get(tld, 0) + 1
+            explore = self.explore_every > 0 and self._checks[tld] % self.explore_every == 0
+            estimates = {tier: self._estimate(tier, tld) for tier in tiers}
+            # Smith's rule: cheapest time per conclusive answer first
+            ordered = sorted(tiers, key=lambda t: (estimates[t][0] / max(estimates[t][1], 0.01), tiers.index(t)))
+            skipped = tuple(t for t in ordered if estimates[t][2] >= self.skip_failure_rate)
+            if len(skipped) == len(ordered) or explore:
+                skipped = ()
+            order = tuple(t for t in ordered if t not in skipped)
+            was_skipping = bool(self._plans.get(tld, ((), ()))[1])
+            changed = self._plans.get(tld) != (order, skipped) and not explore
+            if changed:
+                self._plans[tld] = (order, skipped)
+        if changed:
+            details = ', '.join(f"{t} {estimates[t][0]:.2f}s/{estimates[t][1]:.0%}" for t in ordered)
+            message = f"Tier order for .{tld}: {' -> '.join(order)} ({details})"
+            if skipped:
+                message += f"; skipping {', '.join(skipped)} (failing)"
+            logger.info(message)
+        elif explore and was_skipping:
+            logger.debug(f"Exploring skipped tiers for .{tld}")
+        return list(order)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Stats by TLD ('*' is all TLDs) and tier, for metrics and summaries."""
+        with self._lock:
+            result: Dict[str, Dict[str, Dict[str, float]]] = {}
+            for (tier, tld), stats in sorted(self._stats.items()):
+                result.setdefault(tld, {})[tier] = stats.snapshot()
+            return result
+
+    def summary_lines(self, tld: Optional[str] = '*') -> List[str]:
+        lines = []
+        for tier, s in self.snapshot().get(tld, {}).items():
+            lines.append(f"{tier}: {s['calls']} calls, {s['success_rate']:.0%} conclusive, "
+                         f"{s['inconclusive_rate']:.0%} inconclusive, {s['failure_rate']:.0%} failed, "
+                         f"p50 {s['p50']:.2f}s, p90 {s['p90']:.2f}s")
+        return lines
+
@@ -1,5 +1,6 @@
 import os
 import logging
+from typing import Dict, Iterator, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -15,4 +16,22 @@ def load_api_key():
         return None
     except Exception as e:
         logger.error(f"Error loading API key from {key_path}: {e}", exc_info=True)
-        return None
\ No newline at end of file
+        return None
+
+
+def query_cache_verdicts(data: Dict) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    (domain, status, checked_at) for every verdict in one of main.py's query caches.
+
+    A domain is dated by the first search that checked it, not the latest
+    one, since later searches skip names that are already known. Domains no
+    search lists (caches from before searches were recorded) have checked_at None.
+    """
+    first_checked: Dict[str, str] = {}
+    for search in data.get('searches', []):
+        for key in ('new_available_domains', 'new_unavailable_domains'):
+            for domain in search.get(key, []):
+                first_checked.setdefault(domain, search.get('timestamp'))
+    for status, key in (('available', 'available_domains'), ('taken', 'unavailable_domains')):
+        for domain in data.get(key, []):
+            yield domain, status, first_checked.get(domain)
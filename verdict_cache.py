@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from typing import Callable, Dict, Optional, Tuple
+
+# How long a conclusive verdict is served without re-checking (seconds)
+DEFAULT_TTL = {
+    'available': 10 * 60.0,
+    'taken': 24 * 3600.0,
+}
+
+
+class VerdictCache:
+    """
+    In-memory cache of recent conclusive verdicts, shared by every request a
+    long-running process serves.
+
+    Only 'available' and 'taken' are cached, each with its own TTL (available
+    names are re-checked sooner since they can be registered at any time).
+    Errors and unchecked results are never cached. The least recently
+    stored entries are dropped beyond max_entries.
+    """
+
+    def __init__(self, ttl: Optional[Dict[str, float]] = None, max_entries: int = 100000):
+        self.ttl = dict(DEFAULT_TTL, **(ttl or {}))
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, Tuple[Optional[bool], str, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, domain: str) -> Optional[Tuple[Optional[bool], str]]:
+        with self._lock:
+            entry = self._entries.get(domain)
+            if entry is not None and time.time() - entry[2] < self.ttl.get(entry[1], 0):
+                self.hits += 1
+                return entry[0], entry[1]
+            if entry is not None:
+                del self._entries[domain]
+            self.misses += 1
+            return None
+
+    def put(self, domain: str, is_available: Optional[bool], status: str) -> None:
+        if status not in self.ttl:
+            return
+        with self._lock:
+            self._entries.pop(domain, None)
+            self._entries[domain] = (is_available, status, time.time())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent work for the same key into one call.
+
+    submit() starts fn on the executor unless a call for that key is already
+    in flight, in which case the caller gets that call's Future instead. The
+    key is forgotten as soon as the call finishes, so later callers start a
+    fresh one (the verdict cache is what serves repeats).
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Future]:
+        """The in-flight call for key, if there is one."""
+        with self._lock:
+            return self._calls.get(key)
+
+    def submit(self, key: str, executor: Executor, fn: Callable, *args) -> Tuple[Future, bool]:
+        """Return (future, shared); shared is True if the call was already in flight."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, True
+            future = executor.submit(fn, *args)
+            self._calls[key] = future
+        # Registered outside the lock: it runs at once if the call already finished
+        future.add_done_callback(lambda f: self._forget(key, f))
+        return future, False
+
+    def _forget(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def cancel_pending(self) -> int:
+        """Cancel the calls that have not started yet; returns how many were cancelled."""
+        with self._lock:
+            futures = list(self._calls.values())
+        # Cancelled outside the lock: cancel() runs _forget at once
+        return sum(future.cancel() for future in futures)
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,345 @@
+#!/usr/bin/env uv run --script
+"""
+Track domains and re-check their availability in the background.
+
+Usage:
+    ./watchlist.py add example.com other.com --priority 3
+    ./watchlist.py import-cache
+    ./watchlist.py list
+    ./watchlist.py run [--once] [--rate 30]
+"""
+
+import sys
+import os
+import glob
+import json
+import time
+import heapq
+import argparse
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from domain_checker import TokenBucket, check_domains_until, lookup_expiration_date
+from logging_config import setup_logging
+from utils import query_cache_verdicts
+
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+# How long a verdict stays fresh before it is re-checked (at priority 1)
+VERDICT_TTL = {
+    'available': 1 * DAY,
+    'taken': 30 * DAY,
+    'error': 1 * HOUR,
+}
+# Re-check cadence for taken domains whose registration has lapsed (grace/redemption period)
+EXPIRED_RECHECK = 3 * DAY
+# Give the registry a day after the published expiry before looking again
+EXPIRY_GRACE = 1 * DAY
+
+
+def get_cache_dir() -> str:
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    cache_dir = os.path.join(script_dir, '.cache')
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    return cache_dir
+
+
+def _to_timestamp(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+def _to_iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+def next_check_time(entry: Dict, now: Optional[float] = None) -> float:
+    """
+    When a watched domain is next due, from its verdict age, expiry and priority.
+
+    Priority divides the TTL, so priority 3 is checked three times as often
+    as priority 1. Taken domains with a known expiry are not re-checked until
+    just after they expire, unless their normal TTL is shorter.
+    """
+    now = time.time() if now is None else now
+    checked_at = _to_timestamp(entry.get('checked_at'))
+    if checked_at is None:
+        return now
+    status = entry.get('status', 'error')
+    priority = max(1, int(entry.get('priority', 1)))
+    ttl = VERDICT_TTL.get(status, VERDICT_TTL['error']) / priority
+    due = checked_at + ttl
+
+    expires_at = _to_timestamp(entry.get('expires_at'))
+    if status == 'taken' and expires_at is not None:
+        if expires_at + EXPIRY_GRACE > checked_at:
+            # Nothing changes before the registration lapses
+            due = max(due, expires_at + EXPIRY_GRACE)
+        else:
+            due = min(due, checked_at + EXPIRED_RECHECK)
+    return due
+
+
+class Watchlist:
+    """
+    Watched domains with their last verdict, persisted as JSON in .cache.
+
+    Each entry holds status and checked_at of the latest check, verdict and
+    verdict_at of the latest conclusive one ('available' or 'taken'), so an
+    'error' only schedules a retry and never hides a flip, expires_at (if
+    known), priority and added_at. Timestamps are ISO strings, like the
+    query caches in main.py.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(get_cache_dir(), 'watchlist.json')
+        self.events_path = os.path.splitext(self.path)[0] + '_events.jsonl'
+        self.entries: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f).get('domains', {})
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"Error loading watchlist from {self.path}: {e}", exc_info=True)
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'domains': self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def add(self, domain: str, priority: int = 1, status: Optional[str] = None,
+            checked_at: Optional[str] = None) -> bool:
+        """Watch a domain; returns False if it was already watched (priority is still updated)."""
+        domain = domain.strip().lower()
+        if domain in self.entries:
+            self.entries[domain]['priority'] = max(self.entries[domain].get('priority', 1), priority)
+            return False
+        conclusive = status in ('available', 'taken')
+        self.entries[domain] = {
+            'status': status,
+            'checked_at': checked_at,
+            'verdict': status if conclusive else None,
+            'verdict_at': checked_at if conclusive else None,
+            'expires_at': None,
+            'priority': priority,
+            'added_at': datetime.now().isoformat(),
+        }
+        return True
+
+    def remove(self, domain: str) -> bool:
+        return self.entries.pop(domain.strip().lower(), None) is not None
+
+    def due(self, now: Optional[float] = None, limit: Optional[int] = None) -> List[str]:
+        """Domains whose verdict is stale, most overdue (then highest priority) first."""
+        now = time.time() if now is None else now
+        heap = []
+        for domain, entry in self.entries.items():
+            due_at = next_check_time(entry, now)
+            if due_at <= now:
+                heap.append((due_at, -int(entry.get('priority', 1)), domain))
+        heapq.heapify(heap)
+        count = len(heap) if limit is None else min(limit, len(heap))
+        return [heapq.heappop(heap)[2] for _ in range(count)]
+
+    def next_due_time(self) -> Optional[float]:
+        if not self.entries:
+            return None
+        return min(next_check_time(entry) for entry in self.entries.values())
+
+    def record(self, domain: str, status: str, lookup_expiry: bool = True) -> Optional[Dict]:
+        """Store a verdict; returns a change event if a conclusive status flipped."""
+        entry = self.entries[domain]
+        # Entries written before 'verdict' existed only have their last status
+        previous = entry.get('verdict', entry.get('status'))
+        entry['status'] = status
+        entry['checked_at'] = datetime.now().isoformat()
+        if status not in ('available', 'taken'):
+            # Only reschedules the check; the last conclusive verdict stands
+            return None
+        entry['verdict'] = status
+        entry['verdict_at'] = entry['checked_at']
+
+        if status == 'taken' and lookup_expiry:
+            expires_at = _to_timestamp(entry.get('expires_at'))
+            if expires_at is None or expires_at < time.time():
+                entry['expires_at'] = _to_iso(lookup_expiration_date(domain))
+        elif status == 'available':
+            entry['expires_at'] = None
+
+        if previous in ('available', 'taken') and previous != status:
+            event = {'domain': domain, 'old': previous, 'new': status, 'at': entry['checked_at']}
+            self._emit(event)
+            return event
+        return None
+
+    def _emit(self, event: Dict) -> None:
+        logger.info(f"Watchlist: {event['domain']} changed from {event['old']} to {event['new']}")
+        print(json.dumps(event), flush=True)
+        try:
+            with open(self.events_path, 'a') as f:
+                f.write(json.dumps(event) + '\n')
+        except OSError as e:
+            logger.error(f"Error writing watchlist event to {self.events_path}: {e}", exc_info=True)
+
+
+def import_query_caches(watchlist: Watchlist, priority: int = 1) -> int:
+    """Watch every domain recorded by main.py's per-query caches, keeping their verdicts."""
+    added = 0
+    for cache_file in glob.glob(os.path.join(get_cache_dir(), 'domains_*.json')):
+        try:
+            with open(cache_file, 'r') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"Error reading {cache_file}: {e}", exc_info=True)
+            continue
+        for domain, status, checked_at in query_cache_verdicts(data):
+            if watchlist.add(domain, priority, status=status, checked_at=checked_at):
+                added += 1
+    return added
+
+
+def update_query_caches(events: List[Dict]) -> None:
+    """Move flipped domains between the available/unavailable lists of main.py's query caches."""
+    if not events:
+        return
+    flips = {e['domain']: e['new'] for e in events}
+    for cache_file in glob.glob(os.path.join(get_cache_dir(), 'domains_*.json')):
+        try:
+            with open(cache_file, 'r') as f:
+                data = json.load(f)
+            changed = False
+            for domain, status in flips.items():
+                source, target = (('unavailable_domains', 'available_domains') if status == 'available'
+                                  else ('available_domains', 'unavailable_domains'))
+                if domain in data.get(source, []):
+                    data[source].remove(domain)
+                    data.setdefault(target, []).append(domain)
+                    changed = True
+            if changed:
+                with open(cache_file, 'w') as f:
+                    json.dump(data, f, indent=2)
+                logger.info(f"Updated flipped verdicts in {cache_file}")
+        except (json.JSONDecodeError, OSError, KeyError) as e:
+            logger.error(f"Error updating {cache_file}: {e}", exc_info=True)
+
+
+def run_watchlist(watchlist: Watchlist, rate_per_minute: float = 30.0, workers: int = 2,
+                  once: bool = False, poll_interval: float = 60.0) -> int:
+    """
+    Re-check due domains forever (or one pass with once=True).
+
+    Checks are paced by a token bucket of rate_per_minute, on top of the
+    Route 53 rate limit that domain_checker shares between processes
+    (ROUTE53_RATE_FILE), so the watchlist running next to main.py,
+    check_domain.py or the daemon never pushes the account past its quota.
+    Domains with fresh verdicts are never queried. Returns the number of
+    status flips.
+    """
+    bucket = TokenBucket(rate_per_minute / 60.0, capacity=max(1.0, workers))
+    flips = 0
+    while True:
+        due = watchlist.due()
+        if due:
+            # Take only as many as the budget allows right now
+            batch = []
+            while len(batch) < min(len(due), max(1, workers)) and bucket.try_acquire():
+                batch.append(due[len(batch)])
+            if not batch:
+                time.sleep(min(poll_interval, bucket.time_until_available()))
+                continue
+            logger.info(f"Watchlist: re-checking {len(batch)} of {len(due)} due domains")
+            results, _ = check_domains_until(batch, max_workers=workers)
+            events = []
+            for domain, (_, status) in results.items():
+                event = watchlist.record(domain, status)
+                if event:
+                    events.append(event)
+            flips += len(events)
+            watchlist.save()
+            update_query_caches(events)
+            continue
+        if once:
+            return flips
+        next_due = watchlist.next_due_time()
+        wait = poll_interval if next_due is None else max(1.0, min(poll_interval, next_due - time.time()))
+        logger.debug(f"Watchlist: nothing due, sleeping {wait:.0f}s")
+        time.sleep(wait)
+
+
+def main() -> int:
+    """Main entry point."""
+
+    try:
+        logger_instance, log_file = setup_logging()
+        logger.info(f"Logging to {log_file}")
+    except Exception as e:
+        print(f"Warning: Failed to set up logging: {e}", file=sys.stderr)
+
+    parser = argparse.ArgumentParser(description='Watch domains and re-check their availability.')
+    parser.add_argument('--file', help='Watchlist file (default: .cache/watchlist.json)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add_parser = subparsers.add_parser('add', help='Watch domains (arguments or stdin)')
+    add_parser.add_argument('domains', nargs='*')
+    add_parser.add_argument('--priority', type=int, default=1, help='Higher priorities are re-checked more often')
+
+    remove_parser = subparsers.add_parser('remove', help='Stop watching domains')
+    remove_parser.add_argument('domains', nargs='+')
+
+    import_parser = subparsers.add_parser('import-cache', help="Watch every domain in main.py's query caches")
+    import_parser.add_argument('--priority', type=int, default=1)
+
+    subparsers.add_parser('list', help='Show watched domains and when they are next due')
+
+    run_parser = subparsers.add_parser('run', help='Re-check due domains in the background')
+    run_parser.add_argument('--once', action='store_true', help='Check everything due once and exit')
+    run_parser.add_argument('--rate', type=float, default=30.0, help='Maximum checks per minute')
+    run_parser.add_argument('--workers', type=int, default=2, help='Concurrent checks')
+    run_parser.add_argument('--poll-interval', type=float, default=60.0, help='Longest sleep between passes')
+    args = parser.parse_args()
+
+    watchlist = Watchlist(args.file)
+
+    if args.command == 'add':
+        domains = args.domains or [line.strip() for line in sys.stdin if line.strip()]
+        added = sum(watchlist.add(d, args.priority) for d in domains)
+        watchlist.save()
+        print(f"Watching {added} new domain(s), {len(watchlist.entries)} in total", file=sys.stderr)
+    elif args.command == 'remove':
+        removed = sum(watchlist.remove(d) for d in args.domains)
+        watchlist.save()
+        print(f"Removed {removed} domain(s)", file=sys.stderr)
+    elif args.command == 'import-cache':
+        added = import_query_caches(watchlist, args.priority)
+        watchlist.save()
+        print(f"Imported {added} domain(s) from query caches", file=sys.stderr)
+    elif args.command == 'list':
+        now = time.time()
+        for domain in sorted(watchlist.entries):
+            entry = watchlist.entries[domain]
+            due_at = next_check_time(entry, now)
+            due = 'now' if due_at <= now else _to_iso(due_at)
+            print(f"{domain}\t{entry.get('status') or 'unchecked'}\tpriority {entry.get('priority', 1)}\tdue {due}")
+    elif args.command == 'run':
+        try:
+            flips = run_watchlist(watchlist, args.rate, args.workers, args.once, args.poll_interval)
+            print(f"{flips} status change(s)", file=sys.stderr)
+        except KeyboardInterrupt:
+            watchlist.save()
+            print("\nInterrupted by user", file=sys.stderr)
+            return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Precomputed word and syllable tables used by the local ranker and generator.
+
+The tables are small, frozen and built once at import so lookups stay O(1).
+"""
+
+# Short, common English words that non-native speakers recognise when heard
+COMMON_WORDS = frozenset("""
+able act add age air all app arc area arm art ask back bag bake ball band bank bar base bay beam bean bear beat bed bee bell belt best big bike bill bird bit blue boat body bold bond book boost box brain brand bread bridge bright bring build bus buy cake call calm camp can cap car card care cart case cash cat cell chain chair chat check chef city class clean clear click cloud club coach code coin cold come cook cool copy core corn cost craft cube cup cut daily data date day deal deep desk dial dish do dog door dot draw dream drink drive drop duck each earth east easy eat edge egg end energy even ever eye face fact fair farm fast feel field fill find fine fire firm fish fit fix flag flat flow fly fold folk food foot form fox free fresh friend fruit fun game garden gate gear gift give glad glow go goal gold good grand green grid grow guide hand happy harbor hat head heart help hero high hill hive home hope horse host hot house hub idea ink iron jam job join joy jump just keep key kid kind king kit kite lab lake lamp land lane last leaf lean learn left lemon level life lift light like lime line link lion list live load local lock logic long look loop love luck lucky made magic mail main make map mark market mate meal meet mind mint mix mode moon more move music name near nest net new news next nice night north note nut ocean open orange owl pack page paint pair palm pan paper park part pass path pay peak pen people pet phone pick pie pilot pine pixel place plan plant play plus pod point pool port post power press price pro pump pure quick quiet race rain ready real red rest rice rich ride right ring rise river road rock roof room root rose round run safe sail salt sand save say school sea seed sell send set share ship shop show side sign silk simple sing sky smart snow soft solar song sound south space spark speak spot spring star start step stone store story sun sure sweet table tag talk tap task tea team tech tell ten test thing think tide tiger time tiny top tour town toy track trade train tree trip true trust try turn up use value van view village visit voice walk wall wave way web well west wheel wild win wind wing wise wolf wood word work world yard year yes yoga you young zone
+""".split())
+
+# Valid Mandarin pinyin syllables without tone marks ('v' stands for u-umlaut)
+PINYIN_SYLLABLES = frozenset("""
+a ai an ang ao
+ba bai ban bang bao bei ben beng bi bian biao bie bin bing bo bu
+ca cai can cang cao ce cen ceng cha chai chan chang chao che chen cheng chi chong chou chu chua chuai chuan chuang chui chun chuo ci cong cou cu cuan cui cun cuo
+da dai dan dang dao de dei den deng di dian diao die ding diu dong dou du duan dui dun duo
+e ei en eng er
+fa fan fang fei fen feng fo fou fu
+ga gai gan gang gao ge gei gen geng gong gou gu gua guai guan guang gui gun guo
+ha hai han hang hao he hei hen heng hong hou hu hua huai huan huang hui hun huo
+ji jia jian jiang jiao jie jin jing jiong jiu ju juan jue jun
+ka kai kan kang kao ke ken keng kong kou ku kua kuai kuan kuang kui kun kuo
+la lai lan lang lao le lei leng li lia lian liang liao lie lin ling liu long lou lu lv luan lue lun luo
+ma mai man mang mao me mei men meng mi mian miao mie min ming miu mo mou mu
+na nai nan nang nao ne nei nen neng ni nian niang niao nie nin ning niu nong nou nu nv nuan nue nuo
+o ou
+pa pai pan pang pao pei pen peng pi pian piao pie pin ping po pou pu
+qi qia qian qiang qiao qie qin qing qiong qiu qu quan que qun
+ran rang rao re ren reng ri rong rou ru rua ruan rui run ruo
+sa sai san sang sao se sen seng sha shai shan shang shao she shei shen sheng shi shou shu shua shuai shuan shuang shui shun shuo si song sou su suan sui sun suo
+ta tai tan tang tao te teng ti tian tiao tie ting tong tou tu tuan tui tun tuo
+wa wai wan wang wei wen weng wo wu
+xi xia xian xiang xiao xie xin xing xiong xiu xu xuan xue xun
+ya yan yang yao ye yi yin ying yo yong you yu yuan yue yun
+za zai zan zang zao ze zei zen zeng zha zhai zhan zhang zhao zhe zhei zhen zheng zhi zhong zhou zhu zhua zhuai zhuan zhuang zhui zhun zhuo zi zong zou zu zuan zui zun zuo
+""".split())
+
+# Spellings whose sound does not give away the letters (hard to type after hearing)
+AMBIGUOUS_GRAPHEMES = ('ough', 'augh', 'eigh', 'ph', 'gh', 'kn', 'wr', 'ps', 'mb', 'sch', 'rh', 'x', 'q')
+
+MAX_WORD_LENGTH = max(len(w) for w in COMMON_WORDS | PINYIN_SYLLABLES)
+
+# Affixes that read naturally in front of or after a seed word
+PREFIXES = ('go', 'my', 'get', 'try', 'the', 'hey', 'on', 'up', 'we', 'all', 'top', 'one', 'hi', 'so', 'pro', 'just')
+SUFFIXES = ('hub', 'lab', 'ly', 'io', 'go', 'app', 'box', 'kit', 'spot', 'base', 'nest', 'land', 'zone', 'ify', 'now',
+            'hq', 'wise', 'way', 'works', 'mate', 'path', 'point', 'craft')
+
+# Query words that never make useful seeds
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have i in into is it its me my of on or our that the their this to us we
+with you your about app site website domain domains name names want need looking idea ideas help find some something
+like make build company business startup online platform service
+""".split())